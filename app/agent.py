@@ -8,6 +8,9 @@ from pc_tools import (
     click_at_position,
     type_text,
     press_key,
+    execute_action_plan,
+    wait_for_window,
+    wait_for_change,
     get_screen_info,
     capture_screen,
     undo_last_action,
@@ -129,6 +132,15 @@ pc_control_agent = RealtimeAgent(
     - Note the active window or focused element
     - Describe any error messages or dialogs
     - Point out relevant UI elements for the task
+    - Screenshots may be downscaled: results then say which images are scaled and the factor
+      to multiply image coordinates by before clicking. Coordinates written in the text
+      (e.g. changed region positions) are already screen coordinates
+    - After an action, tools may show only the regions that changed (with their screen
+      coordinates) instead of a second full screenshot, or say nothing changed.
+      "No visible change" means nothing changed within a moment of the action; some apps
+      react more slowly, so take a fresh screenshot before repeating the action
+    - Some tools can capture only the window being worked on (window_only). Their results
+      say where that window area is; add its offset to image coordinates before clicking
 
     # User Interaction Guidelines
     - Always respond to user questions and feedback
@@ -152,6 +164,14 @@ pc_control_agent = RealtimeAgent(
     - **click_at_position**: Click at specific screen coordinates
     - **type_text**: Type text using the keyboard
     - **press_key**: Press keyboard keys or key combinations
+    - Input tools accept pacing='cautious' for slow or busy apps that miss input, or 'fast'
+      for quick, routine steps
+    - **execute_action_plan**: Run a confirmed sequence of steps (activate window, click, type,
+      press key, wait) in one call; you get a log of each step and only the final screen
+    - **wait_for_window**: Wait until a window appears, becomes active or closes
+    - **wait_for_change**: Wait until the screen (or a region) changes, e.g. a page loading
+    - When something takes a while (a dialog opening, a download finishing), wait for it
+      with these tools instead of retry_with_delay or repeated screenshots
     - **get_screen_info**: Get current screen resolution and mouse position
     - **capture_screen**: Take screenshots and analyze screen content
 
@@ -165,6 +185,10 @@ pc_control_agent = RealtimeAgent(
     - **close_window**: Close a window completely
     - **resize_window**: Change the size of a window
     - **move_window**: Move a window to a specific position
+    - Window tools take a title_pattern: part of the title (or whole words from it) is enough;
+      use 'app:<name>' for an application's windows or 're:<regex>' for a pattern. The best
+      match is used, so check find_windows_by_title when several windows look alike. If only
+      similarly spelled titles exist, the tool acts on none and lists them instead
 
     ## Advanced Window Management Tools:
     - **get_all_app_names**: Get a list of all running application names
@@ -202,6 +226,10 @@ pc_control_agent = RealtimeAgent(
     - "Open Calculator" → Use open_application("Calculator")
     - "Type my email" → Use type_text("email@example.com")
     - "Press Alt+Tab" → Use press_key("alt+tab")
+    - "Save the file as report" → press_key("ctrl+s"), then wait_for_window("Save As") before
+      typing the name
+    - "Search for cats in Chrome" → Once confirmed, use execute_action_plan with steps
+      activate_window("Chrome"), press_key("ctrl+l"), type("cats"), press_key("enter")
 
     Remember: Your goal is to make PC control feel natural and collaborative,
     not robotic and automated. Confirm important actions!""",
@@ -211,6 +239,9 @@ pc_control_agent = RealtimeAgent(
         click_at_position,
         type_text,
         press_key,
+        execute_action_plan,
+        wait_for_window,
+        wait_for_change,
         get_screen_info,
         capture_screen,
         # Recovery and correction tools
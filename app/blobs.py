@@ -0,0 +1,164 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("OTTO.blobs")
+
+# Memory budget for stored images, evicting least recently used first
+BLOB_CACHE_MB = int(os.getenv("OTTO_BLOB_CACHE_MB", "64"))
+# Evicted blobs are kept on disk here when set, up to OTTO_BLOB_DISK_MB
+BLOB_DIR = os.getenv("OTTO_BLOB_DIR", "")
+BLOB_DISK_MB = int(os.getenv("OTTO_BLOB_DISK_MB", "512"))
+# URL prefix of the HTTP route serving blobs (see server.py)
+BLOB_ROUTE = "/blobs"
+
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+DATA_URL_RE = re.compile(r"data:(image/[a-zA-Z+.-]+);base64,([A-Za-z0-9+/=]+)")
+DIGEST_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class BlobStore:
+    """
+    Content-addressed store for images sent to the browser.
+
+    Blobs are keyed by a hash of their bytes, so a screenshot that appears in a
+    tool output, a history delta and a history_added event is stored and
+    fetched once. Memory use is capped by total bytes with LRU eviction;
+    evicted blobs spill to BLOB_DIR when it is set.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = BLOB_CACHE_MB * 1024 * 1024,
+        directory: str = BLOB_DIR,
+        max_disk_bytes: int = BLOB_DISK_MB * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._blobs: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+        self._bytes = 0
+        self._dir = Path(directory) if directory else None
+        self._disk: OrderedDict[str, tuple[Path, str, int]] = OrderedDict()
+        self._disk_bytes = 0
+        self.stats = {"puts": 0, "hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if self._dir is not None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()[:32]
+
+    def put(self, data: bytes, mime: str) -> str:
+        """Store bytes and return their digest."""
+        digest = self.digest(data)
+        self.stats["puts"] += 1
+        if digest in self._blobs:
+            self._blobs.move_to_end(digest)
+            return digest
+        self._blobs[digest] = (data, mime)
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes and len(self._blobs) > 1:
+            old_digest, (old_data, old_mime) = self._blobs.popitem(last=False)
+            self._bytes -= len(old_data)
+            self.stats["evictions"] += 1
+            self._spill(old_digest, old_data, old_mime)
+        return digest
+
+    def get(self, digest: str) -> Optional[tuple[bytes, str]]:
+        """Return (bytes, mime type) for a digest, or None if it is gone."""
+        blob = self._blobs.get(digest)
+        if blob is not None:
+            self._blobs.move_to_end(digest)
+            self.stats["hits"] += 1
+            return blob
+        entry = self._disk.get(digest)
+        if entry is not None:
+            path, mime, _ = entry
+            try:
+                data = path.read_bytes()
+            except OSError:
+                self._forget_disk(digest)
+            else:
+                self._disk.move_to_end(digest)
+                self.stats["disk_hits"] += 1
+                return data, mime
+        self.stats["misses"] += 1
+        return None
+
+    def url(self, digest: str) -> str:
+        return f"{BLOB_ROUTE}/{digest}"
+
+    def put_data_url(self, data_url: str) -> Optional[str]:
+        """Store an image data URL and return its blob URL (None if malformed)."""
+        match = DATA_URL_RE.fullmatch(data_url)
+        if match is None:
+            return None
+        return self._put_match(match)
+
+    def replace_data_urls(self, text: str) -> str:
+        """Replace every image data URL in text with its blob URL."""
+        if "data:image/" not in text:
+            return text
+        return DATA_URL_RE.sub(lambda m: self._put_match(m) or m.group(0), text)
+
+    def metrics(self) -> dict:
+        return {
+            "blobs": len(self._blobs),
+            "bytes": self._bytes,
+            "disk_blobs": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            **self.stats,
+        }
+
+    def _put_match(self, match) -> Optional[str]:
+        try:
+            data = base64.b64decode(match.group(2), validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        return self.url(self.put(data, match.group(1)))
+
+    def _spill(self, digest: str, data: bytes, mime: str) -> None:
+        if self._dir is None or digest in self._disk:
+            return
+        path = self._dir / f"{digest}.{EXTENSIONS.get(mime, 'bin')}"
+        try:
+            path.write_bytes(data)
+        except OSError as e:
+            logger.warning(f"Could not write blob {digest} to disk: {e}")
+            return
+        self._disk[digest] = (path, mime, len(data))
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            old_digest = next(iter(self._disk))
+            old_path = self._disk[old_digest][0]
+            self._forget_disk(old_digest)
+            try:
+                old_path.unlink()
+            except OSError:
+                pass
+
+    def _forget_disk(self, digest: str) -> None:
+        _, _, size = self._disk.pop(digest)
+        self._disk_bytes -= size
+
+    def _scan_disk(self) -> None:
+        mimes = {ext: mime for mime, ext in EXTENSIONS.items()}
+        files = sorted(self._dir.iterdir(), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            if not DIGEST_RE.match(path.stem):
+                continue
+            size = path.stat().st_size
+            mime = mimes.get(path.suffix.lstrip("."), "application/octet-stream")
+            self._disk[path.stem] = (path, mime, size)
+            self._disk_bytes += size
+
+
+# One store per server process, shared by every session
+blob_store = BlobStore()
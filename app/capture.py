@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+from capture_backends import region_within
+from encoder import EncodedImage, EncodeOptions, current_options, encode_image
+from executor import run_cpu, run_io
+from similarity import Frame, crop_frame, frame_size
+
+logger = logging.getLogger("OTTO.capture")
+
+# How long a grabbed frame may be reused when nothing was injected in between.
+CAPTURE_TTL = float(os.getenv("OTTO_CAPTURE_TTL", "1.0"))
+
+
+class ScreenCaptureService:
+    """
+    Shared screen grabber that remembers the last full frame and its encodings.
+
+    Tools ask for frames through this service instead of calling the grabber
+    directly, so an action's "after" shot can serve as the next action's
+    "before" shot and the same frame is never encoded twice with the same
+    options. Anything that injects input must call invalidate().
+    """
+
+    def __init__(
+        self,
+        grab: Callable[..., Frame],
+        ttl: float = CAPTURE_TTL,
+    ):
+        self._grab = grab
+        self.ttl = ttl
+        self._frame: Optional[Frame] = None
+        self._frame_time = 0.0
+        self._generation = 0
+        self._encoded: dict[EncodeOptions, EncodedImage] = {}
+        self._lock = asyncio.Lock()
+        self.stats = {"grabs": 0, "frame_hits": 0, "encodes": 0, "encode_hits": 0}
+
+    def invalidate(self) -> None:
+        """Forget the cached frame; called around every input injection."""
+        self._generation += 1
+        self._frame = None
+        self._encoded = {}
+
+    def store(self, frame: Frame) -> None:
+        """Adopt a frame grabbed elsewhere (e.g. by the settle waiter) as current."""
+        self._frame = frame
+        self._frame_time = time.monotonic()
+        self._encoded = {}
+
+    def _fresh_frame(self) -> Optional[Frame]:
+        if self._frame is None:
+            return None
+        if time.monotonic() - self._frame_time > self.ttl:
+            self._frame = None
+            self._encoded = {}
+            return None
+        return self._frame
+
+    async def grab(self, region=None) -> Frame:
+        """
+        Return the current screen, reusing a fresh cached frame when possible.
+
+        Args:
+            region: Optional (left, top, width, height) in screen coordinates;
+                cropped from the cached full frame when one covers it
+
+        Returns:
+            Frame (RGB array from the capture backend) of the screen or region
+        """
+        if region is not None:
+            # Crop from a fresh full frame when it covers the region; otherwise
+            # grab just the region, which is faster and may be on another monitor
+            frame = self._fresh_frame()
+            if frame is not None and region_within(region, (0, 0, *frame_size(frame))):
+                self.stats["frame_hits"] += 1
+                return crop_frame(frame, region)
+            self.stats["grabs"] += 1
+            return await run_io(self._grab, region)
+
+        async with self._lock:
+            frame = self._fresh_frame()
+            if frame is None:
+                generation = self._generation
+                frame = await run_io(self._grab)
+                self.stats["grabs"] += 1
+                # Don't cache a frame that raced with an input injection
+                if generation == self._generation:
+                    self.store(frame)
+            else:
+                self.stats["frame_hits"] += 1
+        return frame
+
+    async def encode(
+        self, frame: Frame, options: Optional[EncodeOptions] = None
+    ) -> EncodedImage:
+        """
+        Encode a frame on the CPU pool, reusing the result for the cached frame.
+
+        Args:
+            frame: Frame to encode
+            options: EncodeOptions; defaults to the tool call's image_preset
+
+        Returns:
+            EncodedImage
+        """
+        options = options or current_options()
+        cacheable = frame is self._frame
+        if cacheable and options in self._encoded:
+            self.stats["encode_hits"] += 1
+            return self._encoded[options]
+
+        encoded = await run_cpu(encode_image, frame, options)
+        self.stats["encodes"] += 1
+        if cacheable and frame is self._frame:
+            self._encoded[options] = encoded
+        return encoded
+
+    async def capture(
+        self, region=None, options: Optional[EncodeOptions] = None
+    ) -> EncodedImage:
+        """Grab (or reuse) the screen and encode it."""
+        frame = await self.grab(region)
+        return await self.encode(frame, options)
+
+    def metrics(self) -> dict:
+        return {"ttl": self.ttl, "cached": self._frame is not None, **self.stats}
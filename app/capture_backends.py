@@ -0,0 +1,280 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger("OTTO.capture_backends")
+
+# Force a backend by name ("dxcam", "mss", "pyautogui"); empty picks the fastest.
+CAPTURE_BACKEND = os.getenv("OTTO_CAPTURE_BACKEND", "").strip().lower()
+BENCHMARK_ROUNDS = int(os.getenv("OTTO_CAPTURE_BENCHMARK_ROUNDS", "3"))
+
+
+class CaptureBackend:
+    """
+    A way of grabbing the primary monitor as an RGB uint8 array (H x W x 3).
+
+    grab() is blocking and is called from the I/O thread pool, so backends
+    must be safe to call from any of its threads.
+    """
+
+    name = "base"
+
+    def grab(self, region=None) -> np.ndarray:
+        """
+        Grab the screen.
+
+        Args:
+            region: Optional (left, top, width, height) in screen coordinates
+
+        Returns:
+            RGB array of the primary monitor or region
+        """
+        raise NotImplementedError
+
+    def monitors(self) -> list:
+        """
+        Monitor rectangles in virtual-screen coordinates, primary first.
+
+        Returns:
+            List of (left, top, width, height) tuples
+        """
+        import pyautogui
+
+        width, height = pyautogui.size()
+        return [(0, 0, width, height)]
+
+    def close(self) -> None:
+        pass
+
+
+class DxcamBackend(CaptureBackend):
+    """DXGI desktop duplication via dxcam (Windows only)."""
+
+    name = "dxcam"
+
+    def __init__(self):
+        import dxcam
+
+        self._camera = dxcam.create(output_color="RGB")
+        if self._camera is None:
+            raise RuntimeError("dxcam could not open the primary output")
+        self._lock = threading.Lock()
+        self._last: Optional[np.ndarray] = None
+        # dxcam only duplicates the primary output; other monitors go through this
+        self._fallback: Optional[CaptureBackend] = None
+
+    def grab(self, region=None) -> np.ndarray:
+        with self._lock:
+            frame = self._camera.grab()
+            # dxcam returns None when nothing changed since the previous grab
+            if frame is None:
+                if self._last is None:
+                    time.sleep(0.01)
+                    frame = self._camera.grab()
+                    if frame is None:
+                        raise RuntimeError("dxcam returned no frame")
+                else:
+                    frame = self._last
+            self._last = frame
+        if region is None:
+            return frame
+        if not region_within(region, (0, 0, frame.shape[1], frame.shape[0])):
+            return self._other_monitors().grab(region)
+        left, top, width, height = region
+        return frame[top : top + height, left : left + width]
+
+    def _other_monitors(self) -> CaptureBackend:
+        if self._fallback is None:
+            try:
+                self._fallback = MssBackend()
+            except ImportError:
+                self._fallback = PyAutoGuiBackend()
+        return self._fallback
+
+    def monitors(self) -> list:
+        return self._other_monitors().monitors()
+
+    def close(self) -> None:
+        try:
+            self._camera.release()
+        except Exception:
+            pass
+
+
+class MssBackend(CaptureBackend):
+    """
+    mss: BitBlt on Windows, XGetImage on X11 (works under Xvfb), CoreGraphics
+    on macOS. mss handles are tied to the thread that created them, so each
+    pool thread gets its own.
+    """
+
+    name = "mss"
+
+    def __init__(self):
+        import mss  # noqa: F401 - fail early if it is not installed
+
+        self._local = threading.local()
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            import mss
+
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
+
+    def grab(self, region=None) -> np.ndarray:
+        import cv2
+
+        sct = self._sct()
+        if region is None:
+            monitor = sct.monitors[1]  # primary monitor, like pyautogui
+        else:
+            left, top, width, height = region
+            monitor = {"left": left, "top": top, "width": width, "height": height}
+        shot = sct.grab(monitor)
+        return cv2.cvtColor(np.asarray(shot), cv2.COLOR_BGRA2RGB)
+
+    def monitors(self) -> list:
+        # monitors[0] is the union of all monitors; the rest are physical ones
+        return [
+            (m["left"], m["top"], m["width"], m["height"])
+            for m in self._sct().monitors[1:]
+        ]
+
+
+class PyAutoGuiBackend(CaptureBackend):
+    """pyautogui/PIL ImageGrab; slowest, but always available."""
+
+    name = "pyautogui"
+
+    def grab(self, region=None) -> np.ndarray:
+        import pyautogui
+
+        if region is not None and sys.platform == "win32":
+            # pyautogui only sees the primary monitor on Windows
+            from PIL import ImageGrab
+
+            left, top, width, height = region
+            bbox = (left, top, left + width, top + height)
+            shot = ImageGrab.grab(bbox=bbox, all_screens=True)
+        else:
+            shot = pyautogui.screenshot(region=region)
+        return np.asarray(shot.convert("RGB"))
+
+
+def region_within(region, bounds) -> bool:
+    """Whether a (left, top, width, height) region lies entirely inside bounds."""
+    left, top, width, height = region
+    b_left, b_top, b_width, b_height = bounds
+    return (
+        left >= b_left
+        and top >= b_top
+        and left + width <= b_left + b_width
+        and top + height <= b_top + b_height
+    )
+
+
+def region_around(box, monitors, margin=0, point=None):
+    """
+    Capture region for a window: its box plus a margin, clipped to the monitor
+    that holds the window's centre.
+
+    Args:
+        box: (left, top, width, height) of the window
+        monitors: Monitor rectangles from CaptureBackend.monitors()
+        margin: Extra pixels around the window
+        point: Optional (x, y) that must fall inside the region
+
+    Returns:
+        (left, top, width, height), or None if the window is off-screen,
+        minimized, or does not contain point
+    """
+    left, top, width, height = box
+    if width <= 0 or height <= 0:
+        return None
+    center_x, center_y = left + width // 2, top + height // 2
+    monitor = next(
+        (m for m in monitors if region_within((center_x, center_y, 1, 1), m)), None
+    )
+    if monitor is None:
+        return None
+
+    m_left, m_top, m_width, m_height = monitor
+    r_left = max(m_left, left - margin)
+    r_top = max(m_top, top - margin)
+    r_right = min(m_left + m_width, left + width + margin)
+    r_bottom = min(m_top + m_height, top + height + margin)
+    region = (r_left, r_top, r_right - r_left, r_bottom - r_top)
+
+    if point is not None and not region_within((point[0], point[1], 1, 1), region):
+        return None
+    return region
+
+
+def _candidates():
+    if sys.platform == "win32":
+        return [DxcamBackend, MssBackend, PyAutoGuiBackend]
+    return [MssBackend, PyAutoGuiBackend]
+
+
+def _benchmark(backend: CaptureBackend, rounds: int) -> float:
+    backend.grab()  # warm-up: first grabs allocate buffers
+    start = time.perf_counter()
+    for _ in range(rounds):
+        backend.grab()
+    return (time.perf_counter() - start) / max(1, rounds)
+
+
+def select_backend(preferred: str = CAPTURE_BACKEND) -> CaptureBackend:
+    """
+    Pick the capture backend to use for this process.
+
+    A backend named by OTTO_CAPTURE_BACKEND is used if it loads. Otherwise each
+    available backend is timed over a few grabs and the fastest wins; backends
+    that fail to import or grab are skipped, ending with pyautogui.
+
+    Returns:
+        The selected CaptureBackend
+    """
+    classes = {cls.name: cls for cls in _candidates()}
+    if preferred:
+        cls = classes.get(preferred)
+        if cls is None:
+            logger.warning(f"Unknown capture backend '{preferred}', benchmarking instead")
+        else:
+            try:
+                backend = cls()
+                backend.grab()
+                logger.info(f"Using capture backend: {backend.name}")
+                return backend
+            except Exception as e:
+                logger.warning(f"Capture backend '{preferred}' unavailable: {e}")
+
+    best, best_time = None, float("inf")
+    for cls in classes.values():
+        try:
+            backend = cls()
+            elapsed = _benchmark(backend, BENCHMARK_ROUNDS)
+        except Exception as e:
+            logger.info(f"Capture backend '{cls.name}' unavailable: {e}")
+            continue
+        logger.info(f"Capture backend '{cls.name}': {elapsed * 1000:.1f} ms per grab")
+        if elapsed < best_time:
+            if best is not None:
+                best.close()
+            best, best_time = backend, elapsed
+        else:
+            backend.close()
+
+    if best is None:
+        # Nothing worked at startup (e.g. no display yet); grab lazily later
+        best = PyAutoGuiBackend()
+    logger.info(f"Using capture backend: {best.name}")
+    return best
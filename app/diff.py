@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+from similarity import frame_size, to_gray
+
+# Runs on the CPU thread pool (via run_cpu).
+
+# Gray-level difference that counts as a change; below this is encoder/AA noise.
+DIFF_THRESHOLD = 24
+# Changes closer than this many pixels are merged into one region.
+MERGE_GAP = 16
+# Past this many regions, or this share of the screen, a full frame is cheaper.
+MAX_REGIONS = 6
+MAX_COVERAGE = 0.5
+
+
+def changed_regions(
+    before: Image.Image,
+    after: Image.Image,
+    threshold: int = DIFF_THRESHOLD,
+    merge_gap: int = MERGE_GAP,
+    max_regions: int = MAX_REGIONS,
+    max_coverage: float = MAX_COVERAGE,
+):
+    """
+    Find the bounding boxes of what changed between two frames.
+
+    Args:
+        before: Frame captured before the action
+        after: Frame captured after the action
+        threshold: Minimum per-pixel gray-level difference that counts as changed
+        merge_gap: Distance in pixels below which nearby changes are merged
+        max_regions: Regions allowed before they are merged into one box
+        max_coverage: Share of the frame above which the diff is not worth sending
+
+    Returns:
+        List of (left, top, width, height) boxes in frame coordinates, an empty
+        list if nothing changed, or None if the whole frame should be sent instead
+    """
+    if frame_size(before) != frame_size(after):
+        return None
+
+    a = to_gray(before)
+    b = to_gray(after)
+    mask = (cv2.absdiff(a, b) > threshold).astype(np.uint8)
+    if not mask.any():
+        return []
+
+    # Grow changes so nearby edits (e.g. a line of typed text) form one region
+    kernel = np.ones((merge_gap, merge_gap), np.uint8)
+    mask = cv2.dilate(mask, kernel)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+    height, width = mask.shape
+    boxes = [
+        (int(x), int(y), int(w), int(h))
+        for x, y, w, h, _ in stats[1:count]  # label 0 is the background
+    ]
+
+    if len(boxes) > max_regions:
+        left = min(x for x, _, _, _ in boxes)
+        top = min(y for _, y, _, _ in boxes)
+        right = max(x + w for x, _, w, _ in boxes)
+        bottom = max(y + h for _, y, _, h in boxes)
+        boxes = [(left, top, right - left, bottom - top)]
+
+    area = sum(w * h for _, _, w, h in boxes)
+    if area > max_coverage * width * height:
+        return None
+
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
@@ -0,0 +1,242 @@
+import base64
+import functools
+import inspect
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from io import BytesIO
+from typing import Optional, Union
+
+import numpy as np
+from PIL import Image
+
+# Encoding runs on the CPU thread pool (executor.run_cpu); PIL releases the GIL
+# while compressing.
+
+logger = logging.getLogger("OTTO.encoder")
+
+MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+
+
+@dataclass(frozen=True)
+class EncodeOptions:
+    """How a screenshot is turned into bytes for the model."""
+
+    format: str = "jpeg"
+    max_dimension: Optional[int] = 1920  # longest side in pixels; None keeps full size
+    quality: int = 80  # JPEG/WebP only
+    grayscale: bool = False
+
+
+# Named presets, selectable per call or with OTTO_IMAGE_PRESET.
+PRESETS = {
+    "lossless": EncodeOptions(format="png", max_dimension=None),
+    "high": EncodeOptions(format="jpeg", max_dimension=2560, quality=90),
+    "balanced": EncodeOptions(format="jpeg", max_dimension=1920, quality=80),
+    "fast": EncodeOptions(format="jpeg", max_dimension=1280, quality=65),
+    "compact": EncodeOptions(format="webp", max_dimension=1280, quality=60),
+}
+
+
+def _normalize_format(fmt: str) -> str:
+    fmt = fmt.strip().lower()
+    fmt = FORMAT_ALIASES.get(fmt, fmt)
+    if fmt not in MIME_TYPES:
+        raise ValueError(
+            f"Unsupported image format '{fmt}' (use one of: {', '.join(MIME_TYPES)})"
+        )
+    return fmt
+
+
+def resolve_options(
+    preset: Optional[str] = None,
+    format: Optional[str] = None,
+    max_dimension: Optional[int] = None,
+    quality: Optional[int] = None,
+    grayscale: Optional[bool] = None,
+    base: Optional[EncodeOptions] = None,
+) -> EncodeOptions:
+    """
+    Build encode options from a preset plus individual overrides.
+
+    Args:
+        preset: Preset name from PRESETS; defaults to base
+        format: 'png', 'jpeg' or 'webp'
+        max_dimension: Longest side in pixels, 0 for full resolution
+        quality: 1-100 for JPEG/WebP
+        grayscale: Encode as grayscale
+        base: Options used when no preset is given (defaults to DEFAULT_OPTIONS)
+
+    Returns:
+        Resolved EncodeOptions
+    """
+    if preset:
+        key = preset.strip().lower()
+        if key not in PRESETS:
+            raise ValueError(
+                f"Unknown image preset '{preset}' (use one of: {', '.join(PRESETS)})"
+            )
+        options = PRESETS[key]
+    else:
+        options = base if base is not None else DEFAULT_OPTIONS
+
+    overrides = {}
+    if format:
+        overrides["format"] = _normalize_format(format)
+    if max_dimension is not None:
+        overrides["max_dimension"] = max_dimension if max_dimension > 0 else None
+    if quality is not None:
+        overrides["quality"] = max(1, min(100, int(quality)))
+    if grayscale is not None:
+        overrides["grayscale"] = bool(grayscale)
+    return replace(options, **overrides) if overrides else options
+
+
+def _options_from_env() -> EncodeOptions:
+    def _int(name):
+        value = os.getenv(name)
+        return int(value) if value else None
+
+    grayscale = os.getenv("OTTO_IMAGE_GRAYSCALE")
+    try:
+        return resolve_options(
+            preset=os.getenv("OTTO_IMAGE_PRESET") or "balanced",
+            format=os.getenv("OTTO_IMAGE_FORMAT"),
+            max_dimension=_int("OTTO_IMAGE_MAX_DIM"),
+            quality=_int("OTTO_IMAGE_QUALITY"),
+            grayscale=grayscale.lower() in ("1", "true", "yes") if grayscale else None,
+        )
+    except ValueError as e:
+        logger.error(f"Invalid image settings in environment, using defaults: {e}")
+        return PRESETS["balanced"]
+
+
+DEFAULT_OPTIONS = _options_from_env()
+
+# Options picked for one tool call by the with_image_preset decorator
+_call_options: ContextVar[Optional[EncodeOptions]] = ContextVar(
+    "otto_image_options", default=None
+)
+
+
+def current_options() -> EncodeOptions:
+    """
+    Options for the running tool call: its image_preset, else the default.
+    Resolve them on the event loop; worker threads don't see the call's context.
+    """
+    return _call_options.get() or DEFAULT_OPTIONS
+
+
+def with_image_preset(func):
+    """
+    Let a tool's optional `image_preset` argument set the encoding of every
+    screenshot it returns (before/after views included) for that call.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        name = signature.bind_partial(*args, **kwargs).arguments.get("image_preset")
+        try:
+            options = resolve_options(preset=name) if name else None
+        except ValueError as e:
+            return str(e)
+        token = _call_options.set(options)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _call_options.reset(token)
+
+    return wrapper
+
+
+@dataclass
+class EncodedImage:
+    """An encoded screenshot plus the numbers worth reporting about it."""
+
+    data: str  # base64, without the data URL prefix
+    format: str
+    width: int
+    height: int
+    source_width: int
+    source_height: int
+    byte_size: int
+    encode_ms: float
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.format]
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.data}"
+
+    @property
+    def scale(self) -> float:
+        """Factor to multiply image coordinates by to get screen coordinates."""
+        return self.source_width / self.width if self.width else 1.0
+
+    def metadata(self) -> str:
+        size = f"{self.width}x{self.height}"
+        if (self.width, self.height) != (self.source_width, self.source_height):
+            size += f" (screen {self.source_width}x{self.source_height})"
+        return (
+            f"{self.format} {size}, {self.byte_size / 1024:.1f} KB, "
+            f"encoded in {self.encode_ms:.0f} ms"
+        )
+
+
+def encode_image(
+    image: Union[Image.Image, np.ndarray], options: Optional[EncodeOptions] = None
+) -> EncodedImage:
+    """
+    Downscale and encode a screenshot.
+
+    Args:
+        image: PIL Image or RGB array (as returned by the capture backends)
+        options: EncodeOptions; defaults to the environment-configured options
+
+    Returns:
+        EncodedImage with base64 data, dimensions, byte size and encode time
+    """
+    options = options or DEFAULT_OPTIONS
+    start = time.perf_counter()
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    source_width, source_height = image.size
+
+    if options.max_dimension and max(image.size) > options.max_dimension:
+        scale = options.max_dimension / max(image.size)
+        size = (
+            max(1, round(source_width * scale)),
+            max(1, round(source_height * scale)),
+        )
+        image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+    if options.grayscale:
+        image = image.convert("L")
+    elif image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    buffered = BytesIO()
+    if options.format == "png":
+        image.save(buffered, format="PNG")
+    elif options.format == "jpeg":
+        image.save(buffered, format="JPEG", quality=options.quality)
+    else:
+        image.save(buffered, format="WEBP", quality=options.quality, method=2)
+    raw = buffered.getvalue()
+
+    return EncodedImage(
+        data=base64.b64encode(raw).decode(),
+        format=options.format,
+        width=image.width,
+        height=image.height,
+        source_width=source_width,
+        source_height=source_height,
+        byte_size=len(raw),
+        encode_ms=(time.perf_counter() - start) * 1000,
+    )
@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger("OTTO.executor")
+
+T = TypeVar("T")
+
+# Input injection (pyautogui/keyboard/pywinctl) mostly waits on the OS, so a small
+# thread pool is enough. Encoding and diffing screenshots is CPU-bound but done by
+# PIL, cv2 and numpy, which release the GIL, so it runs on a second thread pool.
+# Worker processes would have to be sent every full-size frame (tens of MB at 4K)
+# and, under spawn, re-import the server and redo its startup. Set
+# OTTO_CPU_WORKERS=0 to share the I/O pool instead.
+IO_WORKERS = int(os.getenv("OTTO_IO_WORKERS", "4"))
+CPU_WORKERS = int(
+    os.getenv("OTTO_CPU_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1))))
+)
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(
+            max_workers=max(1, IO_WORKERS), thread_name_prefix="otto-io"
+        )
+    return _io_pool
+
+
+def _get_cpu_pool() -> ThreadPoolExecutor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        if CPU_WORKERS <= 0:
+            _cpu_pool = _get_io_pool()
+        else:
+            _cpu_pool = ThreadPoolExecutor(
+                max_workers=CPU_WORKERS, thread_name_prefix="otto-cpu"
+            )
+    return _cpu_pool
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call (input injection, window queries, screen grabs) on the
+    bounded I/O thread pool so the event loop keeps serving audio.
+
+    Args:
+        func: Blocking callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_io_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a CPU-heavy call (image encoding, diffing) on the CPU thread pool, kept
+    apart from the I/O pool so encoding never delays input injection.
+
+    Args:
+        func: Callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_cpu_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown(wait: bool = False) -> None:
+    """Shut down both pools. Called from the server lifespan on exit."""
+    global _io_pool, _cpu_pool
+    if _cpu_pool is not None and _cpu_pool is not _io_pool:
+        _cpu_pool.shutdown(wait=wait, cancel_futures=True)
+    if _io_pool is not None:
+        _io_pool.shutdown(wait=wait, cancel_futures=True)
+    _io_pool = None
+    _cpu_pool = None
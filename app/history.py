@@ -0,0 +1,135 @@
+import hashlib
+import json
+from typing import Any, NamedTuple, Optional
+
+from blobs import blob_store
+
+# Inline images (screenshots in tool outputs, uploaded images) are far larger
+# than the rest of the history and never change once sent, so they are moved
+# to the blob store and replaced by their URL before anything is diffed or sent.
+
+
+def strip_payloads(value: Any) -> Any:
+    """
+    Return a copy of a dumped history item (or tool output) without payloads.
+
+    Image data URLs, whether an input_image's image_url or embedded in a string
+    such as a tool output, become short /blobs/<digest> URLs the browser fetches
+    once; base64 audio next to a transcript is dropped.
+    """
+    if isinstance(value, str):
+        return blob_store.replace_data_urls(value)
+    if isinstance(value, list):
+        return [strip_payloads(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    out = {k: strip_payloads(v) for k, v in value.items()}
+    if value.get("type") in ("input_audio", "audio") and value.get("audio"):
+        out["audio"] = None
+    return out
+
+
+def _item_hash(item: dict[str, Any]) -> str:
+    encoded = json.dumps(item, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class _Prepared(NamedTuple):
+    raw: Any  # shallow copy of the SDK item, to tell whether it changed
+    item: dict[str, Any]  # dumped and stripped
+    hash: str
+
+
+class HistoryTracker:
+    """
+    What one client has been sent of the conversation history.
+
+    Instead of a full history_updated snapshot per event, diff() returns only
+    the items that were added or changed since the last message (by item id and
+    content hash), the ids that disappeared, and the new order if it changed.
+    Messages carry a version and the version they apply on top of, so a client
+    that missed one can ask for a full snapshot (history_resync).
+
+    Each item is dumped, stripped and hashed once and then reused until the SDK
+    hands over a different version of it, so a history_updated event costs
+    work only for the items it touched, not for every screenshot sent so far.
+    """
+
+    def __init__(self):
+        self._prepared: dict[str, _Prepared] = {}
+        self._hashes: dict[str, str] = {}
+        self._order: list[str] = []
+        self.version = 0
+        self.stats = {"stripped": 0, "reused": 0}
+
+    def _prepare(self, history) -> list[_Prepared]:
+        prepared = {}
+        for item in history:
+            cached = self._prepared.get(item.item_id)
+            # The SDK replaces items when they change (new status, transcript,
+            # output) rather than mutating them, so field equality against a
+            # shallow copy is enough and costs no serialization
+            if cached is not None and cached.raw == item:
+                self.stats["reused"] += 1
+            else:
+                stripped = strip_payloads(item.model_dump(mode="json"))
+                cached = _Prepared(item.model_copy(), stripped, _item_hash(stripped))
+                self.stats["stripped"] += 1
+            prepared[item.item_id] = cached
+        self._prepared = prepared
+        return list(prepared.values())
+
+    def snapshot(self, history) -> dict[str, Any]:
+        """Full (stripped) history; resets the tracker to it."""
+        # Re-strip everything, which also puts any images evicted from the blob
+        # store since they were first sent back into it
+        self._prepared = {}
+        prepared = self._prepare(history)
+        self._hashes = {p.item["item_id"]: p.hash for p in prepared}
+        self._order = [p.item["item_id"] for p in prepared]
+        self.version += 1
+        return {
+            "type": "history_snapshot",
+            "version": self.version,
+            "history": [p.item for p in prepared],
+        }
+
+    def diff(self, history) -> Optional[dict[str, Any]]:
+        """
+        Changes since the last snapshot or diff.
+
+        Returns:
+            history_delta message, or None if nothing changed
+        """
+        prepared = self._prepare(history)
+        changed = []
+        hashes = {}
+        for p in prepared:
+            item_id = p.item["item_id"]
+            hashes[item_id] = p.hash
+            if self._hashes.get(item_id) != p.hash:
+                changed.append(p.item)
+        order = [p.item["item_id"] for p in prepared]
+        removed = [item_id for item_id in self._order if item_id not in hashes]
+
+        if not changed and not removed and order == self._order:
+            return None
+
+        delta: dict[str, Any] = {
+            "type": "history_delta",
+            "base": self.version,
+            "version": self.version + 1,
+            "items": changed,
+            "removed": removed,
+        }
+        # Items are normally appended; only send the order when it moved
+        if order != [i for i in self._order if i in hashes] + [
+            item["item_id"] for item in changed if item["item_id"] not in self._hashes
+        ]:
+            delta["order"] = order
+
+        self._hashes = hashes
+        self._order = order
+        self.version += 1
+        return delta
@@ -0,0 +1,370 @@
+import json
+import logging
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from windows import tokenize, trigrams
+
+logger = logging.getLogger("OTTO.launcher")
+
+# Where the application index is kept between runs
+APP_INDEX_PATH = Path(
+    os.getenv("OTTO_APP_INDEX", str(Path.home() / ".otto" / "app_index.json"))
+)
+# Names scoring below this (0-1) are not launched directly; the Start menu is used
+APP_MATCH_MIN_SCORE = float(os.getenv("OTTO_APP_MATCH_MIN_SCORE", "0.6"))
+# How long open_application waits for a directly launched app's window
+APP_LAUNCH_TIMEOUT = float(os.getenv("OTTO_APP_LAUNCH_TIMEOUT", "10"))
+
+INDEX_VERSION = 1
+_SHORTCUT_EXTENSIONS = {".lnk", ".url", ".appref-ms"}
+# Preferred source when several entries match equally well
+_KIND_RANK = {"shortcut": 3, "desktop": 3, "app_path": 2, "path": 1}
+# Score of an exact PATH executable name: above APP_MATCH_MIN_SCORE but below
+# any partial match on a shortcut or .desktop entry, which are real apps
+_PATH_EXACT_SCORE = 0.85
+# .desktop Exec field codes (%f, %U, ...) that stand for files/URLs
+_FIELD_CODE_RE = re.compile(r"%[fFuUdDnNickvm]")
+
+
+@dataclass
+class AppEntry:
+    """A launchable application."""
+
+    name: str
+    target: str  # shortcut, executable path, or command line for .desktop
+    kind: str  # "shortcut", "app_path", "path" or "desktop"
+
+    def describe(self) -> str:
+        return f"{self.name} ({self.kind}: {self.target})"
+
+
+def _start_menu_dirs() -> list[Path]:
+    dirs = []
+    for base in (os.getenv("APPDATA"), os.getenv("PROGRAMDATA")):
+        if base:
+            dirs.append(
+                Path(base) / "Microsoft" / "Windows" / "Start Menu" / "Programs"
+            )
+    return dirs
+
+
+def _desktop_dirs() -> list[Path]:
+    data_home = os.getenv("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    data_dirs = os.getenv("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+    return [Path(d) / "applications" for d in [data_home, *data_dirs] if d]
+
+
+def _path_dirs() -> list[Path]:
+    return [Path(d) for d in os.getenv("PATH", "").split(os.pathsep) if d]
+
+
+def _scan_shortcuts(directory: Path) -> list[AppEntry]:
+    return [
+        AppEntry(path.stem, str(path), "shortcut")
+        for path in directory.iterdir()
+        if path.suffix.lower() in _SHORTCUT_EXTENSIONS
+    ]
+
+
+def _parse_desktop_file(path: Path) -> Optional[AppEntry]:
+    fields: dict[str, str] = {}
+    in_entry = False
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        line = line.strip()
+        if line.startswith("["):
+            in_entry = line == "[Desktop Entry]"
+            continue
+        if in_entry and "=" in line:
+            key, _, value = line.partition("=")
+            fields.setdefault(key.strip(), value.strip())
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("NoDisplay", "").lower() == "true" or "Exec" not in fields:
+        return None
+    command = _FIELD_CODE_RE.sub("", fields["Exec"]).replace("%%", "%").strip()
+    return AppEntry(fields.get("Name", path.stem), command, "desktop")
+
+
+def _scan_desktop_files(directory: Path) -> list[AppEntry]:
+    entries = []
+    for path in directory.glob("*.desktop"):
+        try:
+            entry = _parse_desktop_file(path)
+        except OSError:
+            continue
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def _scan_executables(directory: Path) -> list[AppEntry]:
+    entries = []
+    if sys.platform == "win32":
+        extensions = {
+            ext.lower() for ext in os.getenv("PATHEXT", ".EXE;.BAT;.CMD").split(";")
+        }
+        for path in directory.iterdir():
+            if path.suffix.lower() in extensions:
+                entries.append(AppEntry(path.stem, str(path), "path"))
+    else:
+        for path in directory.iterdir():
+            if os.access(path, os.X_OK) and path.is_file():
+                entries.append(AppEntry(path.name, str(path), "path"))
+    return entries
+
+
+def _scan_app_paths() -> list[AppEntry]:
+    """Executables registered under App Paths (what Win+R resolves)."""
+    try:
+        import winreg
+    except ImportError:
+        return []
+    entries = []
+    key_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"
+    for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            key = winreg.OpenKey(root, key_path)
+        except OSError:
+            continue
+        with key:
+            for i in range(winreg.QueryInfoKey(key)[0]):
+                try:
+                    name = winreg.EnumKey(key, i)
+                    target = winreg.QueryValue(key, name)
+                except OSError:
+                    continue
+                if target:
+                    entries.append(
+                        AppEntry(Path(name).stem, target.strip('"'), "app_path")
+                    )
+    return entries
+
+
+class AppIndex:
+    """
+    Index of launchable applications, for opening apps without the Start menu.
+
+    Built from Start menu shortcuts, registered App Paths and executables on
+    PATH (Windows), or .desktop files and PATH (elsewhere). The index is saved
+    to APP_INDEX_PATH; on the next start it is loaded from there immediately
+    and refreshed in the background, rescanning only directories whose
+    modification time changed.
+    """
+
+    def __init__(self, path: Path = APP_INDEX_PATH):
+        self.path = path
+        # Scanned directory -> (mtime, entries found directly in it)
+        self._dirs: dict[str, tuple[float, list[AppEntry]]] = {}
+        self._registry: list[AppEntry] = []
+        self._entries: list[AppEntry] = []
+        self._names: list[str] = []
+        self._grams: list[set[str]] = []
+        self._lock = threading.Lock()
+        self.ready = threading.Event()
+        self.stats = {"dirs_scanned": 0, "dirs_reused": 0, "refresh_ms": 0}
+
+    def start(self) -> None:
+        """Load the saved index and refresh it on a background thread."""
+        self._load()
+        threading.Thread(
+            target=self._refresh_logged, name="otto-app-index", daemon=True
+        ).start()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._dirs = {
+            directory: (info["mtime"], [AppEntry(**e) for e in info["entries"]])
+            for directory, info in data.get("dirs", {}).items()
+        }
+        self._registry = [AppEntry(**e) for e in data.get("registry", [])]
+        self._rebuild()
+        logger.info(f"Loaded {len(self)} applications from {self.path}")
+
+    def _save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "dirs": {
+                directory: {"mtime": mtime, "entries": [asdict(e) for e in entries]}
+                for directory, (mtime, entries) in self._dirs.items()
+            },
+            "registry": [asdict(e) for e in self._registry],
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Could not save the application index: {e}")
+
+    def _refresh_logged(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Application index refresh failed: {e}")
+        finally:
+            self.ready.set()
+
+    def refresh(self) -> None:
+        """Rescan changed directories and the registry. Blocking."""
+        started = time.perf_counter()
+        self.stats.update(dirs_scanned=0, dirs_reused=0)
+        if sys.platform == "win32":
+            trees = [(d, _scan_shortcuts) for d in _start_menu_dirs()]
+        else:
+            trees = [(d, _scan_desktop_files) for d in _desktop_dirs()]
+        # PATH directories are not walked recursively
+        flat = [(d, _scan_executables) for d in _path_dirs()]
+
+        dirs: dict[str, tuple[float, list[AppEntry]]] = {}
+        for root, scan in trees:
+            for directory in self._walk(root):
+                self._scan_dir(directory, scan, dirs)
+        for directory, scan in flat:
+            self._scan_dir(directory, scan, dirs)
+        registry = _scan_app_paths()
+
+        with self._lock:
+            self._dirs = dirs
+            self._registry = registry
+            self._rebuild()
+        self._save()
+        self.stats["refresh_ms"] = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            f"Indexed {len(self)} applications in {self.stats['refresh_ms']} ms "
+            f"({self.stats['dirs_scanned']} directories scanned, "
+            f"{self.stats['dirs_reused']} unchanged)"
+        )
+
+    @staticmethod
+    def _walk(root: Path) -> list[Path]:
+        if not root.is_dir():
+            return []
+        return [root, *(p for p in root.rglob("*") if p.is_dir())]
+
+    def _scan_dir(self, directory: Path, scan, dirs) -> None:
+        key = str(directory)
+        try:
+            mtime = directory.stat().st_mtime
+        except OSError:
+            return
+        cached = self._dirs.get(key)
+        if cached is not None and cached[0] == mtime:
+            dirs[key] = cached
+            self.stats["dirs_reused"] += 1
+            return
+        try:
+            dirs[key] = (mtime, scan(directory))
+        except OSError as e:
+            logger.debug(f"Skipping {directory}: {e}")
+            return
+        self.stats["dirs_scanned"] += 1
+
+    def _rebuild(self) -> None:
+        entries = []
+        seen_commands = set()
+        scanned = [e for _, found in self._dirs.values() for e in found]
+        for entry in scanned + self._registry:
+            # Uninstallers are never what "open X" means
+            if "uninstall" in entry.name.casefold():
+                continue
+            # Like the shell, only the first executable of a name on PATH runs
+            if entry.kind == "path":
+                if entry.name in seen_commands:
+                    continue
+                seen_commands.add(entry.name)
+            entries.append(entry)
+        self._entries = entries
+        self._names = [e.name.casefold() for e in entries]
+        self._grams = [trigrams(e.name) for e in entries]
+
+    def find(self, name: str, limit: int = 5) -> list[tuple[AppEntry, float]]:
+        """
+        Rank applications by how well their name matches.
+
+        Returns:
+            Up to limit (AppEntry, score 0-1) pairs, best first
+        """
+        query = name.strip().casefold()
+        if not query:
+            return []
+        words = tokenize(query)
+        grams = trigrams(query)
+        with self._lock:
+            entries, names, entry_grams = self._entries, self._names, self._grams
+
+        scored = []
+        for i, entry_name in enumerate(names):
+            if entries[i].kind == "path":
+                # Command-line tools fill PATH; only launch one named exactly
+                if entry_name != query:
+                    continue
+                score = _PATH_EXACT_SCORE
+            elif entry_name == query:
+                score = 1.0
+            elif entry_name.startswith(query):
+                score = 0.95
+            elif query in entry_name:
+                score = 0.9
+            elif words and all(w in tokenize(entry_name) for w in words):
+                score = 0.8
+            else:
+                shared = len(grams & entry_grams[i])
+                if not shared:
+                    continue
+                # Same trigram score as window matching, so misspellings still hit
+                similarity = 2 * shared / (len(grams) + len(entry_grams[i]))
+                score = 0.75 * max(similarity, shared / len(grams))
+            # Equal scores prefer shortcuts, then earlier entries
+            scored.append((-score, -_KIND_RANK.get(entries[i].kind, 0), i))
+        scored.sort()
+        return [(entries[i], round(-score, 2)) for score, _, i in scored[:limit]]
+
+    def metrics(self) -> dict[str, Any]:
+        return {"apps": len(self), "ready": self.ready.is_set(), **self.stats}
+
+
+def launch(entry: AppEntry) -> None:
+    """Start an application without waiting for it. Blocking only briefly."""
+    if entry.kind == "desktop":
+        subprocess.Popen(
+            shlex.split(entry.target),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    elif sys.platform == "win32" and entry.kind in ("shortcut", "app_path"):
+        os.startfile(entry.target)  # resolves .lnk targets, arguments and working dir
+    elif sys.platform == "win32":
+        subprocess.Popen(
+            [entry.target],
+            creationflags=subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP,
+            close_fds=True,
+        )
+    else:
+        subprocess.Popen(
+            [entry.target],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("OTTO.outbound")
+
+# Messages waiting per session before producers of essential events block
+OUTBOUND_QUEUE_SIZE = int(os.getenv("OTTO_OUTBOUND_QUEUE_SIZE", "256"))
+
+# Priorities: audio and tool progress go out before everything else
+HIGH = 0
+NORMAL = 1
+# Event types sent with HIGH priority
+HIGH_PRIORITY_EVENTS = {
+    "audio",
+    "audio_interrupted",
+    "audio_end",
+    "tool_start",
+    "tool_end",
+    "error",
+}
+# Event types that may be dropped when the queue is full
+DROPPABLE_EVENTS = {"raw_model_event"}
+
+Message = Union[str, bytes]
+
+
+class OutboundQueue:
+    """
+    Bounded, prioritized outbound queue for one WebSocket, drained by a writer task.
+
+    The realtime session loop only enqueues, so a slow browser no longer stalls
+    it. Snapshot-style messages (e.g. history_updated) go into a latest-wins slot
+    and are built only when the writer gets to them, so superseded snapshots are
+    never serialized. Droppable messages are discarded when the queue is full;
+    everything else waits for room.
+    """
+
+    def __init__(self, websocket: WebSocket, maxsize: int = OUTBOUND_QUEUE_SIZE):
+        self._websocket = websocket
+        self.maxsize = maxsize
+        self._queues = {HIGH: deque(), NORMAL: deque()}
+        self._snapshots: dict[str, Callable[[], Awaitable[Optional[Message]]]] = {}
+        self._changed = asyncio.Condition()
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+        self.stats = {
+            "sent": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "max_depth": 0,
+            "producer_waits": 0,
+        }
+
+    @property
+    def depth(self) -> int:
+        return sum(len(q) for q in self._queues.values()) + len(self._snapshots)
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the writer; anything still queued is discarded."""
+        self._closed = True
+        async with self._changed:
+            self._changed.notify_all()
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def put(
+        self, message: Message, priority: int = NORMAL, droppable: bool = False
+    ) -> None:
+        """Queue a text or binary message, waiting for room unless droppable."""
+        async with self._changed:
+            if self.depth >= self.maxsize:
+                if droppable:
+                    self.stats["dropped"] += 1
+                    return
+                self.stats["producer_waits"] += 1
+                await self._changed.wait_for(
+                    lambda: self.depth < self.maxsize or self._closed
+                )
+            if self._closed:
+                return
+            self._queues[priority].append(message)
+            self._note_depth()
+            self._changed.notify_all()
+
+    async def put_snapshot(
+        self, key: str, build: Callable[[], Awaitable[Optional[Message]]]
+    ) -> None:
+        """Queue a snapshot, replacing any pending one with the same key."""
+        async with self._changed:
+            if self._closed:
+                return
+            if key in self._snapshots:
+                self.stats["coalesced"] += 1
+            self._snapshots[key] = build
+            self._note_depth()
+            self._changed.notify_all()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "high": len(self._queues[HIGH]),
+            "normal": len(self._queues[NORMAL]),
+            "snapshots": len(self._snapshots),
+            **self.stats,
+        }
+
+    def _note_depth(self) -> None:
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.depth)
+
+    async def _next(self) -> Optional[Message]:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.depth > 0 or self._closed)
+            if self._closed:
+                return None
+            for priority in (HIGH, NORMAL):
+                if self._queues[priority]:
+                    message = self._queues[priority].popleft()
+                    self._changed.notify_all()
+                    return message
+            key = next(iter(self._snapshots))
+            build = self._snapshots.pop(key)
+            self._changed.notify_all()
+        # Built outside the lock; a newer snapshot may be queued meanwhile
+        return await build()
+
+    async def _run(self) -> None:
+        try:
+            while not self._closed:
+                message = await self._next()
+                if message is None:
+                    continue
+                if isinstance(message, str):
+                    await self._websocket.send_text(message)
+                else:
+                    await self._websocket.send_bytes(message)
+                self.stats["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Outbound writer stopped: {e}")
+            self._closed = True
+            async with self._changed:
+                self._changed.notify_all()
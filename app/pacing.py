@@ -0,0 +1,93 @@
+import functools
+import inspect
+import logging
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from scheduler import current_session
+
+logger = logging.getLogger("OTTO.pacing")
+
+
+@dataclass(frozen=True)
+class PacingProfile:
+    """How long input injection waits, tuned separately per kind of delay."""
+
+    name: str
+    key_interval: float  # between keystrokes when typing key by key
+    action_pause: float  # after each injected mouse/keyboard/window action
+    menu_delay: float  # for the Start menu to open and show search results
+
+
+# Replaces the old blanket pyautogui.PAUSE = 0.5 after every primitive. Most
+# waiting is done by settle detection after an action, so these only cover
+# what it can't see (e.g. an app that hasn't registered a keystroke yet).
+PROFILES = {
+    "fast": PacingProfile("fast", key_interval=0.0, action_pause=0.0, menu_delay=0.4),
+    "normal": PacingProfile(
+        "normal", key_interval=0.01, action_pause=0.05, menu_delay=0.8
+    ),
+    "cautious": PacingProfile(
+        "cautious", key_interval=0.05, action_pause=0.5, menu_delay=1.5
+    ),
+}
+
+DEFAULT_PACING = os.getenv("OTTO_PACING", "normal").strip().lower()
+if DEFAULT_PACING not in PROFILES:
+    logger.warning(f"Unknown OTTO_PACING '{DEFAULT_PACING}', using 'normal'")
+    DEFAULT_PACING = "normal"
+
+# Profile chosen by each session (see set_session_pacing), and a per-call
+# override set by the with_pacing decorator for the duration of one tool call
+_session_profiles: dict[str, str] = {}
+_call_profile: ContextVar[Optional[str]] = ContextVar("otto_pacing", default=None)
+
+
+def resolve_pacing(name: Optional[str]) -> Optional[PacingProfile]:
+    """Profile for a name, or None if it isn't one."""
+    return PROFILES.get((name or "").strip().lower())
+
+
+def set_session_pacing(session_id: str, name: Optional[str]) -> bool:
+    """Choose a session's profile (None resets it); False if name is unknown."""
+    if name is None:
+        _session_profiles.pop(session_id, None)
+        return True
+    profile = resolve_pacing(name)
+    if profile is None:
+        return False
+    _session_profiles[session_id] = profile.name
+    return True
+
+
+def current_pacing() -> PacingProfile:
+    """Profile for the running tool call: per call, else per session, else default."""
+    for name in (
+        _call_profile.get(),
+        _session_profiles.get(current_session.get()),
+        DEFAULT_PACING,
+    ):
+        profile = resolve_pacing(name)
+        if profile is not None:
+            return profile
+    return PROFILES["normal"]
+
+
+def with_pacing(func):
+    """Let a tool's optional `pacing` argument override the profile for that call."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        name = signature.bind_partial(*args, **kwargs).arguments.get("pacing")
+        if name and resolve_pacing(name) is None:
+            return f"Unknown pacing profile '{name}'; use one of: {', '.join(PROFILES)}"
+        token = _call_profile.set(name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _call_profile.reset(token)
+
+    return wrapper
@@ -1,15 +1,39 @@
+import asyncio
+import functools
 import logging
-import time
 import pyautogui
 import keyboard
 import os
 import base64
-import cv2
+import time
 import numpy as np
 import pywinctl as pwc
 from io import BytesIO
+from typing import Literal, Optional
 from PIL import Image
 from agents import function_tool
+from pydantic import BaseModel
+
+from capture import ScreenCaptureService
+from capture_backends import CaptureBackend, region_around, select_backend
+from diff import changed_regions
+from encoder import EncodedImage, resolve_options, with_image_preset
+from executor import run_cpu, run_io
+from launcher import APP_LAUNCH_TIMEOUT, APP_MATCH_MIN_SCORE, AppIndex, launch
+from pacing import current_pacing, with_pacing
+from scheduler import input_action, read_action
+from settle import wait_for_settle
+from textinput import (
+    METHOD_NAMES,
+    enter_text,
+    resolve_method,
+    unknown_method_message,
+)
+from waits import WINDOW_STATES
+from waits import wait_for_change as _wait_for_change
+from waits import wait_for_window as _wait_for_window
+from similarity import compare_frames, crop_frame, frame_hash
+from windows import WindowSnapshotService
 
 # Set up logging
 logging.basicConfig(
@@ -19,65 +43,435 @@ logger = logging.getLogger("OTTO.pc_tools")
 
 # Configure PyAutoGUI for safety
 pyautogui.FAILSAFE = True  # Move mouse to top-left corner to abort
-pyautogui.PAUSE = 0.5  # Add pause between PyAutoGUI commands
+pyautogui.PAUSE = 0  # Delays come from the pacing profile instead (see _inject)
+
+# Shared desktop services, created on first use (or by start_desktop_services)
+# so importing this module does not benchmark grabbers or scan for apps
+_capture_backend: Optional[CaptureBackend] = None
+_screen_capture: Optional[ScreenCaptureService] = None
+_window_snapshots: Optional[WindowSnapshotService] = None
+_app_index: Optional[AppIndex] = None
+
+
+def _get_capture_backend() -> CaptureBackend:
+    # Fastest available grabber (DXGI/mss/pyautogui), picked once
+    global _capture_backend
+    if _capture_backend is None:
+        _capture_backend = select_backend()
+    return _capture_backend
+
+
+def _get_screen_capture() -> ScreenCaptureService:
+    # One capture service for all tools so consecutive tools share frames
+    global _screen_capture
+    if _screen_capture is None:
+        _screen_capture = ScreenCaptureService(_get_capture_backend().grab)
+    return _screen_capture
+
+
+def _get_window_snapshots() -> WindowSnapshotService:
+    # Window list shared by the window tools, re-read at most once per TTL
+    global _window_snapshots
+    if _window_snapshots is None:
+        _window_snapshots = WindowSnapshotService(
+            pwc.getAllWindows, pwc.getActiveWindow
+        )
+    return _window_snapshots
 
-# Correction Utilities
 
+def _get_app_index() -> AppIndex:
+    # Installed applications, loaded from disk and refreshed in the background, so
+    # open_application can start programs directly instead of via the Start menu
+    global _app_index
+    if _app_index is None:
+        _app_index = AppIndex()
+        _app_index.start()
+    return _app_index
 
-def is_similar_image(img1_data, img2_data, threshold=0.95):
+
+def start_desktop_services() -> None:
+    """Pick the capture backend and start indexing apps. Called at server startup."""
+    _get_screen_capture()
+    _get_window_snapshots()
+    _get_app_index()
+
+
+def desktop_metrics() -> dict:
+    """Cache and index counters for the shared desktop services (GET /metrics)."""
+    return {
+        "capture": {
+            "backend": _get_capture_backend().name,
+            **_get_screen_capture().metrics(),
+        },
+        "windows": _get_window_snapshots().metrics(),
+        "apps": _get_app_index().metrics(),
+    }
+
+
+# "delta" sends only the changed parts of the "after" screenshot, "full" the whole frame
+AFTER_SCREENSHOT_MODE = os.getenv("OTTO_AFTER_SCREENSHOT", "delta").strip().lower()
+
+# "window" makes the tools that support it capture only the active (or target)
+# window plus a margin instead of the whole screen; "screen" is the default
+CAPTURE_SCOPE = os.getenv("OTTO_CAPTURE_SCOPE", "screen").strip().lower()
+WINDOW_MARGIN = int(os.getenv("OTTO_WINDOW_MARGIN", "24"))
+
+# Every tool is async and runs on the server's event loop, so all blocking
+# pyautogui/keyboard/pywinctl calls go through run_io (input injection through
+# _inject, which also invalidates the frame cache) and screenshots through the
+# capture service, which encodes on the CPU pool. Tools are wrapped in
+# input_action/read_action (scheduler.py) so that sessions sharing this desktop
+# take turns with the mouse and keyboard.
+
+
+async def _capture_encoded(region=None, options=None) -> EncodedImage:
     """
-    Compare two images to see if they are similar.
+    Grab (or reuse) the screen and encode it through the shared capture service.
 
     Args:
-        img1_data: First image as a base64 string or PIL Image
-        img2_data: Second image as a base64 string or PIL Image
-        threshold: Similarity threshold (higher means more similar)
+        region: Optional (left, top, width, height) tuple
+        options: EncodeOptions; defaults to the tool call's image_preset
 
     Returns:
-        Boolean indicating if images are similar
+        EncodedImage with the data URL and size/timing metadata
+    """
+    return await _get_screen_capture().capture(region=region, options=options)
+
+
+async def _encode(image, options=None) -> EncodedImage:
+    """Encode an already captured frame, reusing cached encodings."""
+    return await _get_screen_capture().encode(image, options)
+
+
+async def _inject(func, *args, **kwargs):
+    """
+    Run an input-injecting call (mouse, keyboard, window change) on the I/O pool,
+    pause for the pacing profile's action_pause, and drop the cached frame and
+    window list, since both are about to change.
     """
+    _get_screen_capture().invalidate()
+    _get_window_snapshots().invalidate()
     try:
-        if isinstance(img1_data, str) and img1_data.startswith("data:image"):
-            # Extract base64 data after the comma
-            img1_base64 = img1_data.split(",")[1]
-            img1_bytes = base64.b64decode(img1_base64)
-            img1 = Image.open(BytesIO(img1_bytes))
-        elif isinstance(img1_data, Image.Image):
-            img1 = img1_data
-        else:
-            return False
+        result = await run_io(func, *args, **kwargs)
+        pause = current_pacing().action_pause
+        if pause:
+            await asyncio.sleep(pause)
+        return result
+    finally:
+        _get_screen_capture().invalidate()
+        _get_window_snapshots().invalidate()
 
-        if isinstance(img2_data, str) and img2_data.startswith("data:image"):
-            img2_base64 = img2_data.split(",")[1]
-            img2_bytes = base64.b64decode(img2_base64)
-            img2 = Image.open(BytesIO(img2_bytes))
-        elif isinstance(img2_data, Image.Image):
-            img2 = img2_data
-        else:
-            return False
 
-        # Convert to numpy arrays
-        img1_np = np.array(img1)
-        img2_np = np.array(img2)
+async def _wait_for_settle(region=None, **kwargs):
+    """
+    Wait for the screen (or a region of it) to settle. A full-screen result is
+    kept as the cached frame.
+    """
+    if region is None:
+        settle = await wait_for_settle(_get_capture_backend().grab, **kwargs)
+        _get_screen_capture().store(settle.frame)
+    else:
+        grab = functools.partial(_get_capture_backend().grab, region)
+        settle = await wait_for_settle(grab, **kwargs)
+    return settle
+
+
+async def _capture_before(region=None):
+    """Grab (or reuse) the pre-action frame; returns (raw frame, EncodedImage)."""
+    frame = await _get_screen_capture().grab(region)
+    return frame, await _encode(frame)
+
+
+def _window_region(window=None, point=None):
+    """
+    Screen region covering a window (the active one by default) plus
+    WINDOW_MARGIN, clipped to the monitor it is on. Blocking; call via run_io.
+
+    Returns:
+        (left, top, width, height), or None if there is no usable window or it
+        does not contain point
+    """
+    window = window or pwc.getActiveWindow()
+    if window is None or window.isMinimized:
+        return None
+    return region_around(
+        tuple(window.box), _get_capture_backend().monitors(), WINDOW_MARGIN, point
+    )
+
+
+async def _capture_region(window_only=None, window=None, point=None):
+    """
+    Pick the capture region for a tool call.
+
+    Args:
+        window_only: Capture just the window; None follows OTTO_CAPTURE_SCOPE
+        window: Window to focus on; defaults to the active window
+        point: Screen point the region must contain (e.g. a click target)
 
-        # Convert to grayscale
-        img1_gray = cv2.cvtColor(img1_np, cv2.COLOR_RGB2GRAY)
-        img2_gray = cv2.cvtColor(img2_np, cv2.COLOR_RGB2GRAY)
+    Returns:
+        (left, top, width, height), or None for the whole screen
+    """
+    if window_only is None:
+        window_only = CAPTURE_SCOPE == "window"
+    if not window_only:
+        return None
+    try:
+        return await run_io(_window_region, window, point)
+    except Exception as e:
+        logger.warning(f"Could not get the window region, capturing the screen: {e}")
+        return None
 
-        # Calculate structural similarity index
-        score, _ = cv2.compareHist(
-            cv2.calcHist([img1_gray], [0], None, [256], [0, 256]),
-            cv2.calcHist([img2_gray], [0], None, [256], [0, 256]),
-            cv2.HISTCMP_CORREL,
+
+def _region_note(region) -> str:
+    """Tell the model where a window-only screenshot sits on the screen."""
+    if region is None:
+        return ""
+    left, top, width, height = region
+    return (
+        f"\n(Screenshots show only the window area at ({left}, {top}), size "
+        f"{width}x{height}; add ({left}, {top}) to image coordinates, after scaling "
+        f"them as stated above, to get screen coordinates)"
+    )
+
+
+async def _after_view(prefix, before, after, region=None):
+    """
+    Describe the post-action screen relative to the pre-action frame.
+
+    In delta mode only the changed regions of the "after" frame are sent, as
+    cropped patches with their screen coordinates, or a note that nothing
+    changed. Falls back to the full frame when most of the screen changed.
+
+    Args:
+        prefix: Sentence start, e.g. "After typing 'hello'"
+        before: Raw frame captured before the action
+        after: Raw frame captured after the action
+        region: Screen region both frames cover, or None for the whole screen
+
+    Returns:
+        (text for the tool result, {name: EncodedImage} for _image_stats)
+    """
+    if AFTER_SCREENSHOT_MODE == "delta":
+        regions = await run_cpu(changed_regions, before, after)
+        if regions == []:
+            return f"{prefix}, there is no visible change on the screen yet.", {}
+        if regions:
+            origin_x, origin_y = region[:2] if region else (0, 0)
+            text = f"{prefix}, only these parts of the screen changed:\n"
+            images = {}
+            for i, (left, top, width, height) in enumerate(regions, 1):
+                patch = await _encode(crop_frame(after, (left, top, width, height)))
+                left, top = left + origin_x, top + origin_y
+                text += f"Region {i} at ({left}, {top}), size {width}x{height}:\n"
+                text += f"{patch.data_url}\n"
+                images[f"after_region_{i}"] = patch
+            return text.rstrip("\n"), images
+
+    after_img = await _encode(after)
+    if region is not None:
+        prefix += ", here's the window area now"
+    else:
+        prefix += ", here's what I see now"
+    return f"{prefix}:\n{after_img.data_url}", {
+        "after": after_img
+    }
+
+
+def _image_stats(**images) -> str:
+    """
+    One-line summary of encoded screenshots, e.g. format, size and encode time,
+    plus the factor that turns coordinates in downscaled images into screen
+    coordinates.
+    """
+    stats = "; ".join(
+        f"{name.replace('_', ' ')}: {img.metadata()}" for name, img in images.items()
+    )
+    result = f"(Screenshots - {stats})"
+    scales = {}
+    for name, img in images.items():
+        if abs(img.scale - 1.0) >= 0.01:
+            scales.setdefault(round(img.scale, 2), []).append(name.replace("_", " "))
+    for scale, names in scales.items():
+        which = " and ".join([", ".join(names[:-1]), names[-1]] if names[1:] else names)
+        result += (
+            f"\n(The {which} image{'s are' if len(names) > 1 else ' is'} "
+            f"scaled down: multiply image coordinates by {scale:.2f} to get screen "
+            f"coordinates. Positions written in the text are already screen coordinates)"
         )
+    return result
 
-        return score >= threshold
+
+def _skipped_note(snapshot) -> str:
+    if not snapshot.errors:
+        return ""
+    return f"({snapshot.errors} window(s) closed while being listed were skipped)\n"
+
+
+def _find_window(title_pattern):
+    """
+    Look up the best window for a title pattern (ranked by the window index).
+    Fuzzy matches don't count: the tools using this close, hide and move
+    windows, so a window whose title merely resembles the pattern is never
+    acted on (see _no_window_message). Blocking; call via run_io.
+
+    Returns:
+        (window, display title) or (None, None) if nothing matches well enough
+    """
+    snapshot = _get_window_snapshots().get()
+    matches = [m for m in snapshot.find(title_pattern, limit=3) if m.strong]
+    if not matches:
+        return None, None
+    best = matches[0]
+    if best.how not in ("exact", "prefix", "substring"):
+        logger.info(
+            f"'{title_pattern}' matched by {best.how}: "
+            + ", ".join(f"'{m.record.display_title}' ({m.score})" for m in matches)
+        )
+    return best.record.window, best.record.display_title
+
+
+def _no_window_message(title_pattern) -> str:
+    """
+    Result for a pattern _find_window found no window for, listing the closest
+    titles so the model can call again with the one it meant. Blocking; call
+    via run_io.
+    """
+    matches = _get_window_snapshots().get().find(title_pattern, limit=3)
+    if not matches:
+        return f"No windows found matching title pattern: '{title_pattern}'"
+    candidates = "\n".join(
+        f"- '{m.record.display_title}' ({m.record.app}, similarity {m.score:.2f})"
+        for m in matches
+    )
+    return (
+        f"No window title matches '{title_pattern}'. Similar titles:\n{candidates}\n"
+        f"If one of these is the window you meant, call again with its title."
+    )
+
+
+async def _activate(window):
+    """Restore a window if it is minimized, then bring it to the front."""
+    if await run_io(lambda: window.isMinimized):
+        await _inject(window.restore)
+        await _wait_for_settle(timeout=1.0)
+
+    await _inject(window.activate)
+
+
+def _press_key_sync(key):
+    """Press a key, using keyboard for combinations like 'ctrl+s'. Blocking."""
+    if "+" in key:
+        keyboard.press_and_release(key)
+    else:
+        pyautogui.press(key)
+
+
+async def _open_via_start_menu(app_name):
+    """Open an application by typing its name into the Start menu."""
+    pacing = current_pacing()
+    await _inject(pyautogui.press, "win")
+    await asyncio.sleep(pacing.menu_delay)
+    await _inject(pyautogui.write, app_name, interval=pacing.key_interval)
+    await asyncio.sleep(pacing.menu_delay)
+    await _inject(pyautogui.press, "enter")
+
+
+async def _launch_direct(app_name):
+    """
+    Start an application from the app index and wait for its window: a new
+    one, or an existing one brought to the front (single-instance apps).
+
+    Returns:
+        (AppEntry, seconds until its window appeared or None on timeout), or
+        None if no indexed application matches well enough or launching failed
+    """
+    matches = _get_app_index().find(app_name, limit=1)
+    if not matches or matches[0][1] < APP_MATCH_MIN_SCORE:
+        return None
+    entry, score = matches[0]
+    snapshot = await run_io(_get_window_snapshots().get)
+    known = {r.handle for r in snapshot.records}
+    active = snapshot.active.handle if snapshot.active else None
+    logger.info(f"Launching {entry.describe()} (match {score})")
+    started = time.perf_counter()
+    try:
+        await _inject(launch, entry)
+    except OSError as e:
+        logger.warning(f"Direct launch of {entry.name} failed: {e}")
+        return None
+
+    # Poll the window list rather than the screen: a new handle is the app's
+    # window, even before it has finished drawing
+    while time.perf_counter() - started < APP_LAUNCH_TIMEOUT:
+        snapshot = await run_io(_get_window_snapshots().get, 0.1)
+        now_active = snapshot.active.handle if snapshot.active else None
+        if now_active != active or any(
+            r.handle not in known for r in snapshot.records
+        ):
+            return entry, time.perf_counter() - started
+        await asyncio.sleep(0.1)
+    logger.info(f"{entry.name} showed no window within {APP_LAUNCH_TIMEOUT:g} s")
+    return entry, None
+
+
+async def _type(text, method=None):
+    """Enter text with textinput's engine at the current pacing; returns TypingResult."""
+    return await _inject(enter_text, text, method, current_pacing().key_interval)
+
+
+# Correction Utilities
+
+
+def _decode_image(img_data):
+    """Accept a data URL string, PIL Image or array; return something compare_frames takes."""
+    if isinstance(img_data, str) and img_data.startswith("data:image"):
+        # Extract base64 data after the comma
+        img_bytes = base64.b64decode(img_data.split(",")[1])
+        return Image.open(BytesIO(img_bytes))
+    if isinstance(img_data, (Image.Image, np.ndarray)):
+        return img_data
+    return None
+
+
+def is_similar_image(img1_data, img2_data, threshold=0.95):
+    """
+    Compare two images to see if they are similar.
+
+    Uses the spatial comparison in similarity.compare_frames, so a window that
+    moved counts as a change even though the colours on screen are the same.
+
+    Args:
+        img1_data: First image as a base64 data URL, PIL Image or array
+        img2_data: Second image as a base64 data URL, PIL Image or array
+        threshold: Similarity threshold (higher means more similar)
+
+    Returns:
+        Boolean indicating if images are similar
+    """
+    try:
+        img1 = _decode_image(img1_data)
+        img2 = _decode_image(img2_data)
+        if img1 is None or img2 is None:
+            return False
+        return compare_frames(img1, img2, threshold=threshold).similar
     except Exception as e:
         logger.error(f"Error comparing images: {e}")
         return False
 
 
+async def _change_check(before, after) -> str:
+    """Tell the model how much of the screen an action changed."""
+    comparison = await run_cpu(compare_frames, before, after)
+    if comparison.changed_fraction == 0:
+        return (
+            "(Change check: the screen looks the same as before, "
+            "so the action may not have had any effect)"
+        )
+    return f"(Change check: {comparison.summary()})"
+
+
 @function_tool
+@input_action
 async def undo_last_action() -> str:
     """
     Attempt to undo the last action, such as pressing Ctrl+Z or going back.
@@ -87,29 +481,25 @@ async def undo_last_action() -> str:
     """
     try:
         # Capture screen before undo
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
+        before, before_img = await _capture_before()
 
         # Try common undo methods
         logger.info("Attempting to undo last action with Ctrl+Z")
-        keyboard.press_and_release("ctrl+z")
-
-        # Wait for UI to update
-        time.sleep(1.5)
+        await _inject(keyboard.press_and_release, "ctrl+z")
 
-        # Capture screen after undo
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            "After trying to undo", before, settle.frame
+        )
 
         # Build result with before and after screenshots
         result = f"I'm attempting to undo the last action. Here's what I see on the screen first:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After trying to undo, here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{await _change_check(before, settle.frame)}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
 
         return result
     except Exception as e:
@@ -118,6 +508,7 @@ async def undo_last_action() -> str:
 
 
 @function_tool
+@input_action
 async def try_alternate_action(
     action_type: str, original_params: str, alternate_params: str
 ) -> str:
@@ -134,10 +525,7 @@ async def try_alternate_action(
     """
     try:
         # Capture screen before alternate action
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
+        before, before_img = await _capture_before()
 
         result_message = ""
 
@@ -147,7 +535,7 @@ async def try_alternate_action(
             try:
                 x, y = map(int, alternate_params.split(","))
                 logger.info(f"Trying alternate click at: ({x}, {y})")
-                pyautogui.click(x, y)
+                await _inject(pyautogui.click, x, y)
                 result_message = f"Tried alternate click at position ({x}, {y})"
             except ValueError:
                 result_message = (
@@ -156,39 +544,29 @@ async def try_alternate_action(
 
         elif action_type.lower() == "type":
             logger.info(f"Trying alternate text: {alternate_params}")
-            pyautogui.write(alternate_params)
+            await _type(alternate_params)
             result_message = f"Tried typing alternate text: '{alternate_params}'"
 
         elif action_type.lower() == "open":
             logger.info(f"Trying to open alternate application: {alternate_params}")
-            pyautogui.press("win")
-            time.sleep(1)
-            pyautogui.write(alternate_params)
-            time.sleep(1)
-            pyautogui.press("enter")
+            await _open_via_start_menu(alternate_params)
             result_message = (
                 f"Tried opening alternate application: '{alternate_params}'"
             )
 
         elif action_type.lower() == "key":
             logger.info(f"Trying alternate key press: {alternate_params}")
-            if "+" in alternate_params:
-                keyboard.press_and_release(alternate_params)
-            else:
-                pyautogui.press(alternate_params)
+            await _inject(_press_key_sync, alternate_params)
             result_message = f"Tried pressing alternate key: '{alternate_params}'"
 
         else:
             return f"Unknown action type: {action_type}"
 
-        # Wait for UI to update
-        time.sleep(1.5)
-
-        # Capture screen after alternate action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            "After the alternate action", before, settle.frame
+        )
 
         # Build result with before and after screenshots
         result = (
@@ -196,9 +574,11 @@ async def try_alternate_action(
         )
         result += f"I'm trying an alternative approach: {result_message}\n\n"
         result += f"Before the alternate action, here's what I saw:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After the alternate action, here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{await _change_check(before, settle.frame)}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
 
         return result
     except Exception as e:
@@ -210,6 +590,7 @@ async def try_alternate_action(
 
 
 @function_tool
+@input_action
 async def navigate_to_previous_state(method: str = "back") -> str:
     """
     Navigate back to a previous state or location.
@@ -222,52 +603,48 @@ async def navigate_to_previous_state(method: str = "back") -> str:
     """
     try:
         # Capture screen before navigation
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
+        before, before_img = await _capture_before()
 
         # Execute navigation based on method
         if method.lower() == "back":
             logger.info("Navigating back with Alt+Left")
-            keyboard.press_and_release("alt+left")
+            await _inject(keyboard.press_and_release, "alt+left")
             action_taken = "Pressed Alt+Left to go back"
         elif method.lower() == "alt+tab":
             logger.info("Switching to previous window with Alt+Tab")
-            keyboard.press_and_release("alt+tab")
+            await _inject(keyboard.press_and_release, "alt+tab")
             action_taken = "Pressed Alt+Tab to switch to previous window"
         elif method.lower() == "esc":
             logger.info("Pressing Escape key")
-            pyautogui.press("escape")
+            await _inject(pyautogui.press, "escape")
             action_taken = "Pressed Escape to cancel/close dialog"
         elif method.lower() == "cancel":
             logger.info("Looking for and clicking 'Cancel' button")
             # This is simplified - ideally would use image recognition to find cancel button
             # For now, just press Escape as fallback
-            pyautogui.press("escape")
+            await _inject(pyautogui.press, "escape")
             action_taken = "Tried to cancel the current operation"
         else:
             logger.info(f"Unknown navigation method: {method}, using Escape as default")
-            pyautogui.press("escape")
+            await _inject(pyautogui.press, "escape")
             action_taken = f"Unknown method '{method}', pressed Escape instead"
 
-        # Wait for UI to update
-        time.sleep(1.5)
-
-        # Capture screen after navigation
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            "After navigation", before, settle.frame
+        )
 
         # Build result with before and after screenshots
         result = (
             f"I'm attempting to navigate to the previous state using: {action_taken}.\n"
         )
         result += "Here's what I see on the screen before navigation:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += "After navigation, here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{await _change_check(before, settle.frame)}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
 
         return result
     except Exception as e:
@@ -290,16 +667,18 @@ async def retry_with_delay(
     Returns:
         Status message with before and after screenshots
     """
+    # Sleep before taking the input slot, so other sessions' actions aren't
+    # held up by this one's delay
+    logger.info(f"Waiting {delay_seconds} seconds before retrying action")
+    await asyncio.sleep(delay_seconds)
+    return await _retry_action(action_type, params, delay_seconds)
+
+
+@input_action
+async def _retry_action(action_type: str, params: str, delay_seconds: int) -> str:
     try:
         # Capture screen before retry
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-
-        # Wait the specified delay time
-        logger.info(f"Waiting {delay_seconds} seconds before retrying action")
-        time.sleep(delay_seconds)
+        before, before_img = await _capture_before()
 
         result_message = ""
 
@@ -308,33 +687,26 @@ async def retry_with_delay(
             try:
                 x, y = map(int, params.split(","))
                 logger.info(f"Retrying click at: ({x}, {y})")
-                pyautogui.click(x, y)
+                await _inject(pyautogui.click, x, y)
                 result_message = f"Retried click at position ({x}, {y}) after {delay_seconds} second delay"
             except ValueError:
                 result_message = f"Could not parse click coordinates: {params}"
 
         elif action_type.lower() == "type":
             logger.info(f"Retrying typing text: {params}")
-            pyautogui.write(params)
+            await _type(params)
             result_message = (
                 f"Retried typing text: '{params}' after {delay_seconds} second delay"
             )
 
         elif action_type.lower() == "open":
             logger.info(f"Retrying opening application: {params}")
-            pyautogui.press("win")
-            time.sleep(1)
-            pyautogui.write(params)
-            time.sleep(1)
-            pyautogui.press("enter")
+            await _open_via_start_menu(params)
             result_message = f"Retried opening application: '{params}' after {delay_seconds} second delay"
 
         elif action_type.lower() == "key":
             logger.info(f"Retrying key press: {params}")
-            if "+" in params:
-                keyboard.press_and_release(params)
-            else:
-                pyautogui.press(params)
+            await _inject(_press_key_sync, params)
             result_message = (
                 f"Retried pressing key: '{params}' after {delay_seconds} second delay"
             )
@@ -342,22 +714,21 @@ async def retry_with_delay(
         else:
             return f"Unknown action type: {action_type}"
 
-        # Wait for UI to update
-        time.sleep(1.5)
-
-        # Capture screen after retry
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            "After retrying", before, settle.frame
+        )
 
         # Build result with before and after screenshots
         result = f"The previous action may have failed due to timing issues.\n"
         result += f"{result_message}\n\n"
         result += "Before retrying, here's what I saw:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += "After retrying, here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{await _change_check(before, settle.frame)}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
 
         return result
     except Exception as e:
@@ -366,44 +737,66 @@ async def retry_with_delay(
 
 
 @function_tool
-async def open_application(app_name: str) -> str:
+@input_action
+@with_pacing
+@with_image_preset
+async def open_application(
+    app_name: str, pacing: str = None, image_preset: str = None
+) -> str:
     """
-    Open a desktop application.
+    Open a desktop application. Installed apps are started directly and the
+    call returns once their window appears; otherwise the Start menu is used.
 
     Args:
         app_name: Name of the application to open
+        pacing: Optional input speed for this call: 'fast', 'normal' or 'cautious'
+            (for slow or busy apps); defaults to the session setting
+        image_preset: Optional encoding for this call's screenshots: 'lossless',
+            'high', 'balanced', 'fast' or 'compact'
     """
     try:
         # Capture screen before action
         logger.info(f"Capturing screen before opening application: {app_name}")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
+        before = await _get_screen_capture().grab()
+        before_img = await _encode(before)
+        baseline = await run_cpu(frame_hash, before)
 
         # Perform the action
         logger.info(f"Opening application: {app_name}")
-        pyautogui.press("win")
-        time.sleep(1)
-        pyautogui.write(app_name)
-        time.sleep(1)
-        pyautogui.press("enter")
-
-        # Wait for application to open
-        time.sleep(2)
+        launched = await _launch_direct(app_name)
+        if launched is None:
+            # Nothing indexed matched, or starting it failed
+            await _open_via_start_menu(app_name)
+            how = "Opened through the Start menu."
+        else:
+            entry, window_seconds = launched
+            how = f"Launched {entry.describe()} directly; "
+            # A slow app (cold start, large IDE) is still launching; opening it
+            # again through the Start menu would start a second instance
+            how += (
+                f"its window appeared after {window_seconds:.2f} s."
+                if window_seconds is not None
+                else f"its window has not appeared after {APP_LAUNCH_TIMEOUT:g} s, "
+                "so it may still be starting; wait for it instead of opening it again."
+            )
 
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+        # Wait for the application window to finish drawing. Once the Start
+        # menu closes the screen matches "before" again, so require a change.
+        settle = await _wait_for_settle(
+            timeout=5.0, require_change=True, baseline=baseline
+        )
+        after_text, after_images = await _after_view(
+            f"After attempting to open {app_name}", before, settle.frame
+        )
 
         result = (
             f"I'm about to open {app_name}. Here's what I see on the screen first:\n"
         )
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After attempting to open {app_name}, here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{how}"
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
 
         return result
 
@@ -413,7 +806,17 @@ async def open_application(app_name: str) -> str:
 
 
 @function_tool
-async def click_at_position(x: int = None, y: int = None, element: str = None) -> str:
+@input_action
+@with_pacing
+@with_image_preset
+async def click_at_position(
+    x: int = None,
+    y: int = None,
+    element: str = None,
+    window_only: bool = None,
+    pacing: str = None,
+    image_preset: str = None,
+) -> str:
     """
     Click at specific screen coordinates or on an interface element.
 
@@ -421,14 +824,19 @@ async def click_at_position(x: int = None, y: int = None, element: str = None) -
         x: X coordinate
         y: Y coordinate
         element: Description of UI element to click (e.g., 'File menu', 'Save button')
+        window_only: Capture only the active window instead of the whole screen
+            (used when the click lands inside it); defaults to the server setting
+        pacing: Optional input speed for this call: 'fast', 'normal' or 'cautious'
+            (for slow or busy apps); defaults to the session setting
+        image_preset: Optional encoding for this call's screenshots: 'lossless',
+            'high', 'balanced', 'fast' or 'compact'
     """
     try:
         # First capture the screen before clicking
         logger.info("Capturing screen before clicking")
-        pre_screenshot = pyautogui.screenshot()
-        pre_buffered = BytesIO()
-        pre_screenshot.save(pre_buffered, format="PNG")
-        pre_img_str = base64.b64encode(pre_buffered.getvalue()).decode()
+        point = (x, y) if x is not None and y is not None else None
+        region = await _capture_region(window_only, point=point)
+        before, pre_img = await _capture_before(region)
 
         # Determine click action info
         if x is not None and y is not None:
@@ -441,32 +849,28 @@ async def click_at_position(x: int = None, y: int = None, element: str = None) -
         # Perform the click action
         if x is not None and y is not None:
             logger.info(f"Clicking at position: ({x}, {y})")
-            pyautogui.click(x, y)
+            await _inject(pyautogui.click, x, y)
         elif element is not None:
             logger.info(f"Trying to find and click on element: {element}")
             # This functionality is limited for now
 
-        # Wait for UI to update
-        time.sleep(1.5)
-
-        # Capture the screen after clicking
-        post_screenshot = pyautogui.screenshot()
-        post_buffered = BytesIO()
-        post_screenshot.save(post_buffered, format="PNG")
-        post_img_str = base64.b64encode(post_buffered.getvalue()).decode()
-
-        # Build result with before and after screenshots
-        result = f"{click_info}. Here's what I see on the screen first:\n"
-        result += f"data:image/png;base64,{pre_img_str}\n\n"
-
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle(region)
         if x is not None and y is not None:
-            result += f"After clicking at position ({x}, {y}), here's what I see now:\n"
+            after_prefix = f"After clicking at position ({x}, {y})"
         else:
-            result += (
-                f"After attempting to click on {element}, here's what I see now:\n"
-            )
+            after_prefix = f"After attempting to click on {element}"
+        after_text, after_images = await _after_view(
+            after_prefix, before, settle.frame, region
+        )
 
-        result += f"data:image/png;base64,{post_img_str}"
+        # Build result with before and after screenshots
+        result = f"{click_info}. Here's what I see on the screen first:\n"
+        result += f"{pre_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=pre_img, **after_images)}"
+        result += _region_note(region)
 
         return result
 
@@ -476,42 +880,59 @@ async def click_at_position(x: int = None, y: int = None, element: str = None) -
 
 
 @function_tool
-async def type_text(text: str) -> str:
+@input_action
+@with_pacing
+@with_image_preset
+async def type_text(
+    text: str,
+    window_only: bool = None,
+    method: str = None,
+    pacing: str = None,
+    image_preset: str = None,
+) -> str:
     """
     Type text using the keyboard.
 
     Args:
-        text: The text to type
+        text: The text to type (any language; long text is pasted)
+        window_only: Capture only the active window instead of the whole screen;
+            defaults to the server setting
+        method: Optional 'keys' (one keystroke per character), 'unicode',
+            'paste' (clipboard) or 'auto'; chosen from the text when omitted
+        pacing: Optional input speed for this call: 'fast', 'normal' or 'cautious'
+            (for slow or busy apps); defaults to the session setting
+        image_preset: Optional encoding for this call's screenshots: 'lossless',
+            'high', 'balanced', 'fast' or 'compact'
     """
+    if method and resolve_method(method) is None:
+        return unknown_method_message(method)
     try:
         if text:
             # Capture screen before typing
             logger.info(f"Capturing screen before typing text: {text}")
-            before_screenshot = pyautogui.screenshot()
-            before_buffered = BytesIO()
-            before_screenshot.save(before_buffered, format="PNG")
-            before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
+            region = await _capture_region(window_only)
+            before, before_img = await _capture_before(region)
 
             # Type the text
             logger.info(f"Typing text: {text}")
-            pyautogui.write(text)
+            typing = await _type(text, method)
 
-            # Wait briefly
-            time.sleep(1)
-
-            # Capture after typing
-            after_screenshot = pyautogui.screenshot()
-            after_buffered = BytesIO()
-            after_screenshot.save(after_buffered, format="PNG")
-            after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+            # Wait for the UI to settle; the last polled frame is the "after" shot
+            settle = await _wait_for_settle(region)
+            after_text, after_images = await _after_view(
+                f"After typing '{text}'", before, settle.frame, region
+            )
 
             # Build result with before and after screenshots
             result = (
                 f"I'm about to type: '{text}'. Here's what I see on the screen first:\n"
             )
-            result += f"data:image/png;base64,{before_img_str}\n\n"
-            result += f"After typing '{text}', here's what I see now:\n"
-            result += f"data:image/png;base64,{after_img_str}"
+            result += f"{before_img.data_url}\n\n"
+            result += after_text
+            result += f"\n{typing.summary()}"
+            result += f"\n{settle.summary()}"
+            result += f"\n{_image_stats(before=before_img, **after_images)}"
+            result += _region_note(region)
 
             return result
         else:
@@ -523,45 +944,44 @@ async def type_text(text: str) -> str:
 
 
 @function_tool
-async def press_key(key: str) -> str:
+@input_action
+@with_pacing
+@with_image_preset
+async def press_key(key: str, pacing: str = None, image_preset: str = None) -> str:
     """
     Press a specific keyboard key or key combination.
 
     Args:
         key: Key or key combination to press (e.g., 'enter', 'ctrl+s')
+        pacing: Optional input speed for this call: 'fast', 'normal' or 'cautious'
+            (for slow or busy apps); defaults to the session setting
+        image_preset: Optional encoding for this call's screenshots: 'lossless',
+            'high', 'balanced', 'fast' or 'compact'
     """
     try:
         if key:
             # Capture screen before pressing key
             logger.info(f"Capturing screen before pressing key: {key}")
-            before_screenshot = pyautogui.screenshot()
-            before_buffered = BytesIO()
-            before_screenshot.save(before_buffered, format="PNG")
-            before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
+            before, before_img = await _capture_before()
 
             # Press the key
             logger.info(f"Pressing key: {key}")
-            if "+" in key:
-                keyboard.press_and_release(key)
-            else:
-                pyautogui.press(key)
-
-            # Wait briefly for UI to update
-            time.sleep(1.5)
+            await _inject(_press_key_sync, key)
 
-            # Capture screen after key press
-            after_screenshot = pyautogui.screenshot()
-            after_buffered = BytesIO()
-            after_screenshot.save(after_buffered, format="PNG")
-            after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
+            # Wait for the UI to settle; the last polled frame is the "after" shot
+            settle = await _wait_for_settle()
+            after_text, after_images = await _after_view(
+                f"After pressing '{key}'", before, settle.frame
+            )
 
             # Build result with before and after screenshots
             result = (
                 f"I'm about to press: '{key}'. Here's what I see on the screen first:\n"
             )
-            result += f"data:image/png;base64,{before_img_str}\n\n"
-            result += f"After pressing '{key}', here's what I see now:\n"
-            result += f"data:image/png;base64,{after_img_str}"
+            result += f"{before_img.data_url}\n\n"
+            result += after_text
+            result += f"\n{settle.summary()}"
+            result += f"\n{_image_stats(before=before_img, **after_images)}"
 
             return result
         else:
@@ -572,15 +992,254 @@ async def press_key(key: str) -> str:
         return f"Failed to press key: {str(e)}"
 
 
+class ActionStep(BaseModel):
+    """One step of an action plan."""
+
+    action: Literal["activate_window", "click", "type", "press_key", "wait"]
+    x: Optional[int] = None  # click
+    y: Optional[int] = None  # click
+    text: Optional[str] = None  # type
+    key: Optional[str] = None  # press_key, e.g. 'enter' or 'ctrl+s'
+    title_pattern: Optional[str] = None  # activate_window
+    seconds: Optional[float] = None  # wait, at most 10
+    expect_change: Optional[bool] = None  # overrides the plan's abort_on for this step
+
+
+async def _run_step(step: ActionStep) -> str:
+    """Perform one plan step; returns what was done. Raises ValueError if invalid."""
+    if step.action == "activate_window":
+        if not step.title_pattern:
+            raise ValueError("activate_window needs title_pattern")
+        window, window_title = await run_io(_find_window, step.title_pattern)
+        if window is None:
+            raise ValueError(await run_io(_no_window_message, step.title_pattern))
+        await _activate(window)
+        return f"activated '{window_title}'"
+    if step.action == "click":
+        if step.x is None or step.y is None:
+            raise ValueError("click needs x and y")
+        await _inject(pyautogui.click, step.x, step.y)
+        return f"clicked ({step.x}, {step.y})"
+    if step.action == "type":
+        if not step.text:
+            raise ValueError("type needs text")
+        typing = await _type(step.text)
+        return f"typed '{step.text}' by {METHOD_NAMES[typing.method]}"
+    if step.action == "press_key":
+        if not step.key:
+            raise ValueError("press_key needs key")
+        await _inject(_press_key_sync, step.key)
+        return f"pressed '{step.key}'"
+    seconds = min(max(step.seconds if step.seconds is not None else 1.0, 0.0), 10.0)
+    await asyncio.sleep(seconds)
+    return f"waited {seconds:g} s"
+
+
+@function_tool
+@input_action
+@with_pacing
+@with_image_preset
+async def execute_action_plan(
+    steps: list[ActionStep],
+    abort_on: str = "error",
+    pacing: str = None,
+    image_preset: str = None,
+) -> str:
+    """
+    Run several actions back to back in one call, waiting for the screen to
+    settle after each, and return a step log with one final screenshot.
+
+    Use this for routine sequences you are confident about, such as activating
+    a window, clicking a field, typing and pressing enter.
+
+    Args:
+        steps: Ordered actions: activate_window (title_pattern), click (x, y),
+            type (text), press_key (key) or wait (seconds)
+        abort_on: 'error' stops at the first step that fails; 'no_change' also
+            stops when a step leaves the screen unchanged; 'never' runs every step.
+            A step's expect_change=true/false overrides the change check for it
+        pacing: Optional input speed for this call: 'fast', 'normal' or 'cautious'
+            (for slow or busy apps); defaults to the session setting
+        image_preset: Optional encoding for this call's screenshots: 'lossless',
+            'high', 'balanced', 'fast' or 'compact'
+
+    Returns:
+        Per-step log and the final screen
+    """
+    try:
+        if not steps:
+            return "No steps specified"
+        if abort_on not in ("error", "no_change", "never"):
+            return f"Unknown abort_on value: {abort_on}"
+
+        logger.info(f"Executing action plan with {len(steps)} steps")
+        started = time.perf_counter()
+        frame = await _get_screen_capture().grab()
+        previous_hash = await run_cpu(frame_hash, frame)
+        log = []
+        aborted = None
+
+        for i, step in enumerate(steps, 1):
+            try:
+                done = await _run_step(step)
+            except Exception as e:
+                log.append(f"{i}. {step.action} failed: {e}")
+                if abort_on != "never":
+                    aborted = f"step {i} failed"
+                    break
+                continue
+
+            settle = await _wait_for_settle()
+            frame = settle.frame
+            current_hash = await run_cpu(frame_hash, frame)
+            changed = current_hash != previous_hash
+            previous_hash = current_hash
+            log.append(
+                f"{i}. {done} - {'screen changed' if changed else 'no visible change'}"
+                f", settled in {settle.elapsed_ms} ms"
+            )
+
+            expect_change = step.expect_change
+            if expect_change is None:
+                expect_change = abort_on == "no_change" and step.action != "wait"
+            if expect_change and not changed:
+                aborted = f"step {i} had no visible effect"
+                break
+
+        elapsed = time.perf_counter() - started
+        if aborted:
+            remaining = len(steps) - len(log)
+            summary = (
+                f"Stopped the plan: {aborted}; {remaining} step(s) not run "
+                f"({elapsed:.1f} s)."
+            )
+        else:
+            summary = f"Ran all {len(steps)} steps in {elapsed:.1f} s."
+        # The model saw no screenshot during the plan, so changed-region patches
+        # would have nothing to be placed on: send the whole final screen
+        final_img = await _encode(frame)
+
+        result = summary + "\n" + "\n".join(log) + "\n\n"
+        result += f"After the plan, here's what I see now:\n{final_img.data_url}"
+        result += f"\n{_image_stats(screen=final_img)}"
+        return result
+
+    except Exception as e:
+        logger.error(f"Error executing action plan: {e}")
+        return f"Failed to execute action plan: {str(e)}"
+
+
+# Waiting tools hold no scheduler slot: they only look, and holding even a
+# shared slot for seconds would keep every other session from using the input.
+
+
+@function_tool
+async def wait_for_window(
+    title_pattern: str, state: str = "appear", timeout_seconds: float = 10
+) -> str:
+    """
+    Wait until a window appears, becomes the active window, or closes, instead
+    of guessing how long something takes (e.g. a dialog opening or a program
+    starting). Returns as soon as the condition holds.
+
+    Args:
+        title_pattern: Window title text, "app:<name>" or "re:<regex>"
+        state: 'appear', 'active' or 'close'
+        timeout_seconds: Longest time to wait (at most 60)
+
+    Returns:
+        Whether the condition was met and how long it took
+    """
+    try:
+        if state not in WINDOW_STATES:
+            return f"Unknown state '{state}'; use one of: {', '.join(WINDOW_STATES)}"
+        wait = await _wait_for_window(
+            _get_window_snapshots(), title_pattern, state, timeout_seconds
+        )
+        if not wait.met:
+            if state == "close":
+                return f"A window matching '{title_pattern}' is still open {wait.summary()}"
+            if state == "active":
+                return f"No window matching '{title_pattern}' became active {wait.summary()}"
+            return f"No window matching '{title_pattern}' appeared {wait.summary()}"
+        if state == "close":
+            return f"No window matches '{title_pattern}' any more {wait.summary()}"
+        record = wait.window
+        verb = "is open" if state == "appear" else "is the active window"
+        return (
+            f"Window '{record.display_title}' ({record.app}) {verb} {wait.summary()}\n"
+            f"Position: ({record.left}, {record.top}), "
+            f"size: {record.width}x{record.height}"
+        )
+
+    except Exception as e:
+        logger.error(f"Error waiting for window: {e}")
+        return f"Failed to wait for window: {str(e)}"
+
+
+@function_tool
+async def wait_for_change(region: str = None, timeout_seconds: float = 10) -> str:
+    """
+    Wait until the screen, or part of it, changes from how it looks now, e.g.
+    for a page to load or a progress indicator to finish, then show what
+    changed once it has settled.
+
+    Args:
+        region: Optional area to watch in format "left,top,width,height"
+        timeout_seconds: Longest time to wait (at most 60)
+
+    Returns:
+        How long the change took and the changed parts of the screen
+    """
+    try:
+        bounds = None
+        if region:
+            try:
+                bounds = tuple(map(int, region.split(",")))
+            except ValueError:
+                bounds = None
+            if bounds is None or len(bounds) != 4:
+                return f"Could not parse region: {region}"
+        grab = (
+            functools.partial(_get_capture_backend().grab, bounds)
+            if bounds
+            else _get_capture_backend().grab
+        )
+
+        # Compare against the screen as it is now, not a cached frame
+        before = await run_io(grab)
+        baseline = await run_cpu(frame_hash, before)
+        wait = await _wait_for_change(grab, baseline, timeout_seconds)
+        where = f"Region {region}" if bounds else "The screen"
+        if not wait.met:
+            return f"{where} did not change {wait.summary()}"
+
+        settle = await _wait_for_settle(region=bounds)
+        after_text, after_images = await _after_view(
+            "Once it settled", before, settle.frame, region=bounds
+        )
+        result = f"{where} changed {wait.summary()}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        if after_images:
+            result += f"\n{_image_stats(**after_images)}"
+        return result
+
+    except Exception as e:
+        logger.error(f"Error waiting for screen change: {e}")
+        return f"Failed to wait for screen change: {str(e)}"
+
+
 @function_tool
+@read_action
 async def get_screen_info() -> str:
     """Get information about the current screen."""
     try:
         # Get screen size
-        screen_width, screen_height = pyautogui.size()
+        screen_width, screen_height = await run_io(pyautogui.size)
 
         # Get current mouse position
-        mouse_x, mouse_y = pyautogui.position()
+        mouse_x, mouse_y = await run_io(pyautogui.position)
 
         screen_info = {
             "screen_size": {"width": screen_width, "height": screen_height},
@@ -596,43 +1255,62 @@ async def get_screen_info() -> str:
 
 
 @function_tool
-async def capture_screen(region: str = None, description: bool = True) -> str:
+@read_action
+async def capture_screen(
+    region: str = None,
+    description: bool = True,
+    image_preset: str = None,
+    image_format: str = None,
+    max_dimension: int = None,
+    quality: int = None,
+    grayscale: bool = None,
+) -> str:
     """
     Capture the screen or a specific region and return information about what's visible.
 
     Args:
         region: Optional region to capture in format "left,top,width,height" (e.g., "0,0,800,600")
         description: Whether to include a request for description of the screen
+        image_preset: Optional encoding preset: 'lossless', 'high', 'balanced', 'fast' or 'compact'
+        image_format: Optional image format override: 'png', 'jpeg' or 'webp'
+        max_dimension: Optional longest side in pixels (0 for full resolution)
+        quality: Optional JPEG/WebP quality from 1 to 100
+        grayscale: Optionally encode the screenshot in grayscale
 
     Returns:
         Base64 encoded image data with description request
     """
     try:
+        options = resolve_options(
+            preset=image_preset,
+            format=image_format,
+            max_dimension=max_dimension,
+            quality=quality,
+            grayscale=grayscale,
+        )
+
         # Capture the screen
         if region:
             try:
                 # Parse region string into coordinates
                 left, top, width, height = map(int, region.split(","))
-                screenshot = pyautogui.screenshot(region=(left, top, width, height))
+                img = await _capture_encoded(
+                    region=(left, top, width, height), options=options
+                )
                 logger.info(f"Captured screen region: {region}")
             except ValueError:
                 logger.error(f"Invalid region format: {region}")
-                screenshot = pyautogui.screenshot()
+                img = await _capture_encoded(options=options)
                 logger.info("Capturing full screen instead")
         else:
-            screenshot = pyautogui.screenshot()
+            img = await _capture_encoded(options=options)
             logger.info("Captured full screen")
 
-        # Convert to base64 for transmission
-        buffered = BytesIO()
-        screenshot.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-
         # Prepare message with image data
+        result = f"{img.data_url}\n{_image_stats(screenshot=img)}"
         if description:
-            return f"data:image/png;base64,{img_str}\nPlease describe what you see on this screen."
-        else:
-            return f"data:image/png;base64,{img_str}"
+            result += "\nPlease describe what you see on this screen."
+        return result
 
     except Exception as e:
         logger.error(f"Error capturing screen: {e}")
@@ -641,859 +1319,785 @@ async def capture_screen(region: str = None, description: bool = True) -> str:
 
 # Window Management Tools using pywinctl
 
+def _list_windows_report() -> str:
+    """Blocking body of list_windows; call via run_io."""
+    snapshot = _get_window_snapshots().get()
+
+    if not snapshot.records:
+        return "No open windows found."
+
+    result = "Open Windows:\n"
+    result += "=" * 50 + "\n"
+
+    for i, record in enumerate(snapshot.records, 1):
+        visible = "Visible" if record.visible else "Hidden"
+        minimized = "Minimized" if record.minimized else "Normal"
+
+        result += f"{i}. {record.display_title}\n"
+        result += f"   Status: {visible}, {minimized}\n"
+        result += f"   Position: ({record.left}, {record.top}), Size: {record.width}x{record.height}\n"
+        result += f"   Process: {record.app}\n\n"
+    result += _skipped_note(snapshot)
+
+    logger.info(f"Found {len(snapshot)} windows")
+    return result
+
+
 @function_tool
+@read_action
 async def list_windows() -> str:
     """
     List all open windows with their titles and basic information.
-    
+
     Returns:
         String containing information about all open windows
     """
     try:
         logger.info("Getting list of all open windows")
-        windows = pwc.getAllWindows()
-        
-        if not windows:
-            return "No open windows found."
-        
-        result = "Open Windows:\n"
-        result += "=" * 50 + "\n"
-        
-        for i, window in enumerate(windows, 1):
-            try:
-                title = window.title if window.title else "No Title"
-                visible = "Visible" if window.visible else "Hidden"
-                minimized = "Minimized" if window.isMinimized else "Normal"
-                
-                # Get window position and size
-                box = window.box
-                position = f"Position: ({box.left}, {box.top})"
-                size = f"Size: {box.width}x{box.height}"
-                
-                result += f"{i}. {title}\n"
-                result += f"   Status: {visible}, {minimized}\n"
-                result += f"   {position}, {size}\n"
-                result += f"   Process: {getattr(window, 'app', 'Unknown')}\n\n"
-                
-            except Exception as e:
-                result += f"{i}. Error reading window info: {str(e)}\n\n"
-        
-        logger.info(f"Found {len(windows)} windows")
-        return result
-        
+        return await run_io(_list_windows_report)
+
     except Exception as e:
         logger.error(f"Error listing windows: {e}")
         return f"Failed to list windows: {str(e)}"
 
 
+def _get_active_window_report() -> str:
+    """Blocking body of get_active_window; call via run_io."""
+    active_window = _get_window_snapshots().get().active
+
+    if not active_window:
+        return "No active window found."
+
+    visible = "Visible" if active_window.visible else "Hidden"
+    minimized = "Minimized" if active_window.minimized else "Normal"
+
+    result = "Active Window Information:\n"
+    result += "=" * 30 + "\n"
+    result += f"Title: {active_window.display_title}\n"
+    result += f"Status: {visible}, {minimized}\n"
+    result += f"Position: ({active_window.left}, {active_window.top}), Size: {active_window.width}x{active_window.height}\n"
+    result += f"Process: {active_window.app}\n"
+
+    logger.info(f"Active window: {active_window.display_title}")
+    return result
+
+
 @function_tool
+@read_action
 async def get_active_window() -> str:
     """
     Get information about the currently active/focused window.
-    
+
     Returns:
         String containing information about the active window
     """
     try:
         logger.info("Getting active window information")
-        active_window = pwc.getActiveWindow()
-        
-        if not active_window:
-            return "No active window found."
-        
-        title = active_window.title if active_window.title else "No Title"
-        visible = "Visible" if active_window.visible else "Hidden"
-        minimized = "Minimized" if active_window.isMinimized else "Normal"
-        
-        # Get window position and size
-        box = active_window.box
-        position = f"Position: ({box.left}, {box.top})"
-        size = f"Size: {box.width}x{box.height}"
-        
-        result = "Active Window Information:\n"
-        result += "=" * 30 + "\n"
-        result += f"Title: {title}\n"
-        result += f"Status: {visible}, {minimized}\n"
-        result += f"{position}, {size}\n"
-        result += f"Process: {getattr(active_window, 'app', 'Unknown')}\n"
-        
-        logger.info(f"Active window: {title}")
-        return result
-        
+        return await run_io(_get_active_window_report)
+
     except Exception as e:
         logger.error(f"Error getting active window: {e}")
         return f"Failed to get active window: {str(e)}"
 
 
+def _find_windows_by_title_report(title_pattern) -> str:
+    """Blocking body of find_windows_by_title; call via run_io."""
+    windows = _get_window_snapshots().get().find(title_pattern)
+
+    if not windows:
+        return f"No windows found matching title pattern: '{title_pattern}'"
+
+    result = f"Windows matching '{title_pattern}' (best first):\n"
+    result += "=" * 50 + "\n"
+
+    for i, (record, score, how) in enumerate(windows, 1):
+        visible = "Visible" if record.visible else "Hidden"
+        minimized = "Minimized" if record.minimized else "Normal"
+
+        result += f"{i}. {record.display_title}\n"
+        result += f"   Match: {how}, score {score:.2f}\n"
+        result += f"   Status: {visible}, {minimized}\n"
+        result += f"   Position: ({record.left}, {record.top}), Size: {record.width}x{record.height}\n"
+        result += f"   Process: {record.app}\n\n"
+
+    logger.info(f"Found {len(windows)} matching windows")
+    return result
+
+
 @function_tool
+@read_action
 async def find_windows_by_title(title_pattern: str) -> str:
     """
     Find windows that match a title pattern.
-    
+
     Args:
-        title_pattern: Pattern to search for in window titles (case-insensitive)
-    
+        title_pattern: Window title or part of it (case-insensitive, misspellings
+            tolerated); 'app:<name>' matches an application's windows and
+            're:<regex>' a regular expression
+
     Returns:
         String containing information about matching windows
     """
     try:
         logger.info(f"Searching for windows with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        result = f"Windows matching '{title_pattern}':\n"
-        result += "=" * 50 + "\n"
-        
-        for i, window in enumerate(windows, 1):
-            try:
-                title = window.title if window.title else "No Title"
-                visible = "Visible" if window.visible else "Hidden"
-                minimized = "Minimized" if window.isMinimized else "Normal"
-                
-                # Get window position and size
-                box = window.box
-                position = f"Position: ({box.left}, {box.top})"
-                size = f"Size: {box.width}x{box.height}"
-                
-                result += f"{i}. {title}\n"
-                result += f"   Status: {visible}, {minimized}\n"
-                result += f"   {position}, {size}\n"
-                result += f"   Process: {getattr(window, 'app', 'Unknown')}\n\n"
-                
-            except Exception as e:
-                result += f"{i}. Error reading window info: {str(e)}\n\n"
-        
-        logger.info(f"Found {len(windows)} matching windows")
-        return result
-        
+        return await run_io(_find_windows_by_title_report, title_pattern)
+
     except Exception as e:
         logger.error(f"Error finding windows by title: {e}")
         return f"Failed to find windows: {str(e)}"
 
 
 @function_tool
-async def activate_window(title_pattern: str) -> str:
+@input_action
+async def activate_window(title_pattern: str, window_only: bool = None) -> str:
     """
     Activate (bring to front and focus) a window by title pattern.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+        window_only: Capture only the target window's area instead of the whole
+            screen; defaults to the server setting
+
     Returns:
         Status message with before and after screenshots
     """
     try:
+        logger.info(f"Searching for window with title pattern: {title_pattern}")
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         # Capture screen before action
         logger.info("Capturing screen before activating window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
-        logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        region = await _capture_region(window_only, window=window)
+        before, before_img = await _capture_before(region)
+
         logger.info(f"Activating window: {window_title}")
-        
-        # Restore if minimized, then activate
-        if window.isMinimized:
-            window.restore()
-            time.sleep(0.5)
-        
-        window.activate()
-        time.sleep(1.5)  # Wait for window to become active
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _activate(window)
+
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle(region)
+        after_text, after_images = await _after_view(
+            f"After activating '{window_title}'", before, settle.frame, region
+        )
+
         # Build result with before and after screenshots
         result = f"I'm activating the window: '{window_title}'. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After activating '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+        result += _region_note(region)
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error activating window: {e}")
         return f"Failed to activate window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def minimize_window(title_pattern: str) -> str:
     """
     Minimize a window by title pattern.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before minimizing window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Minimizing window: {window_title}")
-        window.minimize()
-        time.sleep(1.5)  # Wait for window to minimize
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.minimize)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After minimizing '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm minimizing the window: '{window_title}'. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After minimizing '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error minimizing window: {e}")
         return f"Failed to minimize window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def maximize_window(title_pattern: str) -> str:
     """
     Maximize a window by title pattern.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before maximizing window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Maximizing window: {window_title}")
-        window.maximize()
-        time.sleep(1.5)  # Wait for window to maximize
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.maximize)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After maximizing '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm maximizing the window: '{window_title}'. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After maximizing '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error maximizing window: {e}")
         return f"Failed to maximize window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def close_window(title_pattern: str) -> str:
     """
     Close a window by title pattern.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before closing window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Closing window: {window_title}")
-        window.close()
-        time.sleep(1.5)  # Wait for window to close
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.close)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After closing '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm closing the window: '{window_title}'. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After closing '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error closing window: {e}")
         return f"Failed to close window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def resize_window(title_pattern: str, width: int, height: int) -> str:
     """
     Resize a window by title pattern.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
         width: New width for the window
         height: New height for the window
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before resizing window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Resizing window '{window_title}' to {width}x{height}")
-        window.resize(width, height)
-        time.sleep(1.5)  # Wait for window to resize
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.resize, width, height)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After resizing '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm resizing window '{window_title}' to {width}x{height}. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After resizing '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error resizing window: {e}")
         return f"Failed to resize window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def move_window(title_pattern: str, x: int, y: int) -> str:
     """
     Move a window to a specific position by title pattern.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
         x: New X position for the window
         y: New Y position for the window
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before moving window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Moving window '{window_title}' to position ({x}, {y})")
-        window.moveTo(x, y)
-        time.sleep(1.5)  # Wait for window to move
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.moveTo, x, y)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After moving '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm moving window '{window_title}' to position ({x}, {y}). Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After moving '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error moving window: {e}")
         return f"Failed to move window: {str(e)}"
 
 
+def _get_all_app_names_report() -> str:
+    """Blocking body of get_all_app_names; call via run_io."""
+    app_names = pwc.getAllAppsNames()
+
+    if not app_names:
+        return "No running applications found."
+
+    result = "Running Applications:\n"
+    result += "=" * 30 + "\n"
+
+    # Remove duplicates and sort
+    unique_apps = sorted(set(app_names))
+
+    for i, app_name in enumerate(unique_apps, 1):
+        result += f"{i}. {app_name}\n"
+
+    logger.info(f"Found {len(unique_apps)} unique applications")
+    return result
+
+
 @function_tool
+@read_action
 async def get_all_app_names() -> str:
     """
     Get a list of all running application names.
-    
+
     Returns:
         String containing all running application names
     """
     try:
         logger.info("Getting all application names")
-        app_names = pwc.getAllAppsNames()
-        
-        if not app_names:
-            return "No running applications found."
-        
-        result = "Running Applications:\n"
-        result += "=" * 30 + "\n"
-        
-        # Remove duplicates and sort
-        unique_apps = sorted(set(app_names))
-        
-        for i, app_name in enumerate(unique_apps, 1):
-            result += f"{i}. {app_name}\n"
-        
-        logger.info(f"Found {len(unique_apps)} unique applications")
-        return result
-        
+        return await run_io(_get_all_app_names_report)
+
     except Exception as e:
         logger.error(f"Error getting app names: {e}")
         return f"Failed to get app names: {str(e)}"
 
 
+def _get_apps_with_name_report(app_name) -> str:
+    """Blocking body of get_apps_with_name; call via run_io."""
+    app_windows = _get_window_snapshots().get().for_app(app_name)
+
+    if not app_windows:
+        return f"No windows found for application: '{app_name}'"
+
+    result = f"Windows for '{app_name}':\n"
+    result += "=" * 40 + "\n"
+
+    for i, record in enumerate(app_windows, 1):
+        visible = "Visible" if record.visible else "Hidden"
+        minimized = "Minimized" if record.minimized else "Normal"
+        active = "Active" if record.active else "Inactive"
+
+        result += f"{i}. {record.display_title}\n"
+        result += f"   Status: {visible}, {minimized}, {active}\n"
+        result += f"   Position: ({record.left}, {record.top}), Size: {record.width}x{record.height}\n\n"
+
+    logger.info(f"Found {len(app_windows)} windows for {app_name}")
+    return result
+
+
 @function_tool
+@read_action
 async def get_apps_with_name(app_name: str) -> str:
     """
     Get all windows belonging to a specific application.
-    
+
     Args:
         app_name: Name of the application to search for
-    
+
     Returns:
         String containing information about windows for the specified app
     """
     try:
         logger.info(f"Getting windows for application: {app_name}")
-        app_windows = pwc.getAppsWithName(app_name)
-        
-        if not app_windows:
-            return f"No windows found for application: '{app_name}'"
-        
-        result = f"Windows for '{app_name}':\n"
-        result += "=" * 40 + "\n"
-        
-        for i, window in enumerate(app_windows, 1):
-            try:
-                title = window.title if window.title else "No Title"
-                visible = "Visible" if window.visible else "Hidden"
-                minimized = "Minimized" if window.isMinimized else "Normal"
-                active = "Active" if window.isActive else "Inactive"
-                
-                # Get window position and size
-                box = window.box
-                position = f"Position: ({box.left}, {box.top})"
-                size = f"Size: {box.width}x{box.height}"
-                
-                result += f"{i}. {title}\n"
-                result += f"   Status: {visible}, {minimized}, {active}\n"
-                result += f"   {position}, {size}\n\n"
-                
-            except Exception as e:
-                result += f"{i}. Error reading window info: {str(e)}\n\n"
-        
-        logger.info(f"Found {len(app_windows)} windows for {app_name}")
-        return result
-        
+        return await run_io(_get_apps_with_name_report, app_name)
+
     except Exception as e:
         logger.error(f"Error getting apps with name: {e}")
         return f"Failed to get apps with name: {str(e)}"
 
 
 @function_tool
+@input_action
 async def hide_window(title_pattern: str) -> str:
     """
     Hide a window (different from minimize - completely hides from taskbar).
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before hiding window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Hiding window: {window_title}")
-        window.hide()
-        time.sleep(1.5)  # Wait for window to hide
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.hide)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After hiding '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm hiding the window: '{window_title}'. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After hiding '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error hiding window: {e}")
         return f"Failed to hide window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def show_window(title_pattern: str) -> str:
     """
     Show a previously hidden window.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before showing window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Showing window: {window_title}")
-        window.show()
-        time.sleep(1.5)  # Wait for window to show
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.show)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After showing '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm showing the window: '{window_title}'. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After showing '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error showing window: {e}")
         return f"Failed to show window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def restore_window(title_pattern: str) -> str:
     """
     Restore a window from minimized or maximized state to normal.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before restoring window")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         logger.info(f"Restoring window: {window_title}")
-        window.restore()
-        time.sleep(1.5)  # Wait for window to restore
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.restore)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After restoring '{window_title}'", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm restoring the window: '{window_title}' to normal size. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After restoring '{window_title}', here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error restoring window: {e}")
         return f"Failed to restore window: {str(e)}"
 
 
 @function_tool
+@input_action
 async def set_window_always_on_top(title_pattern: str, always_on_top: bool = True) -> str:
     """
     Set a window to always stay on top of other windows.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
         always_on_top: True to set always on top, False to remove
-    
+
     Returns:
         Status message with before and after screenshots
     """
     try:
         # Capture screen before action
         logger.info("Capturing screen before setting window always on top")
-        before_screenshot = pyautogui.screenshot()
-        before_buffered = BytesIO()
-        before_screenshot.save(before_buffered, format="PNG")
-        before_img_str = base64.b64encode(before_buffered.getvalue()).decode()
-        
+        before, before_img = await _capture_before()
+
         logger.info(f"Searching for window with title pattern: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        window_title = window.title if window.title else "No Title"
-        
+        window, window_title = await run_io(_find_window, title_pattern)
+
+        if window is None:
+            return await run_io(_no_window_message, title_pattern)
+
         action_text = "on top" if always_on_top else "normal"
         logger.info(f"Setting window '{window_title}' always on top: {always_on_top}")
-        window.alwaysOnTop(always_on_top)
-        time.sleep(1.5)  # Wait for setting to apply
-        
-        # Capture screen after action
-        after_screenshot = pyautogui.screenshot()
-        after_buffered = BytesIO()
-        after_screenshot.save(after_buffered, format="PNG")
-        after_img_str = base64.b64encode(after_buffered.getvalue()).decode()
-        
+        await _inject(window.alwaysOnTop, always_on_top)
+        # Wait for the UI to settle; the last polled frame is the "after" shot
+        settle = await _wait_for_settle()
+        after_text, after_images = await _after_view(
+            f"After setting '{window_title}' to {action_text}", before, settle.frame
+        )
+
         # Build result with before and after screenshots
         result = f"I'm setting window '{window_title}' to {action_text}. Here's what I see before:\n"
-        result += f"data:image/png;base64,{before_img_str}\n\n"
-        result += f"After setting '{window_title}' to {action_text}, here's what I see now:\n"
-        result += f"data:image/png;base64,{after_img_str}"
-        
+        result += f"{before_img.data_url}\n\n"
+        result += after_text
+        result += f"\n{settle.summary()}"
+        result += f"\n{_image_stats(before=before_img, **after_images)}"
+
         return result
-        
+
     except Exception as e:
         logger.error(f"Error setting window always on top: {e}")
         return f"Failed to set window always on top: {str(e)}"
 
 
+def _get_window_details_report(title_pattern) -> str:
+    """Blocking body of get_window_details; call via run_io."""
+    window, _ = _find_window(title_pattern)
+
+    if window is None:
+        return _no_window_message(title_pattern)
+
+    result = "Window Details:\n"
+    result += "=" * 30 + "\n"
+
+    try:
+        # Basic info
+        result += f"Title: {window.title if window.title else 'No Title'}\n"
+        result += f"App Name: {getattr(window, 'app', 'Unknown')}\n"
+
+        # State information
+        result += f"Visible: {window.visible}\n"
+        result += f"Active: {window.isActive}\n"
+        result += f"Minimized: {window.isMinimized}\n"
+        result += f"Maximized: {window.isMaximized}\n"
+        result += f"Alive: {window.isAlive}\n"
+
+        # Position and size
+        box = window.box
+        result += f"Position: ({box.left}, {box.top})\n"
+        result += f"Size: {box.width} x {box.height}\n"
+        result += f"Center: ({window.center[0]}, {window.center[1]})\n"
+
+        # Advanced properties
+        try:
+            result += f"PID: {window.getPID()}\n"
+        except Exception:
+            result += "PID: Not available\n"
+
+        try:
+            handle = window.getHandle()
+            result += f"Handle: {handle}\n"
+        except Exception:
+            result += "Handle: Not available\n"
+
+    except Exception as e:
+        result += f"Error getting window details: {str(e)}\n"
+
+    logger.info(f"Retrieved details for window: {window.title}")
+    return result
+
+
 @function_tool
+@read_action
 async def get_window_details(title_pattern: str) -> str:
     """
     Get comprehensive details about a specific window.
-    
+
     Args:
         title_pattern: Pattern to search for in window titles
-    
+
     Returns:
         Detailed information about the window
     """
     try:
         logger.info(f"Getting detailed info for window: {title_pattern}")
-        windows = pwc.getWindowsWithTitle(title_pattern)
-        
-        if not windows:
-            return f"No windows found matching title pattern: '{title_pattern}'"
-        
-        # Use the first matching window
-        window = windows[0]
-        
-        result = "Window Details:\n"
-        result += "=" * 30 + "\n"
-        
-        try:
-            # Basic info
-            result += f"Title: {window.title if window.title else 'No Title'}\n"
-            result += f"App Name: {getattr(window, 'app', 'Unknown')}\n"
-            
-            # State information
-            result += f"Visible: {window.visible}\n"
-            result += f"Active: {window.isActive}\n"
-            result += f"Minimized: {window.isMinimized}\n"
-            result += f"Maximized: {window.isMaximized}\n"
-            result += f"Alive: {window.isAlive}\n"
-            
-            # Position and size
-            box = window.box
-            result += f"Position: ({box.left}, {box.top})\n"
-            result += f"Size: {box.width} x {box.height}\n"
-            result += f"Center: ({window.center[0]}, {window.center[1]})\n"
-            
-            # Advanced properties
-            try:
-                result += f"PID: {window.getPID()}\n"
-            except Exception:
-                result += "PID: Not available\n"
-                
-            try:
-                handle = window.getHandle()
-                result += f"Handle: {handle}\n"
-            except Exception:
-                result += "Handle: Not available\n"
-            
-        except Exception as e:
-            result += f"Error getting window details: {str(e)}\n"
-        
-        logger.info(f"Retrieved details for window: {window.title}")
-        return result
-        
+        return await run_io(_get_window_details_report, title_pattern)
+
     except Exception as e:
         logger.error(f"Error getting window details: {e}")
         return f"Failed to get window details: {str(e)}"
 
 
+def _get_windows_at_position_report(x, y) -> str:
+    """Blocking body of get_windows_at_position; call via run_io."""
+    windows = _get_window_snapshots().get().at(x, y)
+
+    if not windows:
+        return f"No windows found at position ({x}, {y})"
+
+    result = f"Windows at position ({x}, {y}):\n"
+    result += "=" * 40 + "\n"
+
+    for i, record in enumerate(windows, 1):
+        visible = "Visible" if record.visible else "Hidden"
+        active = "Active" if record.active else "Inactive"
+
+        result += f"{i}. {record.display_title}\n"
+        result += f"   Status: {visible}, {active}\n"
+        result += f"   Position: ({record.left}, {record.top}), Size: {record.width}x{record.height}\n"
+        result += f"   App: {record.app}\n\n"
+
+    logger.info(f"Found {len(windows)} windows at position ({x}, {y})")
+    return result
+
+
 @function_tool
+@read_action
 async def get_windows_at_position(x: int, y: int) -> str:
     """
     Get all windows at a specific screen position.
-    
+
     Args:
         x: X coordinate
         y: Y coordinate
-    
+
     Returns:
         Information about windows at the specified position
     """
     try:
         logger.info(f"Getting windows at position ({x}, {y})")
-        windows = pwc.getWindowsAt(x, y)
-        
-        if not windows:
-            return f"No windows found at position ({x}, {y})"
-        
-        result = f"Windows at position ({x}, {y}):\n"
-        result += "=" * 40 + "\n"
-        
-        for i, window in enumerate(windows, 1):
-            try:
-                title = window.title if window.title else "No Title"
-                visible = "Visible" if window.visible else "Hidden"
-                active = "Active" if window.isActive else "Inactive"
-                
-                # Get window position and size
-                box = window.box
-                position = f"Position: ({box.left}, {box.top})"
-                size = f"Size: {box.width}x{box.height}"
-                
-                result += f"{i}. {title}\n"
-                result += f"   Status: {visible}, {active}\n"
-                result += f"   {position}, {size}\n"
-                result += f"   App: {getattr(window, 'app', 'Unknown')}\n\n"
-                
-            except Exception as e:
-                result += f"{i}. Error reading window info: {str(e)}\n\n"
-        
-        logger.info(f"Found {len(windows)} windows at position ({x}, {y})")
-        return result
-        
+        return await run_io(_get_windows_at_position_report, x, y)
+
     except Exception as e:
         logger.error(f"Error getting windows at position: {e}")
         return f"Failed to get windows at position: {str(e)}"
@@ -0,0 +1,179 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger("OTTO.scheduler")
+
+# Waits shorter than this are not mentioned in tool results (still counted)
+WAIT_NOTE_SECONDS = float(os.getenv("OTTO_INPUT_WAIT_NOTE", "0.25"))
+
+# Which client a tool call is made for; set by the server before a realtime
+# session starts, so the session's tool tasks inherit it
+current_session: ContextVar[str] = ContextVar("otto_session", default="local")
+# Set while a task holds a slot, so nested scheduled calls don't deadlock
+_holding: ContextVar[bool] = ContextVar("otto_holding_slot", default=False)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    tool: str
+    exclusive: bool
+    future: asyncio.Future
+
+
+class ActionScheduler:
+    """
+    Serializes desktop input across every session sharing this machine.
+
+    All sessions drive one physical mouse and keyboard, so input tools
+    (clicks, typing, window changes) run one at a time, for their whole
+    before/act/after sequence. Read-only tools (window lists, screen info,
+    screenshots) hold a shared slot and run alongside each other.
+
+    Waiting calls queue per session and sessions are served round-robin, so
+    one busy session cannot starve another. Within the rotation order is
+    strict: a waiting input call holds back later read-only calls, which
+    otherwise could keep the screen "busy" forever.
+    """
+
+    def __init__(self):
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._readers = 0
+        self._writer = False
+        self.stats = {
+            "exclusive": 0,
+            "shared": 0,
+            "waited": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    @asynccontextmanager
+    async def slot(self, tool: str, exclusive: bool) -> AsyncIterator[float]:
+        """
+        Hold an input (exclusive) or read-only (shared) slot.
+
+        Yields:
+            Seconds spent waiting for the slot
+        """
+        if _holding.get():
+            yield 0.0
+            return
+
+        started = time.monotonic()
+        waiter = _Waiter(tool, exclusive, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(current_session.get(), deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(exclusive)  # granted just as we were cancelled
+            else:
+                self._discard(waiter)
+            raise
+        waited = time.monotonic() - started
+        self._record(exclusive, waited)
+
+        token = _holding.set(True)
+        try:
+            yield waited
+        finally:
+            _holding.reset(token)
+            self._release(exclusive)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "waiting": self.waiting,
+            "readers": self._readers,
+            "writer": self._writer,
+            **self.stats,
+        }
+
+    def _record(self, exclusive: bool, waited: float) -> None:
+        self.stats["exclusive" if exclusive else "shared"] += 1
+        if waited >= 0.001:
+            self.stats["waited"] += 1
+            self.stats["wait_total"] += waited
+            self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+
+    def _grantable(self, waiter: _Waiter) -> bool:
+        if waiter.exclusive:
+            return not self._writer and self._readers == 0
+        return not self._writer
+
+    def _dispatch(self) -> None:
+        """Grant slots to queue heads in round-robin order until one must wait."""
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if not self._grantable(waiter):
+                return
+            queue.popleft()
+            # The session goes to the back of the rotation
+            del self._queues[session]
+            if queue:
+                self._queues[session] = queue
+            if waiter.exclusive:
+                self._writer = True
+            else:
+                self._readers += 1
+            waiter.future.set_result(None)
+
+    def _release(self, exclusive: bool) -> None:
+        if exclusive:
+            self._writer = False
+        else:
+            self._readers -= 1
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        for session, queue in list(self._queues.items()):
+            if waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[session]
+                break
+        # A cancelled input call may have been holding back read-only ones
+        self._dispatch()
+
+
+action_scheduler = ActionScheduler()
+
+
+def _wait_note(result: Any, waited: float) -> Any:
+    if waited < WAIT_NOTE_SECONDS or not isinstance(result, str):
+        return result
+    return f"{result}\n(Waited {waited:.1f} s for another action to finish first)"
+
+
+def _scheduled(exclusive: bool):
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with action_scheduler.slot(func.__name__, exclusive) as waited:
+                if waited >= 0.001:
+                    logger.info(f"{func.__name__} waited {waited:.3f} s for input")
+                result = await func(*args, **kwargs)
+            return _wait_note(result, waited)
+
+        return wrapper
+
+    return decorate
+
+
+# Tool decorators (apply below @function_tool): input_action for tools that move
+# the mouse, type, or change windows; read_action for tools that only look
+input_action = _scheduled(exclusive=True)
+read_action = _scheduled(exclusive=False)
@@ -1,21 +1,27 @@
+import array
 import asyncio
 import base64
 import json
 import logging
 import os
-import struct
+import sys
 from contextlib import asynccontextmanager
+from dataclasses import asdict
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import Any, Optional, Union
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from typing_extensions import assert_never
 
-from agents.realtime import RealtimeRunner, RealtimeSession, RealtimeSessionEvent
+from agents.realtime import (
+    RealtimeAudio,
+    RealtimeRunner,
+    RealtimeSessionEvent,
+)
 from agents.realtime.config import RealtimeUserInputMessage
 from agents.realtime.model_inputs import RealtimeModelSendRawMessage
 
@@ -34,19 +40,27 @@ else:
 # Explicitly set the OPENAI_API_KEY in the environment
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
-# Import TwilioHandler class - handle both module and package use cases
-if TYPE_CHECKING:
-    # For type checking, use the relative import
-    from .agent import get_starting_agent
-else:
-    # At runtime, try both import styles
-    try:
-        # Try relative import first (when used as a package)
-        from .agent import get_starting_agent
-    except ImportError:
-        # Fall back to direct import (when run as a script)
-        from agent import get_starting_agent
-
+# The app's modules import each other by bare name (agent -> pc_tools ->
+# capture, ...), so app/ has to be on sys.path, also when this runs as
+# `python -m app.server`. Everything here is imported the same way: importing a
+# module through the package as well would load a second copy of it, with its
+# own blob store, input scheduler, pacing registry and thread pools.
+APP_DIR = str(Path(__file__).resolve().parent)
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import executor
+import wire
+from agent import get_starting_agent
+from blobs import blob_store
+from history import strip_payloads
+from outbound import DROPPABLE_EVENTS, HIGH, HIGH_PRIORITY_EVENTS, NORMAL, OutboundQueue
+from uploads import DEFAULT_PROMPT, Upload, UploadError, UploadManager, to_data_url
+from pacing import set_session_pacing
+from pc_tools import desktop_metrics, start_desktop_services
+from scheduler import action_scheduler, current_session
+from sessions import DRAIN_TIMEOUT, AdmissionError, SessionRegistry, SessionState
+from vad import SERVER_VAD, VadStats, VoiceGate, turn_detection
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -54,43 +68,248 @@ logger = logging.getLogger(__name__)
 
 class RealtimeWebSocketManager:
     def __init__(self):
-        self.active_sessions: dict[str, RealtimeSession] = {}
-        self.session_contexts: dict[str, Any] = {}
-        self.websockets: dict[str, WebSocket] = {}
-
-    async def connect(self, websocket: WebSocket, session_id: str):
+        # One SessionState per connected client, with admission control
+        self.sessions = SessionRegistry()
+
+    async def connect(
+        self, websocket: WebSocket, session_id: str
+    ) -> Optional[SessionState]:
+        """
+        Admit a client and start its realtime session.
+
+        Returns:
+            The new session, or None if the connection was refused (and closed)
+        """
         await websocket.accept()
-        self.websockets[session_id] = websocket
-
-        agent = get_starting_agent()
-        runner = RealtimeRunner(agent)
-        session_context = await runner.run()
-        session = await session_context.__aenter__()
-        self.active_sessions[session_id] = session
-        self.session_contexts[session_id] = session_context
-
-        # Start event processing task
-        asyncio.create_task(self._process_events(session_id))
-
-    async def disconnect(self, session_id: str):
-        if session_id in self.session_contexts:
-            await self.session_contexts[session_id].__aexit__(None, None, None)
-            del self.session_contexts[session_id]
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
-        if session_id in self.websockets:
-            del self.websockets[session_id]
-
-    async def send_audio(self, session_id: str, audio_bytes: bytes):
-        if session_id in self.active_sessions:
-            await self.active_sessions[session_id].send_audio(audio_bytes)
+        previous = self.sessions.get(session_id)
+        if previous is not None:
+            # Same id reconnecting (e.g. a page reload): the old one goes first
+            logger.info(f"Session {session_id} reconnected; closing the old connection")
+            self.sessions.stats["replaced"] += 1
+            await self._close(
+                previous, code=4000, reason="Replaced by a new connection"
+            )
+
+        if self.sessions.full:
+            await websocket.send_text(
+                json.dumps(
+                    {
+                        "type": "client_info",
+                        "info": "queued",
+                        "position": self.sessions.waiting + 1,
+                    }
+                )
+            )
+        try:
+            await self.sessions.acquire()
+        except AdmissionError as e:
+            logger.warning(f"Refused session {session_id}: {e}")
+            await websocket.close(code=1013, reason=str(e))
+            return None
+
+        outbound = OutboundQueue(websocket)
+        state = SessionState(
+            session_id=session_id,
+            websocket=websocket,
+            outbound=outbound,
+            binary_audio=websocket.query_params.get("audio") == "binary",
+            voice_gate=VoiceGate() if SERVER_VAD else None,
+        )
+        # Tool calls made by this session's tasks queue for input under its id
+        current_session.set(session_id)
+        pacing = websocket.query_params.get("pacing")
+        if pacing and not set_session_pacing(session_id, pacing):
+            logger.warning(f"Ignoring unknown pacing profile '{pacing}'")
+        try:
+            agent = get_starting_agent()
+            runner = RealtimeRunner(
+                agent, config={"model_settings": {"turn_detection": turn_detection()}}
+            )
+            state.context = await runner.run()
+            state.session = await state.context.__aenter__()
+        except BaseException:
+            self.sessions.release()
+            raise
+        outbound.start()
+        self.sessions.register(state)
+
+        # Event processing is owned by the session and cancelled with it
+        state.spawn(self._process_events(state), "events")
+        return state
+
+    async def disconnect(self, session_id: str, state: Optional[SessionState] = None):
+        """Tear down a session (by default whichever is registered under the id)."""
+        state = state or self.sessions.get(session_id)
+        if state is not None:
+            await self._close(state)
+
+    async def _close(
+        self, state: SessionState, code: Optional[int] = None, reason: str = ""
+    ):
+        if state.closed:
+            return
+        state.closed = True
+        self.sessions.unregister(state)
+        session_id = state.session_id
+        try:
+            await state.cancel_tasks()
+            try:
+                await state.context.__aexit__(None, None, None)
+            except Exception as e:
+                logger.error(f"Error closing realtime session {session_id}: {e}")
+            await state.outbound.close()
+            if code is not None:
+                try:
+                    await state.websocket.close(code=code, reason=reason)
+                except Exception:
+                    pass  # already gone
+            state.uploads.close()
+            if self.sessions.get(session_id) is None:
+                set_session_pacing(session_id, None)
+        finally:
+            self.sessions.release()
+
+        logger.info(
+            f"Outbound queue for session {session_id}: {state.outbound.metrics()}"
+        )
+        logger.info(f"Session {session_id} usage: {state.usage.summary()}")
+        self._log_vad_stats(state)
+
+    async def shutdown(self, timeout: float = DRAIN_TIMEOUT):
+        """Refuse new clients and close every open session."""
+        self.sessions.draining = True
+        states = self.sessions.values()
+        if not states:
+            return
+        logger.info(f"Draining {len(states)} session(s)")
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *(
+                        self._close(state, code=1001, reason="Server shutting down")
+                        for state in states
+                    ),
+                    return_exceptions=True,
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Sessions still open after {timeout} s; abandoning them")
+
+    async def send_audio(self, session_id: str, audio_bytes: Union[bytes, memoryview]):
+        state = self.sessions.get(session_id)
+        if state is not None:
+            state.usage.audio_in_bytes += len(audio_bytes)
+            await state.session.send_audio(audio_bytes)
+
+    async def forward_audio(
+        self, session_id: str, audio_bytes: Union[bytes, memoryview], gated: bool
+    ):
+        """Send microphone audio on, dropping silence unless the client already did."""
+        state = self.sessions.get(session_id)
+        if state is None:
+            return
+        if len(audio_bytes) % 2:
+            # PCM16 comes in whole samples; a torn frame would shift every
+            # sample after it, so drop it instead of passing it on
+            state.usage.audio_frames_rejected += 1
+            logger.warning(
+                f"Dropped an odd-length audio frame ({len(audio_bytes)} bytes) "
+                f"from session {session_id}"
+            )
+            return
+        if gated or state.voice_gate is None:
+            await self.send_audio(session_id, audio_bytes)
+            return
+        for chunk in state.voice_gate.process(audio_bytes):
+            await self.send_audio(session_id, chunk)
+
+    def record_client_vad_stats(self, session_id: str, stats: dict[str, Any]):
+        state = self.sessions.get(session_id)
+        if state is None:
+            return
+        fields = VadStats.__dataclass_fields__
+        state.client_vad_stats = VadStats(
+            **{k: v for k, v in stats.items() if k in fields}
+        )
+
+    def _log_vad_stats(self, state: SessionState):
+        gate = state.voice_gate
+        if gate is not None and gate.stats.frames_in:
+            gate.finish()
+            logger.info(
+                f"Server VAD for session {state.session_id}: {gate.stats.summary()}"
+            )
+        if state.client_vad_stats is not None:
+            logger.info(
+                f"Client VAD for session {state.session_id}: "
+                f"{state.client_vad_stats.summary()}"
+            )
+
+    async def send_json(
+        self, session_id: str, payload: dict[str, Any], priority: int = NORMAL
+    ):
+        """Queue a JSON message for the client."""
+        state = self.sessions.get(session_id)
+        if state is not None:
+            await state.outbound.put(json.dumps(payload), priority=priority)
+
+    async def resync_history(self, session_id: str):
+        """Send the client a full history snapshot, replacing any pending delta."""
+        state = self.sessions.get(session_id)
+        if state is None:
+            return
+        state.history_resync = True
+        await state.outbound.put_snapshot("history", self._history_message(state))
+
+    @staticmethod
+    def _history_message(state: SessionState):
+        """
+        Builder for the session's "history" outbound slot. Whichever update
+        lands in the slot last, a requested resync is answered with a snapshot.
+        """
+
+        async def build():
+            if state.history_resync:
+                state.history_resync = False
+                message = state.history_tracker.snapshot(state.latest_history)
+            else:
+                message = state.history_tracker.diff(state.latest_history)
+            return json.dumps(message) if message else None
+
+        return build
+
+    def metrics(self) -> dict[str, Any]:
+        """Per-session outbound queue, usage, upload and VAD counters."""
+        return {
+            state.session_id: {
+                "outbound": state.outbound.metrics(),
+                "usage": state.usage.as_dict(),
+                "uploads": {
+                    "in_flight_bytes": state.uploads.in_flight,
+                    **state.uploads.stats,
+                },
+                "vad": {
+                    "server": (
+                        asdict(state.voice_gate.stats) if state.voice_gate else None
+                    ),
+                    "client": (
+                        asdict(state.client_vad_stats)
+                        if state.client_vad_stats
+                        else None
+                    ),
+                },
+                "tasks": len(state.tasks),
+            }
+            for state in self.sessions.values()
+        }
 
     async def send_client_event(self, session_id: str, event: dict[str, Any]):
         """Send a raw client event to the underlying realtime model."""
-        session = self.active_sessions.get(session_id)
-        if not session:
+        state = self.sessions.get(session_id)
+        if state is None:
             return
-        await session.model.send_event(
+        await state.session.model.send_event(
             RealtimeModelSendRawMessage(
                 message={
                     "type": event["type"],
@@ -103,30 +322,58 @@ class RealtimeWebSocketManager:
         self, session_id: str, message: RealtimeUserInputMessage
     ):
         """Send a structured user message via the higher-level API (supports input_image)."""
-        session = self.active_sessions.get(session_id)
-        if not session:
+        state = self.sessions.get(session_id)
+        if state is None:
             return
-        await session.send_message(
+        await state.session.send_message(
             message
         )  # delegates to RealtimeModelSendUserInput path
 
     async def interrupt(self, session_id: str) -> None:
         """Interrupt current model playback/response for a session."""
-        session = self.active_sessions.get(session_id)
-        if not session:
+        state = self.sessions.get(session_id)
+        if state is None:
             return
-        await session.interrupt()
+        await state.session.interrupt()
 
-    async def _process_events(self, session_id: str):
+    async def _process_events(self, state: SessionState):
         try:
-            session = self.active_sessions[session_id]
-            websocket = self.websockets[session_id]
-
-            async for event in session:
-                event_data = await self._serialize_event(event)
-                await websocket.send_text(json.dumps(event_data))
+            async for event in state.session:
+                await self._enqueue_event(state, event)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error processing events for session {session_id}: {e}")
+            logger.error(f"Error processing events for session {state.session_id}: {e}")
+
+    async def _enqueue_event(self, state: SessionState, event: RealtimeSessionEvent):
+        outbound = state.outbound
+        state.usage.events_out += 1
+        if event.type == "audio":
+            state.usage.audio_out_bytes += len(event.audio.data)
+        elif event.type == "tool_start":
+            state.usage.tool_calls += 1
+
+        if event.type == "audio" and state.binary_audio:
+            await outbound.put(self._audio_frame(state, event), priority=HIGH)
+        elif event.type == "history_updated":
+            # Diffed against what the client has when the writer gets to it, so
+            # back-to-back updates collapse into one delta
+            state.latest_history = event.history
+            await outbound.put_snapshot("history", self._history_message(state))
+        else:
+            event_data = await self._serialize_event(event)
+            await outbound.put(
+                json.dumps(event_data),
+                priority=HIGH if event.type in HIGH_PRIORITY_EVENTS else NORMAL,
+                droppable=event.type in DROPPABLE_EVENTS,
+            )
+
+    def _audio_frame(self, state: SessionState, event: RealtimeAudio) -> bytes:
+        sequence = state.audio_sequence
+        state.audio_sequence = sequence + 1
+        return wire.pack_audio_frame(
+            event.audio.data, event.item_id, event.content_index, sequence
+        )
 
     async def _serialize_event(self, event: RealtimeSessionEvent) -> dict[str, Any]:
         base_event: dict[str, Any] = {
@@ -144,21 +391,22 @@ class RealtimeWebSocketManager:
             base_event["tool"] = event.tool.name
         elif event.type == "tool_end":
             base_event["tool"] = event.tool.name
-            base_event["output"] = str(event.output)
+            # Screenshots become /blobs URLs; the model still gets the full output
+            base_event["output"] = strip_payloads(str(event.output))
         elif event.type == "audio":
+            # Only for clients that did not ask for binary audio frames
             base_event["audio"] = base64.b64encode(event.audio.data).decode("utf-8")
         elif event.type == "audio_interrupted":
             pass
         elif event.type == "audio_end":
             pass
         elif event.type == "history_updated":
-            base_event["history"] = [
-                item.model_dump(mode="json") for item in event.history
-            ]
+            # Sent as history_delta / history_snapshot by _enqueue_event
+            pass
         elif event.type == "history_added":
             # Provide the added item so the UI can render incrementally.
             try:
-                base_event["item"] = event.item.model_dump(mode="json")
+                base_event["item"] = strip_payloads(event.item.model_dump(mode="json"))
             except Exception:
                 base_event["item"] = None
         elif event.type == "guardrail_tripped":
@@ -186,79 +434,142 @@ manager = RealtimeWebSocketManager()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Benchmark capture backends and load the app index before the first session
+    start_desktop_services()
     yield
+    # Close open sessions (bounded by OTTO_DRAIN_TIMEOUT) before the pools go
+    await manager.shutdown()
+    # Stop the tool thread pools
+    executor.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
 
 
+async def _handle_binary_frame(session_id: str, data: bytes, uploads: UploadManager):
+    """Dispatch a binary frame (see wire.py) from the client."""
+    try:
+        kind, flags, _, payload = wire.parse_frame(data)
+    except wire.FrameError as e:
+        await manager.send_json(session_id, {"type": "error", "error": str(e)})
+        return
+
+    if kind == wire.AUDIO_IN:
+        # Raw PCM16; passed on as a view so the samples are not copied
+        gated = bool(flags & wire.FLAG_VAD_GATED)
+        await manager.forward_audio(session_id, payload, gated=gated)
+    elif kind == wire.IMAGE_CHUNK:
+        try:
+            img_id, chunk = wire.parse_image_chunk(payload)
+            upload = uploads.add_binary_chunk(img_id, chunk)
+        except (wire.FrameError, UploadError) as e:
+            await manager.send_json(session_id, {"type": "error", "error": str(e)})
+            return
+        await _ack_chunk(session_id, upload)
+    else:
+        await manager.send_json(
+            session_id, {"type": "error", "error": f"Unknown binary frame kind {kind}."}
+        )
+
+
+async def _ack_chunk(session_id: str, upload: Upload):
+    if upload.chunks % 10 == 0:
+        await manager.send_json(
+            session_id,
+            {
+                "type": "client_info",
+                "info": "image_chunk_ack",
+                "id": upload.id,
+                "count": upload.chunks,
+            },
+        )
+
+
+async def _forward_image(
+    session_id: str, data_url: str, prompt_text: str, img_id: Optional[str] = None
+):
+    """Send an image (and its prompt) to the model as a structured user message."""
+    logger.info(
+        "Forwarding image (structured message) to Realtime API (len=%d).",
+        len(data_url),
+    )
+    content: list[Any] = [
+        {"type": "input_image", "image_url": data_url, "detail": "high"}
+    ]
+    if prompt_text:
+        content.append({"type": "input_text", "text": prompt_text})
+    user_msg: RealtimeUserInputMessage = {
+        "type": "message",
+        "role": "user",
+        "content": content,
+    }
+    await manager.send_user_message(session_id, user_msg)
+    state = manager.sessions.get(session_id)
+    if state is not None:
+        state.usage.images += 1
+
+    # Acknowledge to client UI
+    ack = {"type": "client_info", "info": "image_enqueued", "size": len(data_url)}
+    if img_id is not None:
+        ack["id"] = img_id
+    await manager.send_json(session_id, ack)
+
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    await manager.connect(websocket, session_id)
-    image_buffers: dict[str, dict[str, Any]] = {}
+    state = await manager.connect(websocket, session_id)
+    if state is None:
+        return
+    uploads = state.uploads
     try:
-        while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+        while not state.closed:
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            state.usage.messages_in += 1
+
+            if received.get("bytes") is not None:
+                await _handle_binary_frame(session_id, received["bytes"], uploads)
+                continue
+
+            message = json.loads(received["text"])
 
             if message["type"] == "audio":
-                # Convert int16 array to bytes
-                int16_data = message["data"]
-                audio_bytes = struct.pack(f"{len(int16_data)}h", *int16_data)
-                await manager.send_audio(session_id, audio_bytes)
+                # Legacy JSON audio: a list of int16 samples
+                audio_bytes = array.array("h", message["data"]).tobytes()
+                await manager.forward_audio(session_id, audio_bytes, gated=False)
+            elif message["type"] == "history_resync":
+                await manager.resync_history(session_id)
+            elif message["type"] == "vad_stats":
+                manager.record_client_vad_stats(session_id, message)
+            elif message["type"] == "pacing":
+                # Input speed for this session's tools: fast, normal or cautious
+                profile = message.get("profile")
+                if set_session_pacing(session_id, profile):
+                    await manager.send_json(
+                        session_id,
+                        {"type": "client_info", "info": "pacing", "profile": profile},
+                    )
+                else:
+                    await manager.send_json(
+                        session_id,
+                        {
+                            "type": "error",
+                            "error": f"Unknown pacing profile {profile}.",
+                        },
+                    )
             elif message["type"] == "image":
                 logger.info(
                     "Received image message from client (session %s).", session_id
                 )
-                # Build a conversation.item.create with input_image (and optional input_text)
                 data_url = message.get("data_url")
-                prompt_text = message.get("text") or "Please describe this image."
                 if data_url:
-                    logger.info(
-                        "Forwarding image (structured message) to Realtime API (len=%d).",
-                        len(data_url),
-                    )
-                    user_msg: RealtimeUserInputMessage = {
-                        "type": "message",
-                        "role": "user",
-                        "content": (
-                            [
-                                {
-                                    "type": "input_image",
-                                    "image_url": data_url,
-                                    "detail": "high",
-                                },
-                                {"type": "input_text", "text": prompt_text},
-                            ]
-                            if prompt_text
-                            else [
-                                {
-                                    "type": "input_image",
-                                    "image_url": data_url,
-                                    "detail": "high",
-                                }
-                            ]
-                        ),
-                    }
-                    await manager.send_user_message(session_id, user_msg)
-                    # Acknowledge to client UI
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "client_info",
-                                "info": "image_enqueued",
-                                "size": len(data_url),
-                            }
-                        )
-                    )
+                    prompt_text = message.get("text") or DEFAULT_PROMPT
+                    await _forward_image(session_id, data_url, prompt_text)
                 else:
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "error",
-                                "error": "No data_url for image message.",
-                            }
-                        )
+                    await manager.send_json(
+                        session_id,
+                        {"type": "error", "error": "No data_url for image message."},
                     )
             elif message["type"] == "commit_audio":
                 # Force close the current input audio turn
@@ -267,101 +578,98 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 )
             elif message["type"] == "image_start":
                 img_id = str(message.get("id"))
-                image_buffers[img_id] = {
-                    "text": message.get("text") or "Please describe this image.",
-                    "chunks": [],
-                }
-                await websocket.send_text(
-                    json.dumps(
-                        {"type": "client_info", "info": "image_start_ack", "id": img_id}
+                try:
+                    uploads.start(
+                        img_id,
+                        message.get("text"),
+                        size=message.get("size"),
+                        mime=message.get("mime"),
                     )
+                except UploadError as e:
+                    await manager.send_json(
+                        session_id, {"type": "error", "error": str(e), "id": img_id}
+                    )
+                    continue
+                await manager.send_json(
+                    session_id,
+                    {"type": "client_info", "info": "image_start_ack", "id": img_id},
                 )
             elif message["type"] == "image_chunk":
+                # Base64 data URL text; binary chunks arrive as IMAGE_CHUNK frames
                 img_id = str(message.get("id"))
-                chunk = message.get("chunk", "")
-                if img_id in image_buffers:
-                    image_buffers[img_id]["chunks"].append(chunk)
-                    if len(image_buffers[img_id]["chunks"]) % 10 == 0:
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "client_info",
-                                    "info": "image_chunk_ack",
-                                    "id": img_id,
-                                    "count": len(image_buffers[img_id]["chunks"]),
-                                }
-                            )
-                        )
+                try:
+                    upload = uploads.add_text_chunk(img_id, message.get("chunk", ""))
+                except UploadError as e:
+                    await manager.send_json(
+                        session_id, {"type": "error", "error": str(e), "id": img_id}
+                    )
+                    continue
+                await _ack_chunk(session_id, upload)
             elif message["type"] == "image_end":
                 img_id = str(message.get("id"))
-                buf = image_buffers.pop(img_id, None)
-                if buf is None:
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "error",
-                                "error": "Unknown image id for image_end.",
-                            }
-                        )
+                try:
+                    upload, data = uploads.finish(img_id)
+                    data_url = await executor.run_cpu(to_data_url, data, upload.mime)
+                except UploadError as e:
+                    await manager.send_json(
+                        session_id, {"type": "error", "error": str(e), "id": img_id}
                     )
-                else:
-                    data_url = "".join(buf["chunks"]) if buf["chunks"] else None
-                    prompt_text = buf["text"]
-                    if data_url:
-                        logger.info(
-                            "Forwarding chunked image (structured message) to Realtime API (len=%d).",
-                            len(data_url),
-                        )
-                        user_msg2: RealtimeUserInputMessage = {
-                            "type": "message",
-                            "role": "user",
-                            "content": (
-                                [
-                                    {
-                                        "type": "input_image",
-                                        "image_url": data_url,
-                                        "detail": "high",
-                                    },
-                                    {"type": "input_text", "text": prompt_text},
-                                ]
-                                if prompt_text
-                                else [
-                                    {
-                                        "type": "input_image",
-                                        "image_url": data_url,
-                                        "detail": "high",
-                                    }
-                                ]
-                            ),
-                        }
-                        await manager.send_user_message(session_id, user_msg2)
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "client_info",
-                                    "info": "image_enqueued",
-                                    "id": img_id,
-                                    "size": len(data_url),
-                                }
-                            )
-                        )
-                    else:
-                        await websocket.send_text(
-                            json.dumps({"type": "error", "error": "Empty image."})
-                        )
+                    continue
+                except Exception as e:
+                    logger.error(f"Could not prepare uploaded image {img_id}: {e}")
+                    await manager.send_json(
+                        session_id,
+                        {"type": "error", "error": "Unreadable image.", "id": img_id},
+                    )
+                    continue
+                await _forward_image(session_id, data_url, upload.text, img_id)
             elif message["type"] == "interrupt":
                 await manager.interrupt(session_id)
 
     except WebSocketDisconnect:
-        await manager.disconnect(session_id)
-
-
-app.mount("/", StaticFiles(directory="static", html=True), name="static")
+        pass
+    finally:
+        # Only this connection's session; a reconnect may have replaced it
+        await manager.disconnect(session_id, state)
+
+
+@app.get("/metrics")
+async def read_metrics():
+    """
+    Admission and input scheduling state, counters for each session, and the
+    screen capture cache, window snapshot and application index.
+    """
+    return {
+        "admission": manager.sessions.metrics(),
+        "input": action_scheduler.metrics(),
+        "sessions": manager.metrics(),
+        "blobs": blob_store.metrics(),
+        **desktop_metrics(),
+    }
+
+
+@app.get("/blobs/{digest}")
+async def read_blob(digest: str, request: Request):
+    """Serve a stored image; content-addressed, so it can be cached forever."""
+    etag = f'"{digest}"'
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    blob = blob_store.get(digest)
+    if blob is None:
+        return Response(status_code=404)
+    data, mime = blob
+    return Response(content=data, media_type=mime, headers=headers)
+
+
+app.mount(
+    "/", StaticFiles(directory=Path(APP_DIR) / "static", html=True), name="static"
+)
 
 
 @app.get("/")
 async def read_index():
-    return FileResponse("static/index.html")
+    return FileResponse(Path(APP_DIR) / "static" / "index.html")
 
 
 if __name__ == "__main__":
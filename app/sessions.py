@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Optional
+
+from fastapi import WebSocket
+
+from history import HistoryTracker
+from outbound import OutboundQueue
+from uploads import UploadManager
+from vad import VadStats, VoiceGate
+
+logger = logging.getLogger("OTTO.sessions")
+
+# Realtime sessions served at once; further connections wait for a slot
+MAX_SESSIONS = int(os.getenv("OTTO_MAX_SESSIONS", "16"))
+# Connections allowed to wait for a slot, and for how long, before being refused
+SESSION_QUEUE = int(os.getenv("OTTO_SESSION_QUEUE", "8"))
+ADMISSION_TIMEOUT = float(os.getenv("OTTO_ADMISSION_TIMEOUT", "30"))
+# Time given to open sessions to close on server shutdown
+DRAIN_TIMEOUT = float(os.getenv("OTTO_DRAIN_TIMEOUT", "10"))
+
+
+class AdmissionError(Exception):
+    """A connection was refused (server full, queue full, or shutting down)."""
+
+
+@dataclass
+class SessionUsage:
+    """Per-session resource counters, reported by /metrics and on disconnect."""
+
+    connected_at: float = field(default_factory=time.monotonic)
+    messages_in: int = 0
+    audio_in_bytes: int = 0
+    audio_frames_rejected: int = 0  # odd-length PCM16 frames dropped
+    audio_out_bytes: int = 0
+    events_out: int = 0
+    tool_calls: int = 0
+    images: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "uptime": round(time.monotonic() - self.connected_at, 1),
+            "messages_in": self.messages_in,
+            "audio_in_bytes": self.audio_in_bytes,
+            "audio_frames_rejected": self.audio_frames_rejected,
+            "audio_out_bytes": self.audio_out_bytes,
+            "events_out": self.events_out,
+            "tool_calls": self.tool_calls,
+            "images": self.images,
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{time.monotonic() - self.connected_at:.0f} s, "
+            f"{self.messages_in} messages in, {self.events_out} events out, "
+            f"{self.audio_in_bytes / 1024:.0f} KB audio in, "
+            f"{self.audio_out_bytes / 1024:.0f} KB audio out, "
+            f"{self.tool_calls} tool calls, {self.images} images"
+        )
+
+
+@dataclass(eq=False)
+class SessionState:
+    """Everything one connected client owns; torn down as a unit."""
+
+    session_id: str
+    websocket: WebSocket
+    outbound: OutboundQueue
+    # Client takes model audio as binary frames (see wire.py)
+    binary_audio: bool = False
+    audio_sequence: int = 0
+    # What the client has of the conversation, and the newest history seen
+    history_tracker: HistoryTracker = field(default_factory=HistoryTracker)
+    latest_history: list = field(default_factory=list)
+    history_resync: bool = False  # client asked for a full snapshot
+    # Silence gating for audio the client did not gate itself, and the
+    # client's own VAD counters as last reported
+    voice_gate: Optional[VoiceGate] = None
+    client_vad_stats: Optional[VadStats] = None
+    uploads: UploadManager = field(default_factory=UploadManager)
+    usage: SessionUsage = field(default_factory=SessionUsage)
+    session: Any = None  # RealtimeSession
+    context: Any = None  # its async context manager
+    closed: bool = False
+    tasks: set = field(default_factory=set)
+
+    def spawn(self, coro: Coroutine, name: str) -> asyncio.Task:
+        """Start a task owned by this session; it is cancelled on disconnect."""
+        task = asyncio.create_task(coro, name=f"{self.session_id}:{name}")
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def cancel_tasks(self) -> None:
+        current = asyncio.current_task()
+        tasks = [task for task in self.tasks if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class SessionRegistry:
+    """
+    Connected sessions by id, with admission control.
+
+    At most max_sessions hold a slot; up to queue_size more connections wait
+    (in arrival order) for one to free up, for at most admission_timeout
+    seconds. Anything beyond that, or anything arriving while the server
+    drains for shutdown, is refused with AdmissionError.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = MAX_SESSIONS,
+        queue_size: int = SESSION_QUEUE,
+        admission_timeout: float = ADMISSION_TIMEOUT,
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.queue_size = queue_size
+        self.admission_timeout = admission_timeout
+        self._sessions: dict[str, SessionState] = {}
+        self._slots = asyncio.Semaphore(self.max_sessions)
+        self._held = 0
+        self.waiting = 0
+        self.draining = False
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "replaced": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        return self._sessions.get(session_id)
+
+    def values(self) -> list[SessionState]:
+        return list(self._sessions.values())
+
+    @property
+    def full(self) -> bool:
+        return self._held >= self.max_sessions
+
+    async def acquire(self) -> None:
+        """Wait for a session slot; raises AdmissionError if none comes."""
+        if self.draining:
+            self.stats["rejected"] += 1
+            raise AdmissionError("Server is shutting down")
+        if self.full:
+            if self.waiting >= self.queue_size:
+                self.stats["rejected"] += 1
+                raise AdmissionError("Server is busy; try again later")
+            self.stats["queued"] += 1
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.admission_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise AdmissionError("Timed out waiting for a free session")
+        finally:
+            self.waiting -= 1
+        if self.draining:
+            self._slots.release()
+            self.stats["rejected"] += 1
+            raise AdmissionError("Server is shutting down")
+        self._held += 1
+        self.stats["admitted"] += 1
+
+    def release(self) -> None:
+        self._held -= 1
+        self._slots.release()
+
+    def register(self, state: SessionState) -> None:
+        self._sessions[state.session_id] = state
+
+    def unregister(self, state: SessionState) -> None:
+        """Forget a session, unless a reconnect has already replaced it."""
+        if self._sessions.get(state.session_id) is state:
+            del self._sessions[state.session_id]
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "active": len(self._sessions),
+            "slots_held": self._held,
+            "max_sessions": self.max_sessions,
+            "waiting": self.waiting,
+            "draining": self.draining,
+            **self.stats,
+        }
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from executor import run_io
+from similarity import Frame, frame_hash
+
+logger = logging.getLogger("OTTO.settle")
+
+# Defaults for the post-action wait; each tool can override them.
+SETTLE_TIMEOUT = float(os.getenv("OTTO_SETTLE_TIMEOUT", "2.0"))
+SETTLE_STABLE_FRAMES = int(os.getenv("OTTO_SETTLE_STABLE_FRAMES", "3"))
+SETTLE_INTERVAL = float(os.getenv("OTTO_SETTLE_INTERVAL", "0.05"))
+# An unchanged screen is not called settled sooner than this after the action:
+# menus and dialogs often take a few frames before they start to draw
+SETTLE_MIN_REACTION = float(os.getenv("OTTO_SETTLE_MIN_REACTION", "0.3"))
+
+
+@dataclass
+class SettleResult:
+    """Outcome of wait_for_settle."""
+
+    settled: bool
+    elapsed: float  # seconds from the call until the screen was judged stable
+    polls: int
+    frame: Any  # last frame grabbed, usable as the "after" screenshot
+
+    @property
+    def elapsed_ms(self) -> int:
+        return int(self.elapsed * 1000)
+
+    def summary(self) -> str:
+        if self.settled:
+            return f"(Screen settled in {self.elapsed_ms} ms)"
+        return f"(Screen was still changing after {self.elapsed_ms} ms)"
+
+
+def grab_and_hash(grab: Callable[[], Frame]):
+    """Grab a frame and fingerprint it, in one I/O pool call."""
+    frame = grab()
+    return frame, frame_hash(frame)
+
+
+async def wait_for_settle(
+    grab: Callable[[], Frame],
+    timeout: Optional[float] = None,
+    stable_frames: Optional[int] = None,
+    interval: Optional[float] = None,
+    require_change: bool = False,
+    baseline: Optional[bytes] = None,
+    min_reaction: Optional[float] = None,
+) -> SettleResult:
+    """
+    Poll the screen until it stops changing, instead of sleeping a fixed time.
+
+    Args:
+        grab: Blocking callable returning the current frame (run on the I/O pool)
+        timeout: Maximum time to wait in seconds
+        stable_frames: Consecutive identical frame hashes needed to call it settled
+        interval: Delay between polls in seconds
+        require_change: Keep waiting until the screen differs from baseline before
+            looking for stability (for slow actions like launching an app)
+        baseline: Hash of the pre-action frame; with require_change, the screen
+            must differ from it first
+        min_reaction: Seconds to keep waiting for a first change before a screen
+            that never changed counts as settled
+
+    Returns:
+        SettleResult with the measured settle time and the last frame
+    """
+    timeout = SETTLE_TIMEOUT if timeout is None else timeout
+    stable_frames = SETTLE_STABLE_FRAMES if stable_frames is None else stable_frames
+    interval = SETTLE_INTERVAL if interval is None else interval
+    min_reaction = SETTLE_MIN_REACTION if min_reaction is None else min_reaction
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    changed = not require_change or baseline is None
+    # Compared against the pre-action frame if known, else the first poll
+    reference = baseline
+    reacted = False
+    last_hash = None
+    stable = 0
+    polls = 0
+    frame = None
+
+    while True:
+        frame, current = await run_io(grab_and_hash, grab)
+        polls += 1
+        now = time.perf_counter()
+        if reference is None:
+            reference = current
+        elif current != reference:
+            reacted = True
+
+        if not changed:
+            changed = current != baseline
+        elif current == last_hash:
+            stable += 1
+            if stable >= stable_frames - 1 and (
+                reacted or now - start >= min_reaction
+            ):
+                result = SettleResult(True, now - start, polls, frame)
+                logger.info(f"Screen settled in {result.elapsed_ms} ms ({polls} polls)")
+                return result
+        else:
+            stable = 0
+        last_hash = current
+
+        if now >= deadline:
+            result = SettleResult(False, now - start, polls, frame)
+            logger.info(f"Screen did not settle within {timeout:.1f}s ({polls} polls)")
+            return result
+        await asyncio.sleep(interval)
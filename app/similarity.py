@@ -0,0 +1,206 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Runs on the CPU thread pool (via run_cpu) and in the settle loop.
+
+Frame = Union[Image.Image, np.ndarray]
+
+# Size of the exact-match fingerprint used by the settle waiter and the fast path
+HASH_SIZE = (64, 36)
+# Size of the 64-bit difference hash used for tolerant comparisons
+DHASH_SIZE = (9, 8)
+# The precise path works on a copy no larger than this
+PRECISE_MAX_DIM = 1280
+# Block size (in working-resolution pixels) of the change mask
+BLOCK_SIZE = 16
+# A block is changed if its mean abs difference or SSIM crosses these
+BLOCK_MAE_THRESHOLD = 2.0
+BLOCK_SSIM_THRESHOLD = 0.98
+
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def to_gray(frame: Frame) -> np.ndarray:
+    """Convert a PIL Image or RGB/RGBA/gray array to a uint8 grayscale array."""
+    if isinstance(frame, Image.Image):
+        return np.asarray(frame.convert("L"))
+    if frame.ndim == 2:
+        return frame
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+
+
+def _small_gray(frame: Frame, size) -> np.ndarray:
+    # Shrink before converting to gray; it is much cheaper on 4K frames
+    if isinstance(frame, Image.Image):
+        small = frame.resize(size, Image.BILINEAR, reducing_gap=2.0)
+        return np.asarray(small.convert("L"))
+    small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    return to_gray(small)
+
+
+def frame_hash(frame: Frame) -> bytes:
+    """
+    Exact-match fingerprint of a frame, tolerant only to tiny noise.
+
+    Args:
+        frame: PIL Image or array
+
+    Returns:
+        8-byte digest of a 64x36 grayscale copy with the low 3 bits dropped
+    """
+    quantized = _small_gray(frame, HASH_SIZE) & 0xF8
+    return hashlib.blake2b(quantized.tobytes(), digest_size=8).digest()
+
+
+def perceptual_hash(frame: Frame) -> int:
+    """
+    64-bit difference hash: one bit per horizontal gradient of an 9x8 thumbnail.
+
+    Args:
+        frame: PIL Image or array
+
+    Returns:
+        Hash as an int; compare two with hash_distance
+    """
+    small = _small_gray(frame, DHASH_SIZE).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two perceptual hashes (0-64)."""
+    return bin(hash_a ^ hash_b).count("1")
+
+
+@dataclass
+class FrameComparison:
+    """Result of compare_frames."""
+
+    similar: bool
+    score: float  # 1.0 = identical; mean SSIM on the precise path
+    hash_distance: int
+    changed_fraction: float  # share of mask blocks that changed
+    change_mask: Optional[np.ndarray]  # bool, one cell per block; None if sizes differ
+    block_size: float  # source pixels per mask cell
+    method: str  # "hash" or "ssim"
+
+    def summary(self) -> str:
+        if self.changed_fraction == 0:
+            return "the screen looks the same as before"
+        return (
+            f"{self.changed_fraction:.1%} of the screen changed "
+            f"(similarity {self.score:.2f})"
+        )
+
+
+def frame_size(frame: Frame) -> tuple:
+    """(width, height) of a PIL Image or array."""
+    if isinstance(frame, Image.Image):
+        return frame.size
+    return frame.shape[1], frame.shape[0]
+
+
+def crop_frame(frame: Frame, region) -> Frame:
+    """Crop a PIL Image or array to (left, top, width, height)."""
+    left, top, width, height = region
+    if isinstance(frame, Image.Image):
+        return frame.crop((left, top, left + width, top + height))
+    return frame[top : top + height, left : left + width]
+
+
+def _block_mean(values: np.ndarray, block: int) -> np.ndarray:
+    rows = values.shape[0] // block
+    cols = values.shape[1] // block
+    trimmed = values[: rows * block, : cols * block]
+    return trimmed.reshape(rows, block, cols, block).mean(axis=(1, 3))
+
+
+def _ssim_map(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+
+    def blur(x):
+        return cv2.GaussianBlur(x, (7, 7), 1.5)
+
+    mu_a, mu_b = blur(a), blur(b)
+    var_a = blur(a * a) - mu_a * mu_a
+    var_b = blur(b * b) - mu_b * mu_b
+    cov = blur(a * b) - mu_a * mu_b
+    return ((2 * mu_a * mu_b + _C1) * (2 * cov + _C2)) / (
+        (mu_a * mu_a + mu_b * mu_b + _C1) * (var_a + var_b + _C2)
+    )
+
+
+def compare_frames(
+    frame_a: Frame,
+    frame_b: Frame,
+    threshold: float = 0.95,
+    precise: bool = True,
+) -> FrameComparison:
+    """
+    Compare two raw frames, spatially: a moved window counts as a change.
+
+    Identical fingerprints return immediately. Otherwise, with precise=False the
+    perceptual hash distance decides; with precise=True both frames are shrunk
+    to at most PRECISE_MAX_DIM and compared block by block with SSIM and mean
+    absolute error, producing a change mask.
+
+    Args:
+        frame_a: First frame (PIL Image or array)
+        frame_b: Second frame, same size as frame_a
+        threshold: Minimum score for the frames to count as similar
+        precise: Run the block-wise SSIM/MAE comparison
+
+    Returns:
+        FrameComparison with a score, change mask and changed fraction
+    """
+    size_a = frame_size(frame_a)
+    size_b = frame_size(frame_b)
+    if size_a != size_b:
+        return FrameComparison(False, 0.0, 64, 1.0, None, 0, "hash")
+
+    width, height = size_a
+    scale = min(1.0, PRECISE_MAX_DIM / max(width, height))
+    work_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    block = max(1, min(BLOCK_SIZE, work_size[0], work_size[1]))
+    mask_shape = (work_size[1] // block, work_size[0] // block)
+
+    if frame_hash(frame_a) == frame_hash(frame_b):
+        mask = np.zeros(mask_shape, dtype=bool)
+        return FrameComparison(True, 1.0, 0, 0.0, mask, block / scale, "hash")
+
+    distance = hash_distance(perceptual_hash(frame_a), perceptual_hash(frame_b))
+    if not precise:
+        score = 1.0 - distance / 64
+        changed = distance / 64
+        return FrameComparison(
+            score >= threshold, score, distance, changed, None, 0, "hash"
+        )
+
+    a = _small_gray(frame_a, work_size)
+    b = _small_gray(frame_b, work_size)
+    ssim = _ssim_map(a, b)
+    mae = cv2.absdiff(a, b).astype(np.float32)
+
+    block_ssim = _block_mean(ssim, block)
+    block_mae = _block_mean(mae, block)
+    mask = (block_mae > BLOCK_MAE_THRESHOLD) | (block_ssim < BLOCK_SSIM_THRESHOLD)
+
+    score = float(ssim.mean())
+    return FrameComparison(
+        similar=score >= threshold,
+        score=score,
+        hash_distance=distance,
+        changed_fraction=float(mask.mean()) if mask.size else 0.0,
+        change_mask=mask,
+        block_size=block / scale,
+        method="ssim",
+    )
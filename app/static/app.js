@@ -1,3 +1,26 @@
+// Binary WebSocket frames; keep in sync with app/wire.py.
+// Header: kind (u8), version (u8), flags (u16), sequence (u32), little-endian.
+const WIRE_VERSION = 1;
+const WIRE_HEADER_SIZE = 8;
+const FRAME_AUDIO_IN = 0x01;
+const FRAME_IMAGE_CHUNK = 0x02; // id length (u8), upload id, image bytes
+const FRAME_AUDIO_OUT = 0x81;
+const FLAG_VAD_GATED = 0x0001; // AUDIO_IN: silence already dropped by the client
+const IMAGE_CHUNK_BYTES = 64 * 1024;
+
+// Microphone frame length in ms (20-40); override with ?frame_ms= in the page URL
+const CAPTURE_FRAME_MS = Math.max(
+	20,
+	Math.min(
+		40,
+		Number(new URLSearchParams(location.search).get("frame_ms")) || 20
+	)
+);
+// Drop silent microphone frames in the worklet; ?vad=0 leaves it to the server
+const CLIENT_VAD = new URLSearchParams(location.search).get("vad") !== "0";
+// Ask for a history snapshot again if the previous request is unanswered after this long
+const HISTORY_RESYNC_MS = 3000;
+
 class RealtimeDemo {
 	constructor() {
 		this.ws = null;
@@ -5,9 +28,10 @@ class RealtimeDemo {
 		this.isMuted = false;
 		this.isCapturing = false;
 		this.audioContext = null;
-		this.processor = null;
+		this.captureNode = null;
 		this.stream = null;
 		this.sessionId = this.generateSessionId();
+		this.frameSequence = 0; // sequence number of outgoing binary frames
 
 		// Audio playback queue
 		this.audioQueue = [];
@@ -18,6 +42,7 @@ class RealtimeDemo {
 		this.playbackFadeSec = 0.02; // ~20ms fade to reduce clicks
 		this.messageNodes = new Map(); // item_id -> DOM node
 		this.seenItemIds = new Set(); // item_id set for append-only syncing
+		this.resetHistorySync();
 
 		this.initializeElements();
 		this.setupEventListeners();
@@ -126,19 +151,30 @@ class RealtimeDemo {
 					this.stopAudioPlayback();
 					this.ws.send(JSON.stringify({ type: "interrupt" }));
 					const id = "img_" + Math.random().toString(36).slice(2);
-					const CHUNK = 60_000; // ~60KB per frame
+					// Raw bytes in binary IMAGE_CHUNK frames: no base64 on the
+					// wire, and the server can preallocate from the size
+					const bytes = new Uint8Array(
+						await (await fetch(dataUrl)).arrayBuffer()
+					);
+					const mime = dataUrl.slice(5, dataUrl.indexOf(";"));
 					this.ws.send(
 						JSON.stringify({
 							type: "image_start",
 							id,
 							text: promptText,
+							mime,
+							size: bytes.length,
 						})
 					);
-					for (let i = 0; i < dataUrl.length; i += CHUNK) {
-						const chunk = dataUrl.slice(i, i + CHUNK);
-						this.ws.send(
-							JSON.stringify({ type: "image_chunk", id, chunk })
-						);
+					const idBytes = new TextEncoder().encode(id);
+					const offset = WIRE_HEADER_SIZE + 1 + idBytes.length;
+					for (let i = 0; i < bytes.length; i += IMAGE_CHUNK_BYTES) {
+						const chunk = bytes.subarray(i, i + IMAGE_CHUNK_BYTES);
+						const frame = new Uint8Array(offset + chunk.length);
+						frame[WIRE_HEADER_SIZE] = idBytes.length;
+						frame.set(idBytes, WIRE_HEADER_SIZE + 1);
+						frame.set(chunk, offset);
+						this.sendBinaryFrame(FRAME_IMAGE_CHUNK, frame.buffer);
 					}
 					this.ws.send(JSON.stringify({ type: "image_end", id }));
 				} else {
@@ -159,6 +195,46 @@ class RealtimeDemo {
 		return "session_" + Math.random().toString(36).substr(2, 9);
 	}
 
+	sendBinaryFrame(kind, frame, flags = 0) {
+		// frame is an ArrayBuffer with WIRE_HEADER_SIZE bytes reserved up front
+		const header = new DataView(frame, 0, WIRE_HEADER_SIZE);
+		header.setUint8(0, kind);
+		header.setUint8(1, WIRE_VERSION);
+		header.setUint16(2, flags, true);
+		header.setUint32(4, this.frameSequence++ >>> 0, true);
+		this.ws.send(frame);
+	}
+
+	handleBinaryFrame(buffer) {
+		const view = new DataView(buffer);
+		if (
+			buffer.byteLength < WIRE_HEADER_SIZE ||
+			view.getUint8(1) !== WIRE_VERSION
+		) {
+			console.warn("Ignoring malformed binary frame");
+			return;
+		}
+		const kind = view.getUint8(0);
+		if (kind === FRAME_AUDIO_OUT) {
+			// content index (u16), item id length (u16), item id, pad to even offset
+			const itemIdLength = view.getUint16(WIRE_HEADER_SIZE + 2, true);
+			let offset = WIRE_HEADER_SIZE + 4 + itemIdLength;
+			offset += offset % 2;
+			this.playAudio(new Int16Array(buffer, offset));
+		} else {
+			console.warn(`Unknown binary frame kind ${kind}`);
+		}
+	}
+
+	decodeBase64Audio(audioBase64) {
+		const binaryString = atob(audioBase64);
+		const bytes = new Uint8Array(binaryString.length);
+		for (let i = 0; i < binaryString.length; i++) {
+			bytes[i] = binaryString.charCodeAt(i);
+		}
+		return new Int16Array(bytes.buffer);
+	}
+
 	async connect() {
 		if (this.isConnected) return;
 
@@ -167,7 +243,17 @@ class RealtimeDemo {
 			this.connectBtnText.textContent = "Connecting...";
 			this.connectBtnIcon.className = "fas fa-spinner loading";
 
-			this.ws = new WebSocket(`ws://localhost:8000/ws/${this.sessionId}`);
+			// audio=binary: model audio arrives as binary frames instead of base64 JSON;
+			// ?pacing=fast|normal|cautious on the page sets this session's input speed
+			const params = new URLSearchParams({ audio: "binary" });
+			const pacing = new URLSearchParams(location.search).get("pacing");
+			if (pacing) params.set("pacing", pacing);
+			// Each connection gets a new server-side history, starting at version 0
+			this.resetHistorySync();
+			this.ws = new WebSocket(
+				`ws://localhost:8000/ws/${this.sessionId}?${params}`
+			);
+			this.ws.binaryType = "arraybuffer";
 
 			this.ws.onopen = () => {
 				this.isConnected = true;
@@ -180,15 +266,22 @@ class RealtimeDemo {
 			};
 
 			this.ws.onmessage = (event) => {
+				if (event.data instanceof ArrayBuffer) {
+					this.handleBinaryFrame(event.data);
+					return;
+				}
 				const data = JSON.parse(event.data);
 				this.handleRealtimeEvent(data);
 			};
 
-			this.ws.onclose = () => {
+			this.ws.onclose = (event) => {
 				this.isConnected = false;
 				this.updateConnectionUI("disconnected", "Disconnected");
+				// 1013: server full; 1001: server shutting down; 4000: replaced
+				// by a newer connection with the same session id
+				const reason = event.reason ? ` (${event.reason})` : "";
 				this.addSystemMessage(
-					"🔌 Connection lost. Click Connect to reconnect.",
+					`🔌 Connection lost${reason}. Click Connect to reconnect.`,
 					"warning"
 				);
 			};
@@ -330,45 +423,43 @@ class RealtimeDemo {
 				},
 			});
 
-			this.audioContext = new AudioContext({
-				sampleRate: 24000,
-				latencyHint: "interactive",
-			});
+			// Run at the device's native rate: browsers may ignore a 24 kHz
+			// request (and Firefox rejects mixing rates), so the worklet resamples
+			this.audioContext = new AudioContext({ latencyHint: "interactive" });
+			await this.audioContext.audioWorklet.addModule("capture-worklet.js");
 			const source = this.audioContext.createMediaStreamSource(
 				this.stream
 			);
 
-			// Create a script processor to capture audio data
-			this.processor = this.audioContext.createScriptProcessor(
-				4096,
-				1,
-				1
+			// Resampling and PCM16 conversion happen on the audio thread; the
+			// worklet posts ready-to-send frames with the header space reserved
+			this.captureNode = new AudioWorkletNode(
+				this.audioContext,
+				"pcm-capture",
+				{
+					numberOfInputs: 1,
+					numberOfOutputs: 0,
+					channelCount: 1,
+					channelCountMode: "explicit",
+					processorOptions: {
+						frameMs: CAPTURE_FRAME_MS,
+						headerSize: WIRE_HEADER_SIZE,
+						vad: CLIENT_VAD,
+					},
+				}
 			);
-			source.connect(this.processor);
-			this.processor.connect(this.audioContext.destination);
-
-			this.processor.onaudioprocess = (event) => {
-				if (
-					!this.isMuted &&
-					this.ws &&
-					this.ws.readyState === WebSocket.OPEN
-				) {
-					const inputBuffer = event.inputBuffer.getChannelData(0);
-					const int16Buffer = new Int16Array(inputBuffer.length);
-
-					// Convert float32 to int16
-					for (let i = 0; i < inputBuffer.length; i++) {
-						int16Buffer[i] = Math.max(
-							-32768,
-							Math.min(32767, inputBuffer[i] * 32768)
-						);
-					}
-
-					this.ws.send(
-						JSON.stringify({
-							type: "audio",
-							data: Array.from(int16Buffer),
-						})
+			source.connect(this.captureNode);
+
+			this.captureNode.port.onmessage = (event) => {
+				if (!this.ws || this.ws.readyState !== WebSocket.OPEN) return;
+				if (!(event.data instanceof ArrayBuffer)) {
+					// Periodic VAD counters, logged by the server per session
+					this.ws.send(JSON.stringify(event.data));
+				} else if (!this.isMuted) {
+					this.sendBinaryFrame(
+						FRAME_AUDIO_IN,
+						event.data,
+						CLIENT_VAD ? FLAG_VAD_GATED : 0
 					);
 				}
 			};
@@ -385,9 +476,10 @@ class RealtimeDemo {
 
 		this.isCapturing = false;
 
-		if (this.processor) {
-			this.processor.disconnect();
-			this.processor = null;
+		if (this.captureNode) {
+			this.captureNode.port.onmessage = null;
+			this.captureNode.disconnect();
+			this.captureNode = null;
 		}
 
 		if (this.audioContext) {
@@ -419,7 +511,9 @@ class RealtimeDemo {
 		// Handle specific event types
 		switch (event.type) {
 			case "audio":
-				this.playAudio(event.audio);
+				if (event.audio) {
+					this.playAudio(this.decodeBase64Audio(event.audio));
+				}
 				break;
 			case "audio_interrupted":
 				this.stopAudioPlayback();
@@ -434,6 +528,19 @@ class RealtimeDemo {
 				this.syncMissingFromHistory(event.history);
 				this.updateLastMessageFromHistory(event.history);
 				break;
+			case "history_snapshot":
+				this.history = event.history || [];
+				this.historyVersion = event.version;
+				this.historyResyncAt = 0;
+				this.syncMissingFromHistory(this.history);
+				this.updateLastMessageFromHistory(this.history);
+				break;
+			case "history_delta":
+				if (this.applyHistoryDelta(event)) {
+					this.syncMissingFromHistory(this.history);
+					this.updateLastMessageFromHistory(this.history);
+				}
+				break;
 			case "history_added":
 				// Append just the new item without clearing the thread.
 				if (event.item) {
@@ -442,6 +549,45 @@ class RealtimeDemo {
 				break;
 		}
 	}
+	resetHistorySync() {
+		this.history = []; // conversation items, rebuilt from history deltas
+		this.historyVersion = 0;
+		this.historyResyncAt = 0; // when a resync was last requested, 0 if none
+	}
+
+	applyHistoryDelta(delta) {
+		if (delta.base !== this.historyVersion) {
+			// Missed a delta; ask the server for the full (stripped) history,
+			// again if the snapshot has not arrived within HISTORY_RESYNC_MS
+			const now = Date.now();
+			if (
+				now - this.historyResyncAt > HISTORY_RESYNC_MS &&
+				this.ws &&
+				this.ws.readyState === WebSocket.OPEN
+			) {
+				this.historyResyncAt = now;
+				this.ws.send(JSON.stringify({ type: "history_resync" }));
+			}
+			return false;
+		}
+		const removed = new Set(delta.removed || []);
+		const byId = new Map();
+		for (const item of this.history) {
+			if (!removed.has(item.item_id)) byId.set(item.item_id, item);
+		}
+		let order = this.history
+			.map((item) => item.item_id)
+			.filter((id) => !removed.has(id));
+		for (const item of delta.items || []) {
+			if (!byId.has(item.item_id)) order.push(item.item_id);
+			byId.set(item.item_id, item);
+		}
+		if (delta.order) order = delta.order;
+		this.history = order.map((id) => byId.get(id)).filter(Boolean);
+		this.historyVersion = delta.version;
+		return true;
+	}
+
 	updateLastMessageFromHistory(history) {
 		if (!history || !Array.isArray(history) || history.length === 0) return;
 		// Find the last message item in history
@@ -667,7 +813,14 @@ class RealtimeDemo {
 				!output.toLowerCase().includes("failed") &&
 				!output.toLowerCase().includes("error");
 			title = isSuccess ? `✅ Tool Completed` : `❌ Tool Failed`;
-			description = `${event.tool}: ${output || "No output"}`;
+			// Screenshots arrive as /blobs/<digest> URLs; show them as thumbnails
+			// (the browser caches each one, so repeats cost nothing)
+			const rendered = output.replace(
+				/\/blobs\/[0-9a-f]{32}/g,
+				(url) =>
+					`<img src="${url}" alt="Screenshot" style="max-width: 160px; border-radius: 4px; display: block; margin: 4px 0;">`
+			);
+			description = `${event.tool}: ${rendered || "No output"}`;
 			eventClass = `tool ${isSuccess ? "success" : "error"}`;
 		}
 
@@ -687,15 +840,15 @@ class RealtimeDemo {
 		this.toolsContent.scrollTop = this.toolsContent.scrollHeight;
 	}
 
-	async playAudio(audioBase64) {
+	async playAudio(samples) {
 		try {
-			if (!audioBase64 || audioBase64.length === 0) {
+			if (!samples || samples.length === 0) {
 				console.warn("Received empty audio data, skipping playback");
 				return;
 			}
 
 			// Add to queue
-			this.audioQueue.push(audioBase64);
+			this.audioQueue.push(samples);
 
 			// Start processing queue if not already playing
 			if (!this.isPlayingAudio) {
@@ -729,24 +882,16 @@ class RealtimeDemo {
 		}
 
 		while (this.audioQueue.length > 0) {
-			const audioBase64 = this.audioQueue.shift();
-			await this.playAudioChunk(audioBase64);
+			const samples = this.audioQueue.shift();
+			await this.playAudioChunk(samples);
 		}
 
 		this.isPlayingAudio = false;
 	}
 
-	async playAudioChunk(audioBase64) {
+	async playAudioChunk(int16Array) {
 		return new Promise((resolve, reject) => {
 			try {
-				// Decode base64 to ArrayBuffer
-				const binaryString = atob(audioBase64);
-				const bytes = new Uint8Array(binaryString.length);
-				for (let i = 0; i < binaryString.length; i++) {
-					bytes[i] = binaryString.charCodeAt(i);
-				}
-
-				const int16Array = new Int16Array(bytes.buffer);
 
 				if (int16Array.length === 0) {
 					console.warn("Audio chunk has no samples, skipping");
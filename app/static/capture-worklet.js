@@ -0,0 +1,199 @@
+// Microphone capture on the audio rendering thread.
+//
+// Takes mono float32 input at the AudioContext's rate (whatever the device
+// gave us), resamples it to 24 kHz, converts to PCM16 and posts fixed-size
+// frames to the main thread. Each frame is an ArrayBuffer with headerSize
+// bytes reserved up front for the wire header (see app.js / app/wire.py), and
+// is transferred rather than copied.
+//
+// With the `vad` option, silent frames are dropped here (same algorithm as
+// app/vad.py): a frame is speech when its level is above an absolute
+// threshold and a tracked noise floor, with extra headroom required for hissy
+// frames (high zero-crossing rate). Sending continues for hangoverMs after
+// speech (longer than the session's end-of-turn silence, TURN_SILENCE_MS in
+// app/vad.py) and the last prerollMs of silence is sent ahead of it. Counters are
+// posted every STATS_INTERVAL_FRAMES frames as {type: "vad_stats", ...}.
+
+const TARGET_RATE = 24000;
+const VAD_MARGIN_DB = 10;
+const VAD_MAX_ZCR = 0.35;
+const VAD_ZCR_MARGIN_DB = 20;
+const STATS_INTERVAL_FRAMES = 250;
+
+// RBJ cookbook low-pass biquad, used as an anti-aliasing filter when the
+// device rate is above 24 kHz.
+class LowPass {
+	constructor(cutoff, rate) {
+		const w0 = (2 * Math.PI * cutoff) / rate;
+		const alpha = Math.sin(w0) / (2 * Math.SQRT1_2);
+		const cos = Math.cos(w0);
+		const a0 = 1 + alpha;
+		this.b0 = (1 - cos) / 2 / a0;
+		this.b1 = (1 - cos) / a0;
+		this.b2 = this.b0;
+		this.a1 = (-2 * cos) / a0;
+		this.a2 = (1 - alpha) / a0;
+		this.x1 = this.x2 = this.y1 = this.y2 = 0;
+	}
+
+	process(x) {
+		const y =
+			this.b0 * x +
+			this.b1 * this.x1 +
+			this.b2 * this.x2 -
+			this.a1 * this.y1 -
+			this.a2 * this.y2;
+		this.x2 = this.x1;
+		this.x1 = x;
+		this.y2 = this.y1;
+		this.y1 = y;
+		return y;
+	}
+}
+
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+	constructor(options) {
+		super();
+		const opts = options.processorOptions || {};
+		this.headerSize = opts.headerSize || 0;
+		this.frameSamples = Math.round((TARGET_RATE * (opts.frameMs || 20)) / 1000);
+
+		// Input samples per output sample (`sampleRate` is the context rate)
+		this.ratio = sampleRate / TARGET_RATE;
+		// Read position relative to the current block; -1 is the previous block's last sample
+		this.position = 0;
+		this.previous = 0;
+		// Two cascaded biquads (4th order) just below the new Nyquist frequency
+		this.filters =
+			this.ratio > 1
+				? [
+						new LowPass(0.45 * TARGET_RATE, sampleRate),
+						new LowPass(0.45 * TARGET_RATE, sampleRate),
+				  ]
+				: [];
+		this.filtered = new Float32Array(128);
+
+		this.vad = Boolean(opts.vad);
+		this.thresholdDb = opts.thresholdDb ?? -50;
+		this.hangoverMs = opts.hangoverMs ?? 700;
+		this.prerollFrames = Math.ceil((opts.prerollMs ?? 300) / (opts.frameMs || 20));
+		this.frameMs = (this.frameSamples * 1000) / TARGET_RATE;
+		this.noiseFloorDb = -60;
+		this.hangoverLeft = 0;
+		this.preroll = [];
+		this.stats = { frames_in: 0, frames_sent: 0, frames_dropped: 0, ms_dropped: 0 };
+
+		this.newFrame();
+	}
+
+	isSpeech(samples) {
+		let energy = 0;
+		let crossings = 0;
+		for (let i = 0; i < samples.length; i++) {
+			const x = samples[i] / 32768;
+			energy += x * x;
+			if (i > 0 && samples[i] < 0 !== samples[i - 1] < 0) crossings++;
+		}
+		const rms = Math.sqrt(energy / samples.length);
+		const levelDb = 20 * Math.log10(Math.max(rms, 1e-6));
+		const zcr = crossings / Math.max(1, samples.length - 1);
+
+		const loud =
+			levelDb > Math.max(this.thresholdDb, this.noiseFloorDb + VAD_MARGIN_DB);
+		const voiced =
+			loud &&
+			(zcr < VAD_MAX_ZCR || levelDb > this.noiseFloorDb + VAD_ZCR_MARGIN_DB);
+		if (!voiced) {
+			this.noiseFloorDb += 0.05 * (levelDb - this.noiseFloorDb);
+		}
+		return voiced;
+	}
+
+	emit(buffer, samples) {
+		if (!this.vad) {
+			this.port.postMessage(buffer, [buffer]);
+			return;
+		}
+
+		this.stats.frames_in++;
+		if (this.isSpeech(samples)) {
+			this.hangoverLeft = this.hangoverMs;
+		} else if (this.hangoverLeft > 0) {
+			this.hangoverLeft -= this.frameMs;
+		} else {
+			this.preroll.push(buffer);
+			if (this.preroll.length > this.prerollFrames) {
+				this.preroll.shift();
+				this.stats.frames_dropped++;
+				this.stats.ms_dropped += this.frameMs;
+			}
+			this.maybePostStats();
+			return;
+		}
+
+		for (const held of this.preroll) this.port.postMessage(held, [held]);
+		this.port.postMessage(buffer, [buffer]);
+		this.stats.frames_sent += this.preroll.length + 1;
+		this.preroll = [];
+		this.maybePostStats();
+	}
+
+	maybePostStats() {
+		if (this.stats.frames_in % STATS_INTERVAL_FRAMES === 0) {
+			this.port.postMessage({ type: "vad_stats", ...this.stats });
+		}
+	}
+
+	newFrame() {
+		this.buffer = new ArrayBuffer(this.headerSize + this.frameSamples * 2);
+		this.samples = new Int16Array(this.buffer, this.headerSize, this.frameSamples);
+		this.filled = 0;
+	}
+
+	push(value) {
+		this.samples[this.filled++] = Math.max(-32768, Math.min(32767, value * 32768));
+		if (this.filled === this.frameSamples) {
+			this.emit(this.buffer, this.samples);
+			this.newFrame();
+		}
+	}
+
+	process(inputs) {
+		const channel = inputs[0] && inputs[0][0];
+		if (!channel) return true;
+
+		if (this.ratio === 1) {
+			for (let i = 0; i < channel.length; i++) this.push(channel[i]);
+			return true;
+		}
+
+		let input = channel;
+		if (this.filters.length) {
+			if (this.filtered.length !== channel.length) {
+				this.filtered = new Float32Array(channel.length);
+			}
+			for (let i = 0; i < channel.length; i++) {
+				let x = channel[i];
+				for (const filter of this.filters) x = filter.process(x);
+				this.filtered[i] = x;
+			}
+			input = this.filtered;
+		}
+
+		// Linear interpolation between neighbouring (filtered) input samples
+		const last = input.length - 1;
+		while (this.position < last) {
+			const index = Math.floor(this.position);
+			const frac = this.position - index;
+			const a = index < 0 ? this.previous : input[index];
+			const b = input[index + 1];
+			this.push(a + (b - a) * frac);
+			this.position += this.ratio;
+		}
+		this.position -= input.length;
+		this.previous = input[last];
+		return true;
+	}
+}
+
+registerProcessor("pcm-capture", PcmCaptureProcessor);
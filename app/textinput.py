@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import keyboard
+import pyautogui
+import pyperclip  # installed with pyautogui
+
+logger = logging.getLogger("OTTO.textinput")
+
+METHODS = ("keys", "unicode", "paste")
+METHOD_NAMES = {
+    "keys": "per-key typing",
+    "unicode": "unicode injection",
+    "paste": "clipboard paste",
+}
+
+# "auto" picks per call (see choose_method); "keys", "unicode" or "paste" forces one
+TYPE_METHOD = os.getenv("OTTO_TYPE_METHOD", "auto").strip().lower()
+if TYPE_METHOD not in (*METHODS, "auto"):
+    logger.warning(f"Unknown OTTO_TYPE_METHOD '{TYPE_METHOD}', using 'auto'")
+    TYPE_METHOD = "auto"
+# Text at least this long is pasted through the clipboard
+TYPE_PASTE_MIN_CHARS = int(os.getenv("OTTO_TYPE_PASTE_MIN_CHARS", "200"))
+# Plain ASCII text up to this long is typed key by key, which every app handles
+TYPE_KEYS_MAX_CHARS = int(os.getenv("OTTO_TYPE_KEYS_MAX_CHARS", "40"))
+# Time the target app gets to read the clipboard before it is restored
+PASTE_RESTORE_DELAY = 0.3
+
+
+@dataclass
+class TypingResult:
+    method: str
+    chars: int
+    seconds: float
+
+    @property
+    def chars_per_second(self) -> float:
+        return self.chars / self.seconds if self.seconds > 0 else float("inf")
+
+    def summary(self) -> str:
+        rate = self.chars_per_second
+        rate_text = f"{rate:.0f} chars/s" if rate != float("inf") else "instant"
+        return (
+            f"(Typed {self.chars} characters by {METHOD_NAMES[self.method]} in "
+            f"{self.seconds:.2f} s, {rate_text})"
+        )
+
+
+def resolve_method(method: Optional[str]) -> Optional[str]:
+    """Normalized method name ("auto" for None), or None if it isn't one."""
+    method = (method or "auto").strip().lower()
+    return method if method in (*METHODS, "auto") else None
+
+
+def unknown_method_message(method: str) -> str:
+    return f"Unknown typing method '{method}'; use one of: {', '.join(METHODS)}, auto"
+
+
+def choose_method(text: str, method: Optional[str] = None) -> str:
+    """
+    Pick how to enter text.
+
+    Short ASCII text is typed key by key, as a person would, so autocomplete
+    and key handlers see every keystroke. Anything pyautogui can't type
+    (non-ASCII) or longer text goes in as unicode characters in one burst, and
+    long text is pasted through the clipboard.
+
+    Raises:
+        ValueError: method is not "keys", "unicode", "paste" or "auto"
+    """
+    chosen = resolve_method(method)
+    if chosen is None:
+        raise ValueError(unknown_method_message(method))
+    if chosen == "auto":
+        chosen = TYPE_METHOD
+    if chosen in METHODS:
+        return chosen
+    if len(text) >= TYPE_PASTE_MIN_CHARS:
+        return "paste"
+    if text.isascii() and len(text) <= TYPE_KEYS_MAX_CHARS:
+        return "keys"
+    return "unicode"
+
+
+def _paste(text: str) -> None:
+    try:
+        saved = pyperclip.paste()
+    except pyperclip.PyperclipException:
+        saved = None
+    pyperclip.copy(text)
+    keyboard.press_and_release("ctrl+v")
+    time.sleep(PASTE_RESTORE_DELAY)
+    # Only text can be saved and restored; other clipboard content (e.g. an
+    # image) reads as empty and is left replaced by the pasted text
+    if saved:
+        pyperclip.copy(saved)
+
+
+def enter_text(
+    text: str, method: Optional[str] = None, key_interval: float = 0.0
+) -> TypingResult:
+    """
+    Type text into the focused window. Blocking; call via _inject.
+
+    Args:
+        text: Text to enter
+        method: "keys", "unicode", "paste", or None/"auto" to choose
+        key_interval: Seconds between keystrokes when typing key by key
+
+    Returns:
+        TypingResult with the method used and the time it took
+    """
+    chosen = choose_method(text, method)
+    started = time.perf_counter()
+    if chosen == "paste":
+        try:
+            _paste(text)
+        except pyperclip.PyperclipException as e:
+            logger.warning(f"Clipboard unavailable, injecting text instead: {e}")
+            chosen = "unicode"
+    if chosen == "unicode":
+        keyboard.write(text, delay=0)
+    elif chosen == "keys":
+        pyautogui.write(text, interval=key_interval)
+    result = TypingResult(chosen, len(text), time.perf_counter() - started)
+    logger.info(result.summary())
+    return result
@@ -0,0 +1,239 @@
+import base64
+import binascii
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image
+
+from encoder import encode_image, resolve_options
+
+logger = logging.getLogger("OTTO.uploads")
+
+# Largest single image accepted, and the most a session may have in flight
+UPLOAD_MAX_BYTES = int(float(os.getenv("OTTO_UPLOAD_MAX_MB", "10")) * 1024 * 1024)
+UPLOAD_SESSION_BYTES = int(
+    float(os.getenv("OTTO_UPLOAD_SESSION_MB", "20")) * 1024 * 1024
+)
+# Uploads with no chunk for this many seconds are dropped
+UPLOAD_TIMEOUT = float(os.getenv("OTTO_UPLOAD_TIMEOUT", "30"))
+# Re-encode uploads whose longest side exceeds this (0 forwards them as sent)
+UPLOAD_MAX_DIM = int(os.getenv("OTTO_UPLOAD_MAX_DIM", "0"))
+
+DEFAULT_PROMPT = "Please describe this image."
+
+
+class UploadError(Exception):
+    """An upload was rejected (unknown id, over quota, malformed data)."""
+
+
+@dataclass
+class Upload:
+    """One image being reassembled from chunks."""
+
+    id: str
+    text: str
+    mime: Optional[str]
+    buffer: bytearray
+    size: int = 0  # bytes of buffer filled so far
+    chunks: int = 0
+    last_activity: float = field(default_factory=time.monotonic)
+    # Text uploads: the data URL prefix until the comma is seen, then base64
+    # characters left over from the previous chunk (fewer than 4)
+    _prefix: str = ""
+    _pending: str = ""
+    _in_payload: bool = False
+
+    def write(self, data) -> None:
+        end = self.size + len(data)
+        if end > UPLOAD_MAX_BYTES:
+            raise UploadError(
+                f"Image {self.id} is larger than {UPLOAD_MAX_BYTES // (1024 * 1024)} MB"
+            )
+        if end > len(self.buffer):
+            # Declared size was missing or wrong; grow geometrically
+            self.buffer.extend(bytes(max(end - len(self.buffer), len(self.buffer))))
+        self.buffer[self.size : end] = data
+        self.size = end
+
+    def write_text(self, chunk: str) -> None:
+        """Decode the next piece of a base64 data URL into the buffer."""
+        if not self._in_payload:
+            self._prefix += chunk
+            header, comma, rest = self._prefix.partition(",")
+            if not comma:
+                if len(self._prefix) > 256:
+                    raise UploadError(f"Image {self.id} is not a base64 data URL")
+                return
+            if not header.startswith("data:") or not header.endswith(";base64"):
+                raise UploadError(f"Image {self.id} is not a base64 data URL")
+            self.mime = self.mime or header[5:-7]
+            self._in_payload = True
+            self._prefix = ""
+            chunk = rest
+
+        text = self._pending + chunk
+        usable = len(text) - len(text) % 4
+        self._pending = text[usable:]
+        if usable:
+            try:
+                self.write(base64.b64decode(text[:usable], validate=True))
+            except (binascii.Error, ValueError):
+                raise UploadError(f"Image {self.id} has invalid base64 data")
+
+    def data(self) -> bytes:
+        if self._pending:
+            raise UploadError(f"Image {self.id} ended with truncated base64 data")
+        return bytes(memoryview(self.buffer)[: self.size])
+
+
+class UploadManager:
+    """
+    Reassembles chunked image uploads for one session.
+
+    Chunks are decoded as they arrive into a bytearray preallocated from the
+    declared size, so no per-chunk strings are kept and a data URL is built
+    only once, at the end. Uploads count against a per-session byte quota and
+    are dropped when they stop receiving chunks.
+    """
+
+    def __init__(
+        self,
+        quota: int = UPLOAD_SESSION_BYTES,
+        timeout: float = UPLOAD_TIMEOUT,
+    ):
+        self.quota = quota
+        self.timeout = timeout
+        self._uploads: dict[str, Upload] = {}
+        self.stats = {"completed": 0, "rejected": 0, "expired": 0, "bytes": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return sum(len(upload.buffer) for upload in self._uploads.values())
+
+    def start(
+        self, upload_id: str, text: Optional[str], size=None, mime=None
+    ) -> Upload:
+        """
+        Begin an upload.
+
+        Args:
+            upload_id: Client-chosen id
+            text: Prompt to send with the image
+            size: Expected decoded size in bytes, if the client knows it
+            mime: Image MIME type for binary uploads
+        """
+        self.expire()
+        try:
+            expected = int(size or 0)
+        except (TypeError, ValueError, OverflowError):
+            expected = -1
+        if expected < 0:
+            self.stats["rejected"] += 1
+            raise UploadError(f"Image {upload_id} has an invalid size: {size!r}")
+        if expected > UPLOAD_MAX_BYTES:
+            self.stats["rejected"] += 1
+            raise UploadError(
+                f"Image {upload_id} is larger than {UPLOAD_MAX_BYTES // (1024 * 1024)} MB"
+            )
+        if self.in_flight + expected > self.quota:
+            self.stats["rejected"] += 1
+            raise UploadError("Too many image uploads in progress")
+        upload = Upload(
+            id=upload_id,
+            text=text if isinstance(text, str) and text else DEFAULT_PROMPT,
+            mime=mime if isinstance(mime, str) and mime else None,
+            buffer=bytearray(expected),
+        )
+        self._uploads[upload_id] = upload
+        return upload
+
+    def _get(self, upload_id: str) -> Upload:
+        # Expired uploads count as unknown; this also frees any other stalled ones
+        self.expire()
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError(f"Unknown image id {upload_id}")
+        upload.last_activity = time.monotonic()
+        upload.chunks += 1
+        return upload
+
+    def _checked(self, upload: Upload, write) -> Upload:
+        try:
+            write()
+        except UploadError:
+            self._uploads.pop(upload.id, None)
+            self.stats["rejected"] += 1
+            raise
+        if self.in_flight > self.quota:
+            self._uploads.pop(upload.id, None)
+            self.stats["rejected"] += 1
+            raise UploadError("Too many image uploads in progress")
+        return upload
+
+    def add_text_chunk(self, upload_id: str, chunk: str) -> Upload:
+        """Append a piece of a base64 data URL."""
+        upload = self._get(upload_id)
+        if not isinstance(chunk, str):
+            self._uploads.pop(upload_id, None)
+            self.stats["rejected"] += 1
+            raise UploadError(f"Image {upload_id} sent a chunk that is not text")
+        return self._checked(upload, lambda: upload.write_text(chunk))
+
+    def add_binary_chunk(self, upload_id: str, data) -> Upload:
+        """Append raw image bytes (from a binary IMAGE_CHUNK frame)."""
+        upload = self._get(upload_id)
+        return self._checked(upload, lambda: upload.write(data))
+
+    def finish(self, upload_id: str) -> tuple[Upload, bytes]:
+        """Complete an upload; returns it with its image bytes."""
+        self.expire()
+        upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            raise UploadError(f"Unknown image id {upload_id}")
+        data = upload.data()
+        if not data:
+            raise UploadError("Empty image.")
+        self.stats["completed"] += 1
+        self.stats["bytes"] += len(data)
+        return upload, data
+
+    def expire(self) -> list[str]:
+        """Drop uploads that have not received a chunk within the timeout."""
+        now = time.monotonic()
+        stale = [
+            upload_id
+            for upload_id, upload in self._uploads.items()
+            if now - upload.last_activity > self.timeout
+        ]
+        for upload_id in stale:
+            del self._uploads[upload_id]
+            self.stats["expired"] += 1
+        if stale:
+            logger.info(f"Dropped abandoned image uploads: {', '.join(stale)}")
+        return stale
+
+    def close(self) -> None:
+        self._uploads.clear()
+
+
+def to_data_url(
+    data: bytes, mime: Optional[str], max_dimension: int = UPLOAD_MAX_DIM
+) -> str:
+    """
+    Turn uploaded image bytes into the data URL sent to the model, re-encoding
+    (as JPEG) when the image is larger than max_dimension. CPU-bound; call via
+    run_cpu.
+    """
+    if max_dimension > 0:
+        with Image.open(BytesIO(data)) as image:
+            if max(image.size) > max_dimension:
+                options = resolve_options(
+                    preset="balanced", max_dimension=max_dimension
+                )
+                return encode_image(image.convert("RGB"), options).data_url
+    mime = mime or Image.MIME.get(Image.open(BytesIO(data)).format, "image/png")
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
@@ -0,0 +1,141 @@
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+logger = logging.getLogger("OTTO.vad")
+
+# Server-side gate for microphone audio from clients that don't run their own
+# VAD (see capture-worklet.js for the client version of the same algorithm).
+SERVER_VAD = os.getenv("OTTO_SERVER_VAD", "1").strip().lower() in ("1", "true", "yes")
+# Absolute level below which audio is never speech
+VAD_THRESHOLD_DB = float(os.getenv("OTTO_VAD_THRESHOLD_DB", "-50"))
+# Speech must also be this far above the tracked noise floor
+VAD_MARGIN_DB = 10.0
+# Noisy, hissy frames (high zero-crossing rate) need this much more headroom
+VAD_MAX_ZCR = 0.35
+VAD_ZCR_MARGIN_DB = 20.0
+# Keep sending this long after speech stops. It must outlast the realtime
+# model's own end-of-turn silence window, or turns would never end.
+VAD_HANGOVER_MS = int(os.getenv("OTTO_VAD_HANGOVER_MS", "700"))
+# Audio from just before speech starts, sent along so onsets aren't clipped
+VAD_PREROLL_MS = int(os.getenv("OTTO_VAD_PREROLL_MS", "300"))
+# Silence after which the realtime model ends the user's turn. Set explicitly
+# (server_vad) because the gates stop sending audio once the hangover runs out:
+# a model-side timeout longer than the hangover (e.g. semantic_vad's) would
+# then never see enough silence to fire.
+TURN_SILENCE_MS = min(
+    int(os.getenv("OTTO_TURN_SILENCE_MS", "500")), max(100, VAD_HANGOVER_MS - 200)
+)
+
+SAMPLE_RATE = 24000
+
+
+def turn_detection() -> dict:
+    """Turn detection settings for the realtime session, matched to the gates."""
+    return {"type": "server_vad", "silence_duration_ms": TURN_SILENCE_MS}
+
+
+@dataclass
+class VadStats:
+    """Counters for one stream of audio frames."""
+
+    frames_in: int = 0
+    frames_sent: int = 0
+    frames_dropped: int = 0
+    ms_dropped: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.frames_sent}/{self.frames_in} frames sent, "
+            f"{self.frames_dropped} silent frames dropped ({self.ms_dropped / 1000:.1f} s)"
+        )
+
+
+@dataclass
+class VoiceGate:
+    """
+    Energy + zero-crossing voice activity gate with hangover and pre-roll.
+
+    Feed it PCM16 chunks of any size; it returns the chunks that should be
+    forwarded (possibly several at speech onset, when the pre-roll is flushed).
+    """
+
+    threshold_db: float = VAD_THRESHOLD_DB
+    hangover_ms: int = VAD_HANGOVER_MS
+    preroll_ms: int = VAD_PREROLL_MS
+    stats: VadStats = field(default_factory=VadStats)
+    noise_floor_db: float = -60.0
+    _hangover_left: float = 0.0
+    _preroll: deque = field(default_factory=deque)
+    _preroll_ms: float = 0.0
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        if samples.size == 0:
+            return False
+        x = samples.astype(np.float32) / 32768.0
+        rms = float(np.sqrt(np.mean(x * x)))
+        level_db = 20 * np.log10(max(rms, 1e-6))
+        zcr = (
+            float(np.mean(np.signbit(x[1:]) != np.signbit(x[:-1])))
+            if x.size > 1
+            else 0.0
+        )
+
+        loud = level_db > max(self.threshold_db, self.noise_floor_db + VAD_MARGIN_DB)
+        voiced = loud and (
+            zcr < VAD_MAX_ZCR or level_db > self.noise_floor_db + VAD_ZCR_MARGIN_DB
+        )
+        if not voiced:
+            # Track the background level slowly so steady noise stays gated
+            self.noise_floor_db += 0.05 * (level_db - self.noise_floor_db)
+        return voiced
+
+    def process(self, pcm) -> list:
+        """
+        Gate one chunk of PCM16 audio.
+
+        Args:
+            pcm: bytes or memoryview of little-endian int16 samples
+
+        Returns:
+            List of chunks to forward, oldest first (empty while silent)
+        """
+        # A trailing odd byte is not a sample; ignore it rather than raise
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+        duration_ms = samples.size * 1000 / SAMPLE_RATE
+        self.stats.frames_in += 1
+
+        if self.is_speech(samples):
+            self._hangover_left = self.hangover_ms
+        elif self._hangover_left > 0:
+            self._hangover_left -= duration_ms
+        else:
+            self._preroll.append((pcm, duration_ms))
+            self._preroll_ms += duration_ms
+            while (
+                self._preroll
+                and self._preroll_ms - self._preroll[0][1] >= self.preroll_ms
+            ):
+                _, dropped_ms = self._preroll.popleft()
+                self._preroll_ms -= dropped_ms
+                self.stats.frames_dropped += 1
+                self.stats.ms_dropped += dropped_ms
+            return []
+
+        out = [chunk for chunk, _ in self._preroll]
+        out.append(pcm)
+        self.stats.frames_sent += len(out)
+        self._preroll.clear()
+        self._preroll_ms = 0.0
+        return out
+
+    def finish(self) -> None:
+        """Count whatever is still held in the pre-roll as dropped."""
+        for _, duration_ms in self._preroll:
+            self.stats.frames_dropped += 1
+            self.stats.ms_dropped += duration_ms
+        self._preroll.clear()
+        self._preroll_ms = 0.0
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from executor import run_io
+from settle import grab_and_hash
+from similarity import Frame
+from windows import WindowRecord, WindowSnapshotService
+
+logger = logging.getLogger("OTTO.waits")
+
+# Polling starts fast, to catch quick changes, and backs off to this interval
+WAIT_POLL_MIN = 0.05
+WAIT_POLL_MAX = float(os.getenv("OTTO_WAIT_POLL_MAX", "0.5"))
+# Longest wait a tool may ask for, so a forgotten condition can't hang a session
+WAIT_TIMEOUT_MAX = float(os.getenv("OTTO_WAIT_TIMEOUT_MAX", "60"))
+
+WINDOW_STATES = ("appear", "active", "close")
+
+
+@dataclass
+class WaitResult:
+    """Outcome of a wait_for_* call."""
+
+    met: bool
+    elapsed: float  # seconds until the condition held, or the timeout
+    polls: int
+    window: Optional[WindowRecord] = None  # wait_for_window: the matching window
+    frame: Any = None  # wait_for_change: the first changed frame
+
+    def summary(self) -> str:
+        outcome = "after" if self.met else "timed out after"
+        return f"({outcome} {self.elapsed:.2f} s, {self.polls} checks)"
+
+
+def _clamp_timeout(timeout: float) -> float:
+    return min(max(timeout, 0.0), WAIT_TIMEOUT_MAX)
+
+
+def _next_interval(interval: float) -> float:
+    return min(interval * 1.5, WAIT_POLL_MAX)
+
+
+def _window_state(
+    snapshots: WindowSnapshotService, pattern: str, state: str, max_age: float
+) -> tuple[bool, Optional[WindowRecord]]:
+    # Fuzzy matches are too loose to decide that a window appeared or is still open
+    matches = [
+        m for m in snapshots.get(max_age=max_age).find(pattern, limit=10) if m.strong
+    ]
+    if state == "close":
+        return not matches, None
+    if state == "active":
+        match = next((m for m in matches if m.record.active), None)
+        return match is not None, match.record if match else None
+    return bool(matches), matches[0].record if matches else None
+
+
+async def wait_for_window(
+    snapshots: WindowSnapshotService,
+    pattern: str,
+    state: str = "appear",
+    timeout: float = 10.0,
+) -> WaitResult:
+    """
+    Wait until a window matching a title_pattern appears, becomes the active
+    window, or closes.
+
+    Args:
+        snapshots: Window snapshot service to poll
+        pattern: title_pattern as accepted by WindowIndex.search
+        state: "appear", "active" or "close"
+        timeout: Maximum time to wait in seconds (capped at WAIT_TIMEOUT_MAX)
+
+    Returns:
+        WaitResult; window is the matching window for "appear"/"active"
+    """
+    if state not in WINDOW_STATES:
+        raise ValueError(f"state must be one of {', '.join(WINDOW_STATES)}")
+    start = time.perf_counter()
+    deadline = start + _clamp_timeout(timeout)
+    interval = WAIT_POLL_MIN
+    polls = 0
+
+    while True:
+        # Share a snapshot other tools took just now, but never an older one
+        met, record = await run_io(
+            _window_state, snapshots, pattern, state, WAIT_POLL_MIN
+        )
+        polls += 1
+        now = time.perf_counter()
+        if met or now >= deadline:
+            break
+        await asyncio.sleep(min(interval, deadline - now))
+        interval = _next_interval(interval)
+
+    result = WaitResult(met, time.perf_counter() - start, polls, window=record)
+    logger.info(f"wait_for_window({pattern!r}, {state}) {result.summary()}")
+    return result
+
+
+async def wait_for_change(
+    grab: Callable[[], Frame],
+    baseline: bytes,
+    timeout: float = 10.0,
+) -> WaitResult:
+    """
+    Wait until the screen (or whatever grab captures) differs from a baseline.
+
+    Args:
+        grab: Blocking callable returning the current frame (run on the I/O pool)
+        baseline: frame_hash of the frame to compare against
+        timeout: Maximum time to wait in seconds (capped at WAIT_TIMEOUT_MAX)
+
+    Returns:
+        WaitResult; frame is the first changed frame, or the last one polled
+    """
+    start = time.perf_counter()
+    deadline = start + _clamp_timeout(timeout)
+    interval = WAIT_POLL_MIN
+    polls = 0
+
+    while True:
+        frame, current = await run_io(grab_and_hash, grab)
+        polls += 1
+        met = current != baseline
+        now = time.perf_counter()
+        if met or now >= deadline:
+            break
+        await asyncio.sleep(min(interval, deadline - now))
+        interval = _next_interval(interval)
+
+    result = WaitResult(met, time.perf_counter() - start, polls, frame=frame)
+    logger.info(f"wait_for_change {result.summary()}")
+    return result
@@ -0,0 +1,358 @@
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+logger = logging.getLogger("OTTO.windows")
+
+# How long a window enumeration may be reused when nothing was injected in between
+WINDOW_SNAPSHOT_TTL = float(os.getenv("OTTO_WINDOW_SNAPSHOT_TTL", "1.0"))
+# Fuzzy title matches scoring below this (0-1) are not offered as candidates
+WINDOW_MATCH_MIN_SCORE = float(os.getenv("OTTO_WINDOW_MATCH_MIN_SCORE", "0.35"))
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _app_name(window) -> str:
+    try:
+        return window.getAppName() or "Unknown"
+    except Exception:
+        return getattr(window, "app", None) or "Unknown"
+
+
+class WindowRecord:
+    """One window's properties, read once when the snapshot was taken."""
+
+    __slots__ = (
+        "window",
+        "handle",
+        "title",
+        "app",
+        "visible",
+        "minimized",
+        "maximized",
+        "active",
+        "left",
+        "top",
+        "width",
+        "height",
+    )
+
+    def __init__(self, window, active: bool = False):
+        self.window = window  # the live pywinctl window, for actions
+        try:
+            self.handle = window.getHandle()
+        except Exception:
+            self.handle = None
+        self.title = window.title or ""
+        self.app = _app_name(window)
+        self.visible = bool(window.visible)
+        self.minimized = bool(window.isMinimized)
+        self.maximized = bool(window.isMaximized)
+        self.active = active
+        box = window.box
+        self.left, self.top, self.width, self.height = (
+            box.left,
+            box.top,
+            box.width,
+            box.height,
+        )
+
+    @property
+    def display_title(self) -> str:
+        return self.title or "No Title"
+
+    @property
+    def box(self) -> tuple[int, int, int, int]:
+        return self.left, self.top, self.width, self.height
+
+    def contains(self, x: int, y: int) -> bool:
+        return (
+            self.left <= x < self.left + self.width
+            and self.top <= y < self.top + self.height
+        )
+
+    def __repr__(self) -> str:
+        return f"WindowRecord({self.display_title!r}, app={self.app!r})"
+
+
+class WindowSnapshot:
+    """Every top-level window at one moment, in the order the OS listed them."""
+
+    __slots__ = ("records", "taken_at", "errors", "_index")
+
+    def __init__(self, records: list[WindowRecord], errors: int = 0):
+        self.records = records
+        self.taken_at = time.monotonic()
+        self.errors = errors  # windows that vanished while being read
+        self._index: Optional[WindowIndex] = None
+
+    @property
+    def index(self) -> "WindowIndex":
+        """Title/app index over this snapshot, built on first use."""
+        if self._index is None:
+            self._index = WindowIndex(self.records)
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def active(self) -> Optional[WindowRecord]:
+        return next((r for r in self.records if r.active), None)
+
+    def find(self, pattern: str, limit: int = 10) -> list["WindowMatch"]:
+        """Ranked windows for a title_pattern (see WindowIndex.search)."""
+        return self.index.search(pattern, limit)
+
+    def for_app(self, app_name: str) -> list[WindowRecord]:
+        """Windows whose application name contains app_name (case-insensitive)."""
+        needle = _app_key(app_name)
+        return [r for r in self.records if needle in _app_key(r.app)]
+
+    def at(self, x: int, y: int) -> list[WindowRecord]:
+        """Visible, non-minimized windows containing the point, topmost first."""
+        return [
+            r
+            for r in self.records
+            if r.visible and not r.minimized and r.contains(x, y)
+        ]
+
+
+class WindowMatch(NamedTuple):
+    record: WindowRecord
+    score: float  # 0-1; 1 is an exact title match
+    how: str  # "exact", "prefix", "substring", "app", "words", "fuzzy" or "regex"
+
+    @property
+    def strong(self) -> bool:
+        """
+        Whether the match is reliable enough to act on or decide with. A fuzzy
+        (trigram) match is only a suggestion: "Notes" resembles "Notepad".
+        """
+        return self.how != "fuzzy"
+
+
+def _app_key(app: str) -> str:
+    """Comparable application name: 'Notepad.exe' -> 'notepad'."""
+    app = app.casefold()
+    return app[:-4] if app.endswith(".exe") else app
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased words of a title or name (also used by the app launcher)."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {' '.join(tokenize(text))} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class WindowIndex:
+    """
+    Token and trigram index over window titles and app names.
+
+    Built once per snapshot, it answers a title_pattern in one pass over the
+    candidate windows the index yields, instead of asking the OS per query,
+    and ranks them rather than taking whichever window came first. Patterns
+    may be plain text (exact, prefix, substring, whole-word and then
+    misspelling-tolerant trigram matching against title and app name),
+    "app:<name>" for an application's windows, or "re:<regex>" for a
+    case-insensitive regular expression over titles.
+    """
+
+    def __init__(self, records: list[WindowRecord]):
+        self.records = records
+        self._titles = [r.title.casefold() for r in records]
+        self._apps = [_app_key(r.app) for r in records]
+        self._words: list[set[str]] = []
+        self._grams: list[set[str]] = []
+        self._by_token: dict[str, set[int]] = {}
+        self._by_gram: dict[str, set[int]] = {}
+        for i, record in enumerate(records):
+            words = set(tokenize(record.title)) | set(tokenize(self._apps[i]))
+            grams = trigrams(record.title) | trigrams(self._apps[i])
+            self._words.append(words)
+            self._grams.append(grams)
+            for word in words:
+                self._by_token.setdefault(word, set()).add(i)
+            for gram in grams:
+                self._by_gram.setdefault(gram, set()).add(i)
+
+    def search(self, pattern: str, limit: int = 10) -> list[WindowMatch]:
+        """
+        Rank windows against a title_pattern.
+
+        Returns:
+            Up to limit WindowMatch tuples, best first; ties favour the active
+            window, then windows that are on screen
+        """
+        pattern = pattern.strip()
+        if not pattern:
+            return []
+        lowered = pattern.casefold()
+        if lowered.startswith("re:"):
+            scored = self._search_regex(pattern[3:])
+        elif lowered.startswith("app:"):
+            needle = _app_key(pattern[4:].strip())
+            scored = [
+                (i, 1.0 if app == needle else 0.9, "app")
+                for i, app in enumerate(self._apps)
+                if needle and needle in app
+            ]
+        else:
+            scored = self._search_text(lowered)
+
+        ranked = []
+        for i, score, how in scored:
+            record = self.records[i]
+            # Tie-breakers only; they never lift a weak match over a better one
+            bonus = 0.002 * record.active + 0.001 * (
+                record.visible and not record.minimized
+            )
+            # Equal scores keep the OS order (topmost first)
+            ranked.append((-(round(score, 3) + bonus), i, how))
+        ranked.sort()
+        return [
+            WindowMatch(self.records[i], round(-key, 2), how)
+            for key, i, how in ranked[:limit]
+        ]
+
+    def _search_regex(self, expression: str) -> list[tuple[int, float, str]]:
+        try:
+            regex = re.compile(expression, re.IGNORECASE)
+        except re.error:
+            return []
+        return [
+            (i, 0.9, "regex")
+            for i, record in enumerate(self.records)
+            if regex.search(record.title)
+        ]
+
+    def _search_text(self, query: str) -> list[tuple[int, float, str]]:
+        words = tokenize(query)
+        grams = trigrams(query)
+        # Candidates: windows sharing a word (prefix) or a trigram with the query
+        candidates: set[int] = set()
+        for word in words:
+            for token, ids in self._by_token.items():
+                if token.startswith(word):
+                    candidates |= ids
+        for gram in grams:
+            candidates |= self._by_gram.get(gram, set())
+
+        scored = []
+        for i in candidates:
+            title = self._titles[i]
+            if title == query:
+                scored.append((i, 1.0, "exact"))
+            elif title.startswith(query):
+                scored.append((i, 0.95, "prefix"))
+            elif query in title:
+                scored.append((i, 0.9, "substring"))
+            elif self._apps[i] == query:
+                scored.append((i, 0.85, "app"))
+            else:
+                found = sum(
+                    any(token.startswith(word) for token in self._words[i])
+                    for word in words
+                )
+                if words and found == len(words):
+                    scored.append((i, 0.8, "words"))
+                    continue
+                # Dice coefficient of trigrams, scaled below the word matches
+                shared = len(grams & self._grams[i])
+                similarity = 2 * shared / (len(grams) + len(self._grams[i]))
+                score = 0.75 * max(similarity, shared / len(grams))
+                if score >= WINDOW_MATCH_MIN_SCORE:
+                    scored.append((i, score, "fuzzy"))
+        return scored
+
+
+class WindowSnapshotService:
+    """
+    Shared, short-lived cache of the window list.
+
+    Reading a window's title, state and box is a separate OS call each, so the
+    window tools no longer walk live window objects. One enumeration is turned
+    into WindowRecords and reused by every query until it is TTL seconds old
+    or invalidate() is called; anything that injects input must call it.
+    Methods block; call them via run_io.
+    """
+
+    def __init__(
+        self,
+        get_windows: Callable[[], list[Any]],
+        get_active: Callable[[], Any],
+        ttl: float = WINDOW_SNAPSHOT_TTL,
+    ):
+        self._get_windows = get_windows
+        self._get_active = get_active
+        self.ttl = ttl
+        self._snapshot: Optional[WindowSnapshot] = None
+        self._generation = 0
+        # Concurrent read-only tools share one enumeration instead of racing
+        self._lock = threading.Lock()
+        self.stats = {"enumerations": 0, "hits": 0, "invalidations": 0}
+
+    def invalidate(self) -> None:
+        """Forget the snapshot; called around every input injection."""
+        self._generation += 1
+        self._snapshot = None
+        self.stats["invalidations"] += 1
+
+    def _fresh(self, max_age: float) -> Optional[WindowSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.taken_at > max_age:
+            return None
+        return snapshot
+
+    def get(self, max_age: Optional[float] = None) -> WindowSnapshot:
+        """
+        Return the current window snapshot, enumerating only when stale.
+
+        Args:
+            max_age: Oldest snapshot (seconds) acceptable to the caller; defaults
+                to the TTL. Pollers pass their interval so every poll sees the
+                windows as they are, while concurrent readers still share it.
+        """
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+        snapshot = self._fresh(max_age)
+        if snapshot is not None:
+            self.stats["hits"] += 1
+            return snapshot
+        with self._lock:
+            snapshot = self._fresh(max_age)
+            if snapshot is not None:
+                self.stats["hits"] += 1
+                return snapshot
+            generation = self._generation
+            snapshot = self._enumerate()
+            # Don't keep a list taken while an action was changing the windows
+            if generation == self._generation:
+                self._snapshot = snapshot
+            return snapshot
+
+    def _enumerate(self) -> WindowSnapshot:
+        started = time.perf_counter()
+        active = self._get_active()
+        records = []
+        errors = 0
+        for window in self._get_windows():
+            try:
+                records.append(WindowRecord(window, active=window == active))
+            except Exception as e:
+                errors += 1
+                logger.debug(f"Skipping window that could not be read: {e}")
+        self.stats["enumerations"] += 1
+        logger.debug(
+            f"Enumerated {len(records)} windows in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return WindowSnapshot(records, errors)
+
+    def metrics(self) -> dict[str, Any]:
+        return {"windows": len(self._snapshot or ()), "ttl": self.ttl, **self.stats}
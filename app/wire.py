@@ -0,0 +1,88 @@
+import struct
+
+# Binary WebSocket frames exchanged with static/app.js; keep the constants in
+# sync with the ones at the top of that file. Control messages stay JSON text
+# frames; binary frames carry bulk payloads behind a small fixed header.
+
+PROTOCOL_VERSION = 1
+
+# Frame kinds (first header byte)
+AUDIO_IN = 0x01  # client -> server: PCM16 mono 24 kHz microphone audio
+IMAGE_CHUNK = 0x02  # client -> server: raw bytes of a chunked image upload
+AUDIO_OUT = 0x81  # server -> client: PCM16 mono 24 kHz model audio
+
+# AUDIO_IN flags: the client already dropped silence, so the server VAD skips it
+FLAG_VAD_GATED = 0x0001
+
+# kind, version, flags, sequence (little-endian)
+_HEADER = struct.Struct("<BBHI")
+HEADER_SIZE = _HEADER.size
+# AUDIO_OUT extension after the common header: content index, item id length;
+# then the UTF-8 item id, zero-padded so the samples start at an even offset
+_AUDIO_OUT = struct.Struct("<HH")
+# IMAGE_CHUNK payload: upload id length (u8), UTF-8 upload id, image bytes
+_IMAGE_CHUNK = struct.Struct("<B")
+
+
+class FrameError(ValueError):
+    """A binary frame that cannot be parsed."""
+
+
+def parse_frame(data: bytes):
+    """
+    Split a binary frame into its header fields and payload.
+
+    The payload is a memoryview into data, so it can be handed on without
+    copying the audio bytes.
+
+    Args:
+        data: Raw bytes of a binary WebSocket message
+
+    Returns:
+        (kind, flags, sequence, payload memoryview)
+    """
+    if len(data) < HEADER_SIZE:
+        raise FrameError(f"Binary frame too short ({len(data)} bytes)")
+    kind, version, flags, sequence = _HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise FrameError(f"Unsupported binary frame version {version}")
+    return kind, flags, sequence, memoryview(data)[HEADER_SIZE:]
+
+
+def pack_audio_frame(
+    pcm: bytes, item_id: str, content_index: int, sequence: int
+) -> bytes:
+    """
+    Build an AUDIO_OUT frame for a chunk of model audio.
+
+    Args:
+        pcm: PCM16 samples
+        item_id: Conversation item the audio belongs to
+        content_index: Content part within the item
+        sequence: Per-session frame counter, so the client can spot gaps
+
+    Returns:
+        Frame bytes ready for websocket.send_bytes
+    """
+    item = (item_id or "").encode()
+    header = _HEADER.pack(AUDIO_OUT, PROTOCOL_VERSION, 0, sequence & 0xFFFFFFFF)
+    extension = _AUDIO_OUT.pack(content_index or 0, len(item))
+    padding = b"\0" * ((len(header) + len(extension) + len(item)) % 2)
+    return b"".join((header, extension, item, padding, pcm))
+
+
+def parse_image_chunk(payload: memoryview):
+    """
+    Split an IMAGE_CHUNK payload.
+
+    Returns:
+        (upload id, memoryview of the image bytes)
+    """
+    if len(payload) < _IMAGE_CHUNK.size:
+        raise FrameError("Image chunk frame too short")
+    (id_length,) = _IMAGE_CHUNK.unpack_from(payload)
+    start = _IMAGE_CHUNK.size + id_length
+    if len(payload) < start:
+        raise FrameError("Image chunk frame too short")
+    upload_id = bytes(payload[_IMAGE_CHUNK.size : start]).decode("utf-8", "replace")
+    return upload_id, payload[start:]
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app's modules import each other by bare name (see server.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
@@ -0,0 +1,58 @@
+import base64
+
+from blobs import BlobStore
+
+
+def _data_url(data, mime="image/png"):
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def test_same_bytes_are_stored_once():
+    store = BlobStore(max_bytes=1000)
+    digest = store.put(b"image", "image/png")
+    assert store.put(b"image", "image/png") == digest
+    assert store.get(digest) == (b"image", "image/png")
+    assert store.metrics()["blobs"] == 1
+    assert store.metrics()["bytes"] == 5
+
+
+def test_least_recently_used_blobs_are_evicted():
+    store = BlobStore(max_bytes=20)
+    a = store.put(b"a" * 10, "image/png")
+    b = store.put(b"b" * 10, "image/png")
+    store.get(a)
+    store.put(b"c" * 10, "image/png")
+    assert store.get(b) is None
+    assert store.get(a) is not None
+    assert store.stats["evictions"] == 1
+
+
+def test_evicted_blobs_spill_to_disk_and_are_found_again(tmp_path):
+    store = BlobStore(max_bytes=10, directory=str(tmp_path), max_disk_bytes=100)
+    first = store.put(b"a" * 10, "image/jpeg")
+    store.put(b"b" * 10, "image/jpeg")
+    assert store.get(first) == (b"a" * 10, "image/jpeg")
+    assert store.stats["disk_hits"] == 1
+
+    # A new store (e.g. after a restart) picks up what is on disk
+    reloaded = BlobStore(max_bytes=10, directory=str(tmp_path))
+    assert reloaded.get(first) == (b"a" * 10, "image/jpeg")
+
+
+def test_disk_is_capped(tmp_path):
+    store = BlobStore(max_bytes=1, directory=str(tmp_path), max_disk_bytes=25)
+    digests = [store.put(bytes([i]) * 10, "image/png") for i in range(5)]
+    assert store.metrics()["disk_bytes"] <= 25
+    assert store.get(digests[0]) is None
+    assert len(list(tmp_path.iterdir())) == store.metrics()["disk_blobs"]
+
+
+def test_data_urls_in_text_become_blob_urls():
+    store = BlobStore()
+    text = f"before {_data_url(b'png bytes')} after"
+    replaced = store.replace_data_urls(text)
+    digest = store.digest(b"png bytes")
+    assert replaced == f"before /blobs/{digest} after"
+    assert store.put_data_url(_data_url(b"png bytes")) == f"/blobs/{digest}"
+    assert store.put_data_url("data:image/png;base64,!!!") is None
+    assert store.replace_data_urls("no images here") == "no images here"
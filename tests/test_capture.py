@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+from capture import ScreenCaptureService
+from encoder import resolve_options
+
+
+class FakeGrabber:
+    def __init__(self, width=400, height=300):
+        self.size = (width, height)
+        self.calls = []
+
+    def __call__(self, region=None):
+        self.calls.append(region)
+        if region is not None:
+            return np.zeros((region[3], region[2], 3), dtype=np.uint8)
+        return np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_frame_is_reused_within_the_ttl():
+    async def scenario():
+        grab = FakeGrabber()
+        service = ScreenCaptureService(grab, ttl=60)
+        first = await service.grab()
+        second = await service.grab()
+        return grab.calls, first is second, service.stats
+
+    calls, same, stats = _run(scenario())
+    assert calls == [None] and same
+    assert stats["grabs"] == 1 and stats["frame_hits"] == 1
+
+
+def test_expired_or_invalidated_frames_are_grabbed_again():
+    async def scenario():
+        grab = FakeGrabber()
+        service = ScreenCaptureService(grab, ttl=0)
+        await service.grab()
+        await asyncio.sleep(0.01)
+        await service.grab()
+        service.ttl = 60
+        service.invalidate()
+        await service.grab()
+        return grab.calls
+
+    assert _run(scenario()) == [None, None, None]
+
+
+def test_regions_are_cropped_from_a_cached_frame():
+    async def scenario():
+        grab = FakeGrabber()
+        service = ScreenCaptureService(grab, ttl=60)
+        await service.grab()
+        inside = await service.grab((10, 20, 100, 50))
+        outside = await service.grab((350, 0, 100, 50))
+        return grab.calls, inside.shape, outside.shape
+
+    calls, inside, outside = _run(scenario())
+    assert inside == (50, 100, 3)
+    # The second region is not covered by the frame, so only it is grabbed
+    assert calls == [None, (350, 0, 100, 50)]
+    assert outside == (50, 100, 3)
+
+
+def test_encodings_are_cached_per_options():
+    async def scenario():
+        service = ScreenCaptureService(FakeGrabber(), ttl=60)
+        fast = resolve_options(preset="fast")
+        a = await service.capture(options=fast)
+        b = await service.capture(options=fast)
+        c = await service.capture(options=resolve_options(preset="lossless"))
+        return a is b, c.format, service.stats
+
+    same, fmt, stats = _run(scenario())
+    assert same and fmt == "png"
+    assert stats["encodes"] == 2 and stats["encode_hits"] == 1
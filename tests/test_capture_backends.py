@@ -0,0 +1,116 @@
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import capture_backends
+from capture_backends import region_around, region_within
+
+MONITORS = [(0, 0, 1920, 1080), (1920, 0, 1280, 1024)]
+
+
+def test_region_within():
+    assert region_within((10, 10, 100, 100), (0, 0, 1920, 1080))
+    assert region_within((0, 0, 1920, 1080), (0, 0, 1920, 1080))
+    assert not region_within((1900, 10, 100, 100), (0, 0, 1920, 1080))
+    assert not region_within((-1, 0, 10, 10), (0, 0, 1920, 1080))
+
+
+def test_region_around_adds_margin_and_clips_to_monitor():
+    assert region_around((100, 100, 400, 300), MONITORS, margin=20) == (
+        80,
+        80,
+        440,
+        340,
+    )
+    # Clipped at the screen edge rather than spilling past it
+    assert region_around((0, 0, 400, 300), MONITORS, margin=20) == (0, 0, 420, 320)
+
+
+def test_region_around_uses_monitor_holding_the_centre():
+    # Mostly on the second monitor: clipped to its left edge
+    assert region_around((1800, 100, 600, 400), MONITORS) == (1920, 100, 480, 400)
+
+
+def test_region_around_rejects_unusable_windows():
+    assert region_around((100, 100, 0, 300), MONITORS) is None
+    assert region_around((-5000, -5000, 100, 100), MONITORS) is None
+
+
+def test_region_around_requires_point_inside():
+    box = (100, 100, 400, 300)
+    assert region_around(box, MONITORS, point=(200, 200)) is not None
+    assert region_around(box, MONITORS, point=(1000, 900)) is None
+
+
+def _fake_backend(name, delay=0.0, fails=False):
+    class Fake(capture_backends.CaptureBackend):
+        closed = []
+
+        def grab(self, region=None):
+            if fails:
+                raise OSError(f"{name} cannot grab")
+            time.sleep(delay)
+            return np.zeros((10, 10, 3), dtype=np.uint8)
+
+        def close(self):
+            Fake.closed.append(name)
+
+    Fake.name = name
+    return Fake
+
+
+@pytest.fixture
+def candidates(monkeypatch):
+    def use(*classes):
+        monkeypatch.setattr(capture_backends, "_candidates", lambda: list(classes))
+
+    monkeypatch.setattr(capture_backends, "BENCHMARK_ROUNDS", 1)
+    return use
+
+
+def test_fastest_backend_wins(candidates):
+    slow, fast = _fake_backend("slow", 0.02), _fake_backend("fast")
+    candidates(slow, fast)
+    assert capture_backends.select_backend("").name == "fast"
+    assert slow.closed == ["slow"]
+
+
+def test_failing_backends_fall_through_the_chain(candidates):
+    candidates(
+        _fake_backend("dxcam", fails=True),
+        _fake_backend("mss", fails=True),
+        _fake_backend("pyautogui"),
+    )
+    assert capture_backends.select_backend("").name == "pyautogui"
+
+
+def test_preferred_backend_is_used_when_it_works(candidates):
+    candidates(_fake_backend("a"), _fake_backend("b", 0.02))
+    assert capture_backends.select_backend("b").name == "b"
+
+
+def test_broken_preferred_backend_falls_back_to_benchmarking(candidates):
+    candidates(_fake_backend("a"), _fake_backend("b", fails=True))
+    assert capture_backends.select_backend("b").name == "a"
+    assert capture_backends.select_backend("nonexistent").name == "a"
+
+
+def test_nothing_working_defers_to_pyautogui(candidates):
+    candidates(_fake_backend("a", fails=True))
+    backend = capture_backends.select_backend("")
+    assert isinstance(backend, capture_backends.PyAutoGuiBackend)
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs an X display")
+def test_mss_grabs_the_screen():
+    pytest.importorskip("mss")
+    pytest.importorskip("cv2")
+    backend = capture_backends.MssBackend()
+    frame = backend.grab()
+    left, top, width, height = backend.monitors()[0]
+    assert frame.shape == (height, width, 3)
+    region = backend.grab((left, top, 20, 10))
+    assert region.shape == (10, 20, 3)
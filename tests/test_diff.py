@@ -0,0 +1,49 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+from diff import changed_regions
+
+
+def _frame(width=200, height=100):
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+
+def test_identical_frames_have_no_regions():
+    assert changed_regions(_frame(), _frame()) == []
+
+
+def test_small_change_is_boxed():
+    after = _frame()
+    after[40:50, 60:80] = 0
+    regions = changed_regions(_frame(), after)
+    assert len(regions) == 1
+    left, top, width, height = regions[0]
+    assert left <= 60 and top <= 40
+    assert left + width >= 80 and top + height >= 50
+
+
+def test_nearby_changes_merge_and_distant_ones_do_not():
+    after = _frame()
+    after[10:15, 10:15] = 0
+    after[10:15, 20:25] = 0
+    after[80:85, 180:185] = 0
+    regions = changed_regions(_frame(), after)
+    assert len(regions) == 2
+    # Sorted top to bottom
+    assert regions[0][1] < regions[1][1]
+
+
+def test_noise_below_threshold_is_ignored():
+    after = _frame()
+    after[:, :] = 245
+    assert changed_regions(_frame(), after) == []
+
+
+def test_large_or_resized_changes_send_the_full_frame():
+    after = _frame()
+    after[:, :150] = 0
+    assert changed_regions(_frame(), after) is None
+    assert changed_regions(_frame(), _frame(width=100)) is None
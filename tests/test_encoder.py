@@ -0,0 +1,63 @@
+import asyncio
+import base64
+from io import BytesIO
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from PIL import Image
+
+from encoder import (
+    DEFAULT_OPTIONS,
+    PRESETS,
+    current_options,
+    encode_image,
+    resolve_options,
+    with_image_preset,
+)
+
+FRAME = np.zeros((1000, 2000, 3), dtype=np.uint8)
+
+
+def test_presets_and_overrides():
+    options = resolve_options(preset="fast", quality=500, max_dimension=0)
+    assert options.format == PRESETS["fast"].format
+    assert options.quality == 100
+    assert options.max_dimension is None
+    assert resolve_options(format="JPG").format == "jpeg"
+    assert resolve_options() == DEFAULT_OPTIONS
+
+
+@pytest.mark.parametrize("kwargs", [{"preset": "tiny"}, {"format": "gif"}])
+def test_unknown_presets_and_formats_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        resolve_options(**kwargs)
+
+
+@pytest.mark.parametrize("fmt", ["png", "jpeg", "webp"])
+def test_encode_downscales_and_reports_the_scale(fmt):
+    image = encode_image(FRAME, resolve_options(format=fmt, max_dimension=500))
+    assert (image.width, image.height) == (500, 250)
+    assert (image.source_width, image.source_height) == (2000, 1000)
+    assert image.scale == 4
+    assert image.data_url.startswith(f"data:image/{fmt};base64,")
+    assert len(base64.b64decode(image.data)) == image.byte_size
+
+
+def test_grayscale():
+    image = encode_image(FRAME, resolve_options(format="png", grayscale=True))
+    with Image.open(BytesIO(base64.b64decode(image.data))) as decoded:
+        assert decoded.mode == "L"
+
+
+def test_image_preset_applies_for_the_call_only():
+    @with_image_preset
+    async def tool(image_preset: str = None):
+        return current_options()
+
+    assert asyncio.run(tool(image_preset="compact")) == PRESETS["compact"]
+    assert asyncio.run(tool()) == DEFAULT_OPTIONS
+    assert current_options() == DEFAULT_OPTIONS
+    assert "Unknown image preset" in asyncio.run(tool(image_preset="tiny"))
@@ -0,0 +1,60 @@
+from dataclasses import dataclass, replace
+
+from history import HistoryTracker
+
+
+@dataclass
+class Item:
+    """Stand-in for an SDK history item."""
+
+    item_id: str
+    text: str = ""
+    status: str = "completed"
+
+    def model_dump(self, mode=None):
+        return {"item_id": self.item_id, "text": self.text, "status": self.status}
+
+    def model_copy(self):
+        return replace(self)
+
+
+def test_unchanged_history_has_no_delta():
+    tracker = HistoryTracker()
+    history = [Item("a", "hi"), Item("b", "there")]
+    tracker.snapshot(history)
+    assert tracker.diff(history) is None
+
+
+def test_delta_carries_only_new_and_changed_items():
+    tracker = HistoryTracker()
+    history = [Item("a", "hi"), Item("b", "there", "in_progress")]
+    snapshot = tracker.snapshot(history)
+
+    history = [history[0], Item("b", "there", "completed"), Item("c", "new")]
+    delta = tracker.diff(history)
+    assert delta["base"] == snapshot["version"]
+    assert delta["version"] == snapshot["version"] + 1
+    assert [item["item_id"] for item in delta["items"]] == ["b", "c"]
+    assert delta["removed"] == []
+    # Appended items need no explicit order
+    assert "order" not in delta
+
+
+def test_delta_reports_removals_and_reordering():
+    tracker = HistoryTracker()
+    a, b, c = Item("a"), Item("b"), Item("c")
+    tracker.snapshot([a, b, c])
+
+    delta = tracker.diff([c, a])
+    assert delta["items"] == []
+    assert delta["removed"] == ["b"]
+    assert delta["order"] == ["c", "a"]
+
+
+def test_unchanged_items_are_not_stripped_again():
+    tracker = HistoryTracker()
+    history = [Item(str(i), "text") for i in range(10)]
+    tracker.snapshot(history)
+    tracker.diff(history + [Item("new")])
+    assert tracker.stats["stripped"] == 11
+    assert tracker.stats["reused"] == 10
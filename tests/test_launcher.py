@@ -0,0 +1,70 @@
+import pytest
+
+from launcher import APP_MATCH_MIN_SCORE, AppEntry, AppIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = AppIndex(tmp_path / "apps.json")
+    index._dirs = {
+        "start": (
+            0,
+            [
+                AppEntry("Spotify", "spotify.lnk", "shortcut"),
+                AppEntry("Uninstall Spotify", "uninstall.lnk", "shortcut"),
+                AppEntry("Visual Studio Code", "code.lnk", "shortcut"),
+            ],
+        ),
+        "bin1": (0, [AppEntry("code", "/bin1/code", "path")]),
+        "bin2": (0, [AppEntry("code", "/bin2/code", "path")]),
+    }
+    index._registry = [AppEntry("Spotify", "spotify.exe", "app_path")]
+    index._rebuild()
+    return index
+
+
+def _best(index, name):
+    matches = index.find(name, limit=1)
+    return matches[0] if matches else (None, 0)
+
+
+def test_exact_name_prefers_shortcuts(index):
+    entry, score = _best(index, "spotify")
+    assert score == 1.0 and entry.kind == "shortcut"
+
+
+def test_uninstallers_are_not_indexed(index):
+    assert all("uninstall" not in e.name.casefold() for e, _ in index.find("spot"))
+    entry, score = _best(index, "uninstall spotify")
+    assert entry is None or score < APP_MATCH_MIN_SCORE or entry.name == "Spotify"
+
+
+def test_path_executables_need_an_exact_name(index):
+    # First on PATH wins, and a real application outranks the CLI tool
+    names = [(e.target, s) for e, s in index.find("code")]
+    assert names[0] == ("code.lnk", 0.9)
+    assert ("/bin1/code", 0.85) in names
+    assert all(target != "/bin2/code" for target, _ in names)
+    assert all(e.kind != "path" for e, _ in index.find("cod"))
+
+
+def test_misspelled_names_still_match(index):
+    entry, score = _best(index, "spotifyy")
+    assert entry.name == "Spotify" and score >= APP_MATCH_MIN_SCORE
+    # Too far off to launch directly, but still ranked first
+    entry, score = _best(index, "spotfy")
+    assert entry.name == "Spotify" and score < APP_MATCH_MIN_SCORE
+
+
+def test_saved_index_is_reloaded(index, tmp_path):
+    index._save()
+    reloaded = AppIndex(tmp_path / "apps.json")
+    reloaded._load()
+    assert len(reloaded) == len(index)
+
+
+def test_index_without_a_saved_file_finds_nothing(tmp_path):
+    index = AppIndex(tmp_path / "missing" / "apps.json")
+    index._load()
+    assert index.find("notepad") == []
+    assert index.metrics()["apps"] == 0
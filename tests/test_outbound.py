@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from outbound import HIGH, NORMAL, OutboundQueue
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+    async def send_bytes(self, message):
+        self.sent.append(message)
+
+
+def test_high_priority_goes_first_and_snapshots_coalesce():
+    async def scenario():
+        websocket = FakeWebSocket()
+        queue = OutboundQueue(websocket, maxsize=10)
+        builds = []
+
+        def snapshot(label):
+            async def build():
+                builds.append(label)
+                return label
+
+            return build
+
+        await queue.put("normal", NORMAL)
+        await queue.put_snapshot("history", snapshot("old"))
+        await queue.put_snapshot("history", snapshot("new"))
+        await queue.put(b"audio", HIGH)
+        queue.start()
+        while queue.depth:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await queue.close()
+        return websocket.sent, builds, queue.stats
+
+    sent, builds, stats = asyncio.run(scenario())
+    assert sent == [b"audio", "normal", "new"]
+    # The superseded snapshot is never built
+    assert builds == ["new"]
+    assert stats["coalesced"] == 1
+    assert stats["sent"] == 3
+
+
+def test_full_queue_drops_droppable_messages():
+    async def scenario():
+        queue = OutboundQueue(FakeWebSocket(), maxsize=1)
+        await queue.put("kept")
+        await queue.put("extra", droppable=True)
+        return queue.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["depth"] == 1
+    assert metrics["dropped"] == 1
+
+
+def test_full_queue_blocks_essential_messages_until_drained():
+    async def scenario():
+        websocket = FakeWebSocket()
+        queue = OutboundQueue(websocket, maxsize=1)
+        await queue.put("first")
+        blocked = asyncio.create_task(queue.put("second"))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        queue.start()
+        await asyncio.wait_for(blocked, 1)
+        while queue.depth:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await queue.close()
+        return websocket.sent, queue.stats
+
+    sent, stats = asyncio.run(scenario())
+    assert sent == ["first", "second"]
+    assert stats["producer_waits"] == 1
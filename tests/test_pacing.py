@@ -0,0 +1,54 @@
+import asyncio
+
+from pacing import (
+    DEFAULT_PACING,
+    PROFILES,
+    current_pacing,
+    resolve_pacing,
+    set_session_pacing,
+    with_pacing,
+)
+from scheduler import current_session
+
+
+@with_pacing
+async def tool(pacing: str = None):
+    return current_pacing().name
+
+
+def _in_session(session_id, coro):
+    async def run():
+        current_session.set(session_id)
+        return await coro
+
+    return asyncio.run(run())
+
+
+def test_resolve_pacing():
+    assert resolve_pacing(" Fast ") is PROFILES["fast"]
+    assert resolve_pacing("warp") is None
+    assert resolve_pacing(None) is None
+
+
+def test_call_overrides_session_overrides_default():
+    assert _in_session("p1", tool()) == DEFAULT_PACING
+    assert set_session_pacing("p1", "cautious")
+    try:
+        assert _in_session("p1", tool()) == "cautious"
+        assert _in_session("p1", tool(pacing="fast")) == "fast"
+        # Other sessions keep the default
+        assert _in_session("p2", tool()) == DEFAULT_PACING
+    finally:
+        set_session_pacing("p1", None)
+    assert _in_session("p1", tool()) == DEFAULT_PACING
+
+
+def test_unknown_profiles_are_rejected():
+    assert not set_session_pacing("p3", "warp")
+    result = asyncio.run(tool(pacing="warp"))
+    assert result.startswith("Unknown pacing profile 'warp'")
+
+
+def test_call_profile_does_not_leak():
+    asyncio.run(tool(pacing="fast"))
+    assert current_pacing().name == DEFAULT_PACING
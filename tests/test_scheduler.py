@@ -0,0 +1,83 @@
+import asyncio
+
+from scheduler import ActionScheduler, current_session
+
+
+async def _hold(scheduler, log, name, exclusive, session="local", delay=0.01):
+    current_session.set(session)
+    async with scheduler.slot(name, exclusive):
+        log.append(f"{name} start")
+        await asyncio.sleep(delay)
+        log.append(f"{name} end")
+
+
+def test_input_actions_run_one_at_a_time():
+    async def scenario():
+        scheduler, log = ActionScheduler(), []
+        await asyncio.gather(
+            _hold(scheduler, log, "a", True), _hold(scheduler, log, "b", True)
+        )
+        return log, scheduler.metrics()
+
+    log, metrics = asyncio.run(scenario())
+    assert log == ["a start", "a end", "b start", "b end"]
+    assert metrics["exclusive"] == 2
+    assert metrics["waited"] == 1
+
+
+def test_read_actions_share_a_slot():
+    async def scenario():
+        scheduler, log = ActionScheduler(), []
+        await asyncio.gather(
+            _hold(scheduler, log, "a", False), _hold(scheduler, log, "b", False)
+        )
+        return log
+
+    assert asyncio.run(scenario())[:2] == ["a start", "b start"]
+
+
+def test_waiting_input_holds_back_later_reads():
+    async def scenario():
+        scheduler, log = ActionScheduler(), []
+        await asyncio.gather(
+            _hold(scheduler, log, "read1", False),
+            _hold(scheduler, log, "write", True),
+            _hold(scheduler, log, "read2", False),
+        )
+        return log
+
+    log = asyncio.run(scenario())
+    assert log.index("write end") < log.index("read2 start")
+
+
+def test_sessions_are_served_round_robin():
+    async def scenario():
+        scheduler, log = ActionScheduler(), []
+        await asyncio.gather(
+            _hold(scheduler, log, "a1", True, "a", 0),
+            _hold(scheduler, log, "a2", True, "a", 0),
+            _hold(scheduler, log, "a3", True, "a", 0),
+            _hold(scheduler, log, "b1", True, "b", 0),
+        )
+        return [entry[:2] for entry in log if entry.endswith("start")]
+
+    # a1 runs at once; of the waiting calls, session b's goes between a's
+    assert asyncio.run(scenario()) == ["a1", "a2", "b1", "a3"]
+
+
+def test_cancelled_waiter_releases_its_place():
+    async def scenario():
+        scheduler, log = ActionScheduler(), []
+        first = asyncio.create_task(_hold(scheduler, log, "a", True, delay=0.05))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_hold(scheduler, log, "b", True))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await first
+        await _hold(scheduler, log, "c", True)
+        return log, scheduler.waiting
+
+    log, waiting = asyncio.run(scenario())
+    assert "b start" not in log
+    assert log[-2:] == ["c start", "c end"]
+    assert waiting == 0
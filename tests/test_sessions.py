@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from sessions import AdmissionError, SessionRegistry, SessionState
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_sessions_beyond_the_limit_wait_for_a_slot():
+    async def scenario():
+        registry = SessionRegistry(max_sessions=1, queue_size=1, admission_timeout=1)
+        await registry.acquire()
+        waiter = asyncio.create_task(registry.acquire())
+        await asyncio.sleep(0)
+        assert registry.waiting == 1 and not waiter.done()
+        registry.release()
+        await asyncio.wait_for(waiter, 1)
+        return registry.metrics()
+
+    metrics = _run(scenario())
+    assert metrics["admitted"] == 2 and metrics["queued"] == 1
+    assert metrics["slots_held"] == 1 and metrics["waiting"] == 0
+
+
+def test_full_queue_is_refused():
+    async def scenario():
+        registry = SessionRegistry(max_sessions=1, queue_size=0, admission_timeout=1)
+        await registry.acquire()
+        with pytest.raises(AdmissionError, match="busy"):
+            await registry.acquire()
+        return registry.stats
+
+    assert _run(scenario())["rejected"] == 1
+
+
+def test_waiting_times_out():
+    async def scenario():
+        registry = SessionRegistry(max_sessions=1, queue_size=1, admission_timeout=0.01)
+        await registry.acquire()
+        with pytest.raises(AdmissionError, match="Timed out"):
+            await registry.acquire()
+        return registry.waiting
+
+    assert _run(scenario()) == 0
+
+
+def test_draining_refuses_new_and_waiting_sessions():
+    async def scenario():
+        registry = SessionRegistry(max_sessions=1, queue_size=1, admission_timeout=1)
+        await registry.acquire()
+        waiter = asyncio.create_task(registry.acquire())
+        await asyncio.sleep(0)
+        registry.draining = True
+        registry.release()
+        with pytest.raises(AdmissionError, match="shutting down"):
+            await waiter
+        with pytest.raises(AdmissionError, match="shutting down"):
+            await registry.acquire()
+        return registry.metrics()
+
+    metrics = _run(scenario())
+    assert metrics["slots_held"] == 0 and metrics["rejected"] == 2
+
+
+def test_unregister_keeps_a_replacing_session():
+    registry = SessionRegistry()
+    old = SessionState("s1", websocket=None, outbound=None)
+    new = SessionState("s1", websocket=None, outbound=None)
+    registry.register(old)
+    registry.register(new)
+    registry.unregister(old)
+    assert registry.get("s1") is new
+    registry.unregister(new)
+    assert len(registry) == 0
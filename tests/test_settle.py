@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+from settle import wait_for_settle
+from similarity import frame_hash
+
+
+def _frame(value):
+    return np.full((72, 128, 3), value, dtype=np.uint8)
+
+
+def _grabber(values):
+    """A grab() that returns one frame per value, then repeats the last."""
+    frames = iter([_frame(v) for v in values])
+    last = []
+
+    def grab():
+        frame = next(frames, None)
+        if frame is not None:
+            last[:] = [frame]
+        return last[0]
+
+    return grab
+
+
+def _settle(grab, **kwargs):
+    kwargs.setdefault("interval", 0.001)
+    kwargs.setdefault("timeout", 1.0)
+    return asyncio.run(wait_for_settle(grab, **kwargs))
+
+
+def test_screen_that_changes_then_stops_settles():
+    result = _settle(_grabber([0, 64, 128, 128, 128]), stable_frames=3)
+    assert result.settled
+    assert result.polls == 5
+    assert (result.frame == 128).all()
+
+
+def test_unchanged_screen_waits_for_the_reaction_window():
+    result = _settle(_grabber([0]), stable_frames=2, min_reaction=0.05)
+    assert result.settled
+    assert result.elapsed >= 0.05
+
+
+def test_require_change_waits_for_the_screen_to_differ():
+    baseline = frame_hash(_frame(0))
+    result = _settle(
+        _grabber([0, 0, 0, 200]),
+        stable_frames=2,
+        require_change=True,
+        baseline=baseline,
+        min_reaction=0,
+    )
+    assert result.settled
+    assert (result.frame == 200).all()
+
+
+def test_screen_that_keeps_changing_times_out():
+    values = iter(range(0, 10**6, 16))
+    result = _settle(lambda: _frame(next(values) % 256), timeout=0.05)
+    assert not result.settled
+    assert "still changing" in result.summary()
@@ -0,0 +1,47 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+from similarity import compare_frames, frame_hash
+
+
+def _frame(width=320, height=240):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def test_identical_frames_take_the_hash_path():
+    frame = _frame()
+    result = compare_frames(frame, frame.copy())
+    assert result.similar and result.method == "hash"
+    assert result.score == 1.0 and result.changed_fraction == 0
+    assert not result.change_mask.any()
+    assert frame_hash(frame) == frame_hash(frame.copy())
+
+
+def test_local_change_is_found_in_the_mask():
+    before = _frame()
+    after = before.copy()
+    after[:48, :64] = 0
+    result = compare_frames(before, after)
+    assert result.method == "ssim"
+    assert 0 < result.changed_fraction < 0.2
+    assert result.change_mask[0, 0]
+    assert not result.change_mask[-1, -1]
+
+
+def test_different_sizes_are_never_similar():
+    result = compare_frames(_frame(), _frame(width=100))
+    assert not result.similar
+    assert result.change_mask is None
+
+
+def test_imprecise_comparison_uses_the_hash_distance():
+    before = _frame()
+    after = 255 - before
+    result = compare_frames(before, after, precise=False)
+    assert result.method == "hash"
+    assert result.change_mask is None
+    assert result.score == 1.0 - result.hash_distance / 64
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("keyboard")
+pytest.importorskip("pyautogui")
+
+from textinput import (
+    TYPE_KEYS_MAX_CHARS,
+    TYPE_PASTE_MIN_CHARS,
+    choose_method,
+    resolve_method,
+)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("hello", "keys"),
+        ("héllo", "unicode"),
+        ("x" * (TYPE_KEYS_MAX_CHARS + 1), "unicode"),
+        ("x" * TYPE_PASTE_MIN_CHARS, "paste"),
+    ],
+)
+def test_auto_picks_by_text(text, expected):
+    assert choose_method(text, "auto") == expected
+
+
+def test_explicit_methods_are_honoured():
+    assert choose_method("héllo", "KEYS") == "keys"
+    assert resolve_method(None) == "auto"
+    assert resolve_method(" Paste ") == "paste"
+
+
+def test_unknown_methods_are_rejected():
+    assert resolve_method("clipboard") is None
+    with pytest.raises(ValueError, match="keys, unicode, paste, auto"):
+        choose_method("hello", "clipboard")
@@ -0,0 +1,87 @@
+import base64
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from uploads import UPLOAD_MAX_BYTES, UploadError, UploadManager
+
+DATA = bytes(range(256)) * 4
+DATA_URL = "data:image/png;base64," + base64.b64encode(DATA).decode()
+
+
+def test_text_chunks_split_anywhere_are_reassembled():
+    uploads = UploadManager()
+    uploads.start("img", "What is this?")
+    for i in range(0, len(DATA_URL), 7):
+        uploads.add_text_chunk("img", DATA_URL[i : i + 7])
+    upload, data = uploads.finish("img")
+    assert data == DATA
+    assert upload.mime == "image/png"
+    assert upload.text == "What is this?"
+    assert uploads.stats["completed"] == 1
+
+
+def test_binary_chunks_with_declared_size():
+    uploads = UploadManager()
+    uploads.start("img", None, size=len(DATA), mime="image/jpeg")
+    uploads.add_binary_chunk("img", DATA[:100])
+    uploads.add_binary_chunk("img", memoryview(DATA)[100:])
+    upload, data = uploads.finish("img")
+    assert data == DATA
+    assert upload.mime == "image/jpeg"
+
+
+@pytest.mark.parametrize("size", ["lots", -1, UPLOAD_MAX_BYTES + 1])
+def test_bad_declared_sizes_are_rejected(size):
+    uploads = UploadManager()
+    with pytest.raises(UploadError):
+        uploads.start("img", None, size=size)
+    assert uploads.stats["rejected"] == 1
+
+
+def test_session_quota():
+    uploads = UploadManager(quota=1000)
+    uploads.start("a", None, size=600)
+    with pytest.raises(UploadError):
+        uploads.start("b", None, size=600)
+
+
+def test_malformed_data_drops_the_upload():
+    uploads = UploadManager()
+    uploads.start("img", None)
+    with pytest.raises(UploadError):
+        uploads.add_text_chunk("img", "data:image/png;base64,@@@@")
+    with pytest.raises(UploadError):
+        uploads.add_text_chunk("img", "AAAA")
+
+
+def test_truncated_and_unknown_uploads():
+    uploads = UploadManager()
+    uploads.start("img", None)
+    uploads.add_text_chunk("img", "data:image/png;base64,AAA")
+    with pytest.raises(UploadError):
+        uploads.finish("img")
+    with pytest.raises(UploadError):
+        uploads.add_binary_chunk("missing", b"x")
+
+
+def test_stale_uploads_expire():
+    uploads = UploadManager(timeout=0)
+    uploads.start("img", None, size=10)
+    assert uploads.expire() == ["img"]
+    assert uploads.in_flight == 0
+
+
+def test_expired_uploads_are_unknown_to_later_chunks():
+    uploads = UploadManager(timeout=0.01)
+    uploads.start("img", None, size=10)
+    time.sleep(0.02)
+    with pytest.raises(UploadError, match="Unknown image id"):
+        uploads.add_binary_chunk("img", b"x")
+    with pytest.raises(UploadError):
+        uploads.finish("img")
+    assert uploads.stats["expired"] == 1
+    assert uploads.in_flight == 0
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vad import SAMPLE_RATE, VoiceGate
+
+CHUNK_MS = 20
+
+
+def _chunk(amplitude=0, frequency=200):
+    t = np.arange(SAMPLE_RATE * CHUNK_MS // 1000) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype("<i2").tobytes()
+
+
+SILENCE = _chunk()
+SPEECH = _chunk(8000)
+
+
+def test_silence_is_dropped_and_speech_passes():
+    gate = VoiceGate(preroll_ms=0)
+    assert gate.process(SILENCE) == []
+    assert gate.process(SPEECH) == [SPEECH]
+    assert gate.stats.frames_sent == 1
+
+
+def test_preroll_is_flushed_at_speech_onset():
+    gate = VoiceGate(preroll_ms=2 * CHUNK_MS)
+    for _ in range(5):
+        gate.process(SILENCE)
+    out = gate.process(SPEECH)
+    # Two chunks of pre-roll, then the speech itself
+    assert out == [SILENCE, SILENCE, SPEECH]
+    assert gate.stats.frames_dropped == 3
+
+
+def test_hangover_keeps_sending_after_speech():
+    gate = VoiceGate(preroll_ms=0, hangover_ms=3 * CHUNK_MS)
+    gate.process(SPEECH)
+    sent = [bool(gate.process(SILENCE)) for _ in range(6)]
+    assert sent == [True, True, True, False, False, False]
+
+
+def test_finish_counts_held_preroll_as_dropped():
+    gate = VoiceGate(preroll_ms=5 * CHUNK_MS)
+    gate.process(SILENCE)
+    gate.process(SILENCE)
+    gate.finish()
+    assert gate.stats.frames_dropped == 2
+    assert gate.stats.frames_in == 2
+
+
+def test_trailing_odd_byte_is_ignored():
+    gate = VoiceGate(preroll_ms=0)
+    assert gate.process(SPEECH + b"\x00") == [SPEECH + b"\x00"]
+    assert VoiceGate(preroll_ms=0).process(b"\x01") == []
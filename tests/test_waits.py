@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+import waits
+from similarity import frame_hash
+from waits import wait_for_change, wait_for_window
+from windows import WindowSnapshotService
+
+
+class FakeWindow:
+    def __init__(self, title):
+        self.title = title
+        self.visible = True
+        self.isMinimized = False
+        self.isMaximized = False
+        self.box = SimpleNamespace(left=0, top=0, width=100, height=100)
+
+    def getHandle(self):
+        return id(self)
+
+    def getAppName(self):
+        return "app"
+
+
+def _service(schedule):
+    """Windows from schedule[n] on the n-th enumeration, then the last entry."""
+    calls = []
+    windows = [[FakeWindow(title) for title in titles] for titles in schedule]
+
+    def get_windows():
+        calls.append(1)
+        return windows[min(len(calls), len(windows)) - 1]
+
+    def get_active():
+        current = windows[min(len(calls) + 1, len(windows)) - 1]
+        return current[-1] if current else None
+
+    return WindowSnapshotService(get_windows, get_active, ttl=0)
+
+
+def test_window_appearing_is_noticed():
+    service = _service([[], [], ["Untitled - Notepad"]])
+    result = asyncio.run(wait_for_window(service, "notepad", timeout=1))
+    assert result.met and result.polls == 3
+    assert result.window.title == "Untitled - Notepad"
+    assert "after" in result.summary()
+
+
+def test_fuzzy_titles_do_not_count():
+    service = _service([["Notes"]])
+    result = asyncio.run(wait_for_window(service, "notepad", timeout=0.05))
+    assert not result.met
+    assert "timed out" in result.summary()
+
+
+def test_window_closing_and_becoming_active():
+    service = _service([["Save As", "Editor"], ["Editor"]])
+    assert asyncio.run(wait_for_window(service, "save as", "close", timeout=1)).met
+    service = _service([["Editor", "Other"], ["Other", "Editor"]])
+    assert asyncio.run(wait_for_window(service, "editor", "active", timeout=1)).met
+
+
+def test_unknown_state_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(wait_for_window(_service([[]]), "x", "vanish"))
+
+
+def test_screen_change_is_noticed():
+    frames = iter([np.zeros((36, 64, 3), np.uint8)] * 3)
+    changed = np.full((36, 64, 3), 255, np.uint8)
+    baseline = frame_hash(np.zeros((36, 64, 3), np.uint8))
+    result = asyncio.run(
+        wait_for_change(lambda: next(frames, changed), baseline, timeout=1)
+    )
+    assert result.met and result.polls == 4
+    assert (result.frame == 255).all()
+
+
+def test_timeouts_are_capped(monkeypatch):
+    monkeypatch.setattr(waits, "WAIT_TIMEOUT_MAX", 0.05)
+    frame = np.zeros((36, 64, 3), np.uint8)
+    result = asyncio.run(wait_for_change(lambda: frame, frame_hash(frame), 60))
+    assert not result.met and result.elapsed < 1
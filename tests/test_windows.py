@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from windows import WindowIndex, WindowRecord
+
+
+class FakeWindow:
+    def __init__(self, title, app, handle, minimized=False):
+        self.title = title
+        self.app = app
+        self.handle = handle
+        self.visible = True
+        self.isMinimized = minimized
+        self.isMaximized = False
+        self.box = SimpleNamespace(left=0, top=0, width=800, height=600)
+
+    def getHandle(self):
+        return self.handle
+
+    def getAppName(self):
+        return self.app
+
+
+def _index(*specs, active=None):
+    records = [
+        WindowRecord(FakeWindow(title, app, i), active=i == active)
+        for i, (title, app) in enumerate(specs)
+    ]
+    return WindowIndex(records)
+
+
+INDEX = _index(
+    ("Untitled - Notepad", "notepad.exe"),
+    ("Inbox - Mail", "outlook.exe"),
+    ("report.docx - Word", "winword.exe"),
+    ("Notes", "notes.exe"),
+)
+
+
+def _titles(matches):
+    return [m.record.title for m in matches]
+
+
+def test_exact_beats_prefix_beats_substring():
+    index = _index(("Mail", "a"), ("Mail - Inbox", "b"), ("Inbox - Mail", "c"))
+    matches = index.search("mail")
+    assert [m.how for m in matches] == ["exact", "prefix", "substring"]
+    assert [m.score for m in matches] == [1.0, 0.95, 0.9]
+
+
+def test_app_and_word_matches():
+    assert _titles(INDEX.search("app:outlook")) == ["Inbox - Mail"]
+    best = INDEX.search("winword")[0]
+    assert best.how == "app" and best.record.title == "report.docx - Word"
+    best = INDEX.search("word report")[0]
+    assert best.how == "words" and best.strong
+
+
+def test_misspellings_are_only_weak_matches():
+    matches = INDEX.search("notpad")
+    assert matches and matches[0].record.title == "Untitled - Notepad"
+    assert matches[0].how == "fuzzy" and not matches[0].strong
+
+
+def test_regex_patterns():
+    assert _titles(INDEX.search(r"re:\.docx")) == ["report.docx - Word"]
+    assert INDEX.search("re:(") == []
+
+
+def test_ties_prefer_the_active_window():
+    index = _index(("Terminal", "a"), ("Terminal", "b"), active=1)
+    assert index.search("terminal")[0].record.handle == 1
+
+
+def test_empty_and_unmatched_patterns():
+    assert INDEX.search("  ") == []
+    assert INDEX.search("zzzzqqq") == []
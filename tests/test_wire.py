@@ -0,0 +1,48 @@
+import struct
+
+import pytest
+
+import wire
+
+
+def _frame(kind, payload=b"", flags=0, sequence=7, version=wire.PROTOCOL_VERSION):
+    return struct.pack("<BBHI", kind, version, flags, sequence) + payload
+
+
+def test_parse_frame():
+    kind, flags, sequence, payload = wire.parse_frame(
+        _frame(wire.AUDIO_IN, b"\x01\x02", flags=wire.FLAG_VAD_GATED)
+    )
+    assert (kind, flags, sequence) == (wire.AUDIO_IN, wire.FLAG_VAD_GATED, 7)
+    assert isinstance(payload, memoryview) and bytes(payload) == b"\x01\x02"
+
+
+def test_parse_frame_rejects_short_and_unknown_versions():
+    with pytest.raises(wire.FrameError):
+        wire.parse_frame(b"\x01\x01")
+    with pytest.raises(wire.FrameError):
+        wire.parse_frame(_frame(wire.AUDIO_IN, version=99))
+
+
+@pytest.mark.parametrize("item_id", ["item_1", "item_12", ""])
+def test_pack_audio_frame_aligns_samples(item_id):
+    pcm = b"\x10\x00\x20\x00"
+    data = wire.pack_audio_frame(pcm, item_id, 2, 2**32 + 5)
+    kind, _, sequence, payload = wire.parse_frame(data)
+    assert (kind, sequence) == (wire.AUDIO_OUT, 5)
+    content_index, id_length = struct.unpack_from("<HH", payload)
+    assert content_index == 2
+    assert bytes(payload[4 : 4 + id_length]).decode() == item_id
+    # Samples start at an even offset so the client can view them as Int16Array
+    assert (len(data) - len(pcm)) % 2 == 0
+    assert data.endswith(pcm)
+
+
+def test_parse_image_chunk():
+    upload_id, chunk = wire.parse_image_chunk(memoryview(b"\x03img\xff\xd8"))
+    assert upload_id == "img"
+    assert bytes(chunk) == b"\xff\xd8"
+    with pytest.raises(wire.FrameError):
+        wire.parse_image_chunk(memoryview(b""))
+    with pytest.raises(wire.FrameError):
+        wire.parse_image_chunk(memoryview(b"\x09short"))